@@ -0,0 +1,205 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Agregat per menit, jam, dan hari untuk satu sensor: jumlah bacaan, min, maks, rata-rata dan
+# M2 (jumlah kuadrat simpangan) suhu dan tegangan, ko-momen keduanya, serta jumlah status
+# LOW/NORMAL/HIGH terprediksi. Setiap batch bacaan baru diringkas per menit lalu digabung ke
+# bucket yang sudah ada; bucket jam dan hari digabung dari ringkasan menit yang sama.
+#
+# Penggabungan memakai rumus Chan dkk. (rata-rata dan M2 beberapa kelompok bisa digabung tanpa
+# data mentahnya), jadi bacaan yang datang terlambat cukup digabung ke bucket-nya dan urutan
+# kedatangan tidak berpengaruh. Tampilan satu bulan per jam membaca 720 bucket, bukan jutaan baris.
+#
+# Setiap tabel berupa dict array NumPy (kolom 'kunci' = awal bucket dalam nanodetik epoch,
+# urut naik). Tabel tidak pernah diubah di tempat: setiap pembaruan membuat array baru, sehingga
+# tabel yang sudah diberikan ke snapshot tetap konsisten.
+
+# Lebar bucket dalam detik
+RESOLUSI = {'menit': 60, 'jam': 3600, 'hari': 86400}
+STATUS = {'low': 1, 'normal': 2, 'high': 3}
+KOLOM_NILAI = ('suhu', 'tegangan')
+KOLOM_STATUS = [f'{jenis}_{nama}' for jenis in ('temp', 'volt') for nama in STATUS]
+
+
+def _tabel_kosong():
+    tabel = {'kunci': np.empty(0, dtype=np.int64), 'n': np.empty(0, dtype=np.int64), 'ko_m2': np.empty(0)}
+    for k in KOLOM_NILAI:
+        for s in ('min', 'maks', 'rata', 'm2'):
+            tabel[f'{k}_{s}'] = np.empty(0)
+    for k in KOLOM_STATUS:
+        tabel[k] = np.empty(0, dtype=np.int64)
+    return tabel
+
+
+def _kelompok(kunci):
+    # Urutan (None jika sudah urut) dan posisi awal setiap kelompok kunci yang sama
+    urutan = None
+    if len(kunci) > 1 and (kunci[1:] < kunci[:-1]).any():
+        urutan = np.argsort(kunci, kind='stable')
+        kunci = kunci[urutan]
+    awal = np.flatnonzero(np.concatenate([[True], kunci[1:] != kunci[:-1]]))
+    return urutan, awal, kunci[awal]
+
+
+def ringkas(waktu, suhu, tegangan, temp_status, volt_status, detik=60):
+    # Ringkasan satu batch bacaan per bucket selebar `detik`
+    langkah = detik * 10 ** 9
+    kunci = np.asarray(waktu, dtype='datetime64[ns]').view(np.int64) // langkah * langkah
+    urutan, awal, unik = _kelompok(kunci)
+    nilai = {'suhu': np.asarray(suhu, dtype=np.float64), 'tegangan': np.asarray(tegangan, dtype=np.float64),
+             'temp': np.asarray(temp_status), 'volt': np.asarray(volt_status)}
+    if urutan is not None:
+        nilai = {k: v[urutan] for k, v in nilai.items()}
+    n = np.diff(np.append(awal, len(kunci)))
+    tabel = {'kunci': unik, 'n': n}
+    simpangan = {}
+    for k in KOLOM_NILAI:
+        x = nilai[k]
+        rata = np.add.reduceat(x, awal) / n
+        # Simpangan dari rata-rata bucket-nya sendiri (dua lintasan, stabil secara numerik)
+        simpangan[k] = x - np.repeat(rata, n)
+        tabel[f'{k}_min'] = np.minimum.reduceat(x, awal)
+        tabel[f'{k}_maks'] = np.maximum.reduceat(x, awal)
+        tabel[f'{k}_rata'] = rata
+        tabel[f'{k}_m2'] = np.add.reduceat(simpangan[k] ** 2, awal)
+    tabel['ko_m2'] = np.add.reduceat(simpangan['suhu'] * simpangan['tegangan'], awal)
+    for jenis in ('temp', 'volt'):
+        for nama, status in STATUS.items():
+            tabel[f'{jenis}_{nama}'] = np.add.reduceat((nilai[jenis] == status).astype(np.int64), awal)
+    return tabel
+
+
+def gabung(tabel):
+    # Baris-baris dengan kunci (bucket) sama digabung menjadi satu:
+    #   rata = sum(n_i * rata_i) / n,  M2 = sum(M2_i) + sum(n_i * (rata_i - rata)^2)
+    # (rumus Chan dkk. untuk lebih dari dua kelompok; ko-momen dengan cara yang sama)
+    urutan, awal, unik = _kelompok(tabel['kunci'])
+    if urutan is not None:
+        tabel = {k: v[urutan] for k, v in tabel.items()}
+    if len(unik) == len(tabel['kunci']):
+        return tabel
+    bobot = tabel['n']
+    n = np.add.reduceat(bobot, awal)
+    hasil = {'kunci': unik, 'n': n}
+    selisih = {}
+    for k in KOLOM_NILAI:
+        rata_i = tabel[f'{k}_rata']
+        rata = np.add.reduceat(bobot * rata_i, awal) / n
+        selisih[k] = rata_i - np.repeat(rata, np.diff(np.append(awal, len(bobot))))
+        hasil[f'{k}_min'] = np.minimum.reduceat(tabel[f'{k}_min'], awal)
+        hasil[f'{k}_maks'] = np.maximum.reduceat(tabel[f'{k}_maks'], awal)
+        hasil[f'{k}_rata'] = rata
+        hasil[f'{k}_m2'] = np.add.reduceat(tabel[f'{k}_m2'] + bobot * selisih[k] ** 2, awal)
+    hasil['ko_m2'] = np.add.reduceat(tabel['ko_m2'] + bobot * selisih['suhu'] * selisih['tegangan'], awal)
+    for k in KOLOM_STATUS:
+        hasil[k] = np.add.reduceat(tabel[k], awal)
+    return hasil
+
+
+def _potong(tabel, awal=None, akhir=None):
+    return {k: v[awal:akhir] for k, v in tabel.items()}
+
+
+def _sambung(*daftar):
+    return {k: np.concatenate([t[k] for t in daftar]) for k in daftar[0]}
+
+
+def _gabung_ke(lama, bagian):
+    # Bucket sebelum bucket paling awal di `bagian` tidak berubah dan tidak disentuh;
+    # umumnya hanya bucket terakhir yang digabung ulang
+    i = int(np.searchsorted(lama['kunci'], bagian['kunci'][0]))
+    if i == len(lama['kunci']):
+        return _sambung(lama, bagian)
+    return _sambung(_potong(lama, akhir=i), gabung(_sambung(_potong(lama, awal=i), bagian)))
+
+
+def ke_dataframe(tabel):
+    # Untuk tampilan: indeks waktu awal bucket, ditambah simpangan baku sampel per kolom
+    data = pd.DataFrame({k: v for k, v in tabel.items() if k != 'kunci'},
+                        index=pd.DatetimeIndex(tabel['kunci'].view('datetime64[ns]'), name='Timestamp'))
+    for k in KOLOM_NILAI:
+        data[f'{k}_std'] = np.sqrt(data[f'{k}_m2'] / (data['n'] - 1).where(data['n'] > 1))
+    return data
+
+
+class AgregatWaktu:
+
+    def __init__(self, retensi_menit=pd.Timedelta(days=31)):
+        # Bucket menit lebih lama dari retensi_menit (dihitung dari bucket terbaru) dibuang;
+        # bucket jam dan hari disimpan seluruhnya
+        self.retensi_menit = retensi_menit
+        self._lock = threading.Lock()
+        self.kosongkan()
+
+    def kosongkan(self):
+        with self._lock:
+            self._tabel = {nama: _tabel_kosong() for nama in RESOLUSI}
+
+    def tambah(self, waktu, suhu, tegangan, temp_status, volt_status):
+        if len(suhu) == 0:
+            return
+        per_menit = ringkas(waktu, suhu, tegangan, temp_status, volt_status, RESOLUSI['menit'])
+        with self._lock:
+            for nama, detik in RESOLUSI.items():
+                bagian = per_menit
+                if detik != RESOLUSI['menit']:
+                    langkah = detik * 10 ** 9
+                    bagian = gabung(dict(per_menit, kunci=per_menit['kunci'] // langkah * langkah))
+                self._tabel[nama] = _gabung_ke(self._tabel[nama], bagian)
+            kunci = self._tabel['menit']['kunci']
+            if self.retensi_menit is not None and kunci[-1] - kunci[0] > self.retensi_menit.value:
+                i = int(np.searchsorted(kunci, kunci[-1] - self.retensi_menit.value))
+                self._tabel['menit'] = _potong(self._tabel['menit'], awal=i)
+
+    def koreksi_status(self, waktu, temp_lama, volt_lama, temp_baru, volt_baru):
+        # Setelah prediksi ulang (model diganti): jumlah status setiap bucket disesuaikan
+        # dengan status baru bacaan-bacaan tersebut
+        waktu = np.asarray(waktu, dtype='datetime64[ns]').view(np.int64)
+        selisih = {}
+        for jenis, lama, baru in (('temp', temp_lama, temp_baru), ('volt', volt_lama, volt_baru)):
+            lama, baru = np.asarray(lama), np.asarray(baru)
+            for nama, nilai in STATUS.items():
+                selisih[f'{jenis}_{nama}'] = (baru == nilai).astype(np.int64) - (lama == nilai)
+        with self._lock:
+            for nama, detik in RESOLUSI.items():
+                langkah = detik * 10 ** 9
+                urutan, awal, unik = _kelompok(waktu // langkah * langkah)
+                tabel = dict(self._tabel[nama])
+                # Bucket menit yang sudah lewat retensi tidak ada lagi di tabel
+                posisi = np.searchsorted(tabel['kunci'], unik)
+                ada = (posisi < len(tabel['kunci'])) & (tabel['kunci'][np.minimum(posisi, len(tabel['kunci']) - 1)] == unik)
+                for k, v in selisih.items():
+                    per_bucket = np.add.reduceat(v if urutan is None else v[urutan], awal)
+                    tabel[k] = tabel[k].copy()
+                    tabel[k][posisi[ada]] += per_bucket[ada]
+                self._tabel[nama] = tabel
+
+    def tabel(self, resolusi, mulai=None, sampai=None):
+        # Tabel akumulator (dict array) untuk rentang [mulai, sampai]; jangan diubah oleh pemanggil
+        with self._lock:
+            tabel = self._tabel[resolusi]
+        kunci = tabel['kunci']
+        awal = 0 if mulai is None else int(np.searchsorted(kunci, pd.Timestamp(mulai).value))
+        akhir = len(kunci) if sampai is None else int(np.searchsorted(kunci, pd.Timestamp(sampai).value, 'right'))
+        return _potong(tabel, awal, akhir)
+
+    def ambil(self, resolusi, mulai=None, sampai=None):
+        return ke_dataframe(self.tabel(resolusi, mulai, sampai))
+
+    def statistik(self, mulai=None, sampai=None):
+        # (rerata, kovarians, jumlah) suhu dan tegangan, bentuk yang sama dengan
+        # simulasi.statistik_data, digabung dari bucket harian
+        tabel = self.tabel('hari', mulai, sampai)
+        if not len(tabel['kunci']):
+            return None
+        total = gabung(dict(tabel, kunci=np.zeros_like(tabel['kunci'])))
+        n = int(total['n'][0])
+        if n < 2:
+            return None
+        varians_suhu = float(total['suhu_m2'][0]) / (n - 1)
+        varians_tegangan = float(total['tegangan_m2'][0]) / (n - 1)
+        kovarians = float(total['ko_m2'][0]) / (n - 1)
+        return ((float(total['suhu_rata'][0]), float(total['tegangan_rata'][0])),
+                ((varians_suhu, kovarians), (kovarians, varians_tegangan)), n)
@@ -0,0 +1,307 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Benchmark ujung-ke-ujung pipeline dashboard tanpa Google Sheets dan tanpa browser.
+#
+#   python benchmark.py                              # 1k, 100k, 1M baris -> hasil_benchmark.json
+#   python benchmark.py --ukuran 1000 100000 --keluaran baru.json --bandingkan lama.json
+#
+# Sheet diganti SheetPalsu (di memori), data dari buat_data_sensor. Setiap tahap diukur
+# dua kali: sekali untuk waktu, sekali dengan tracemalloc untuk puncak memori (tracemalloc
+# memperlambat eksekusi, jadi waktunya tidak dipakai). Fungsi-fungsi berhasil.py dijalankan
+# di dalam runtime Streamlit (AppTest) agar st.cache_resource/st.cache_data bekerja
+# seperti di aplikasi sebenarnya.
+
+UKURAN_BAWAAN = (1000, 100000, 1000000)
+HEADER = ['Timestamp', 'Temperature', 'Voltage', 'TempStatus', 'VoltStatus']
+
+
+class SheetPalsu:
+    # Pengganti worksheet gspread: isi sheet berupa list baris string, seperti hasil API
+
+    def __init__(self, baris, header=HEADER):
+        self.baris = [list(header)] + baris
+        self.jumlah_panggilan = 0
+
+    def get_values(self, rentang=None, **kwargs):
+        # rentang None = seluruh sheet, atau 'A{baris}:{kolom}' untuk range read
+        self.jumlah_panggilan += 1
+        if rentang is None:
+            return [list(b) for b in self.baris] or [[]]
+        awal = int(rentang.split(':')[0][1:])
+        return [list(b) for b in self.baris[awal - 1:]] or [[]]
+
+    def get_all_records(self, **kwargs):
+        self.jumlah_panggilan += 1
+        from gspread.utils import numericise_all
+        return [dict(zip(self.baris[0], numericise_all(b))) for b in self.baris[1:]]
+
+    def append_rows(self, baris, **kwargs):
+        self.jumlah_panggilan += 1
+        self.baris.extend([str(v) for v in b] for b in baris)
+
+
+def buat_data_sensor(n, seed=0, mulai='2024-06-01', interval='15s', proporsi_outlier=0.02,
+                     proporsi_duplikat=0.01, proporsi_kosong=0.001):
+    # Bacaan sintetis: suhu/tegangan dengan pola harian, lonjakan (outlier), baris
+    # duplikat dan sel kosong, dalam bentuk string seperti yang dikembalikan Sheets.
+    rng = np.random.default_rng(seed)
+    waktu = pd.date_range(mulai, periods=n, freq=interval)
+    jam = (waktu.hour + waktu.minute / 60).to_numpy()
+    suhu = 35 + 4 * np.sin(2 * np.pi * jam / 24) + rng.normal(0, 1.5, n)
+    tegangan = 215 + 6 * np.cos(2 * np.pi * jam / 24) + rng.normal(0, 4, n)
+    outlier = rng.random(n) < proporsi_outlier
+    suhu[outlier] += rng.choice([-1, 1], outlier.sum()) * rng.uniform(20, 40, outlier.sum())
+    temp_status = np.where(suhu < 33, 1, np.where(suhu > 35, 3, 2))
+    volt_status = np.where(tegangan < 200, 1, np.where(tegangan > 230, 3, 2))
+    kolom = [
+        waktu.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+        np.round(suhu, 1).astype(str).tolist(),
+        np.round(tegangan, 2).astype(str).tolist(),
+        temp_status.astype(str).tolist(),
+        volt_status.astype(str).tolist(),
+    ]
+    baris = [list(b) for b in zip(*kolom)]
+    for i in np.flatnonzero(rng.random(n) < proporsi_kosong):
+        baris[i][1] = ''
+    for i in np.flatnonzero(rng.random(n) < proporsi_duplikat):
+        if i > 0:
+            baris[i] = list(baris[i - 1])
+    return baris
+
+
+# Jalur batch lama dashboard (seluruh sheet dibersihkan setiap refresh), tidak dipakai
+# aplikasi lagi. Disimpan hanya sebagai pembanding: waktunya diukur di jalankan_tahap, dan
+# bersihkan_data menjadi acuan pembersihan.bandingkan_dengan_batch.
+
+def bersihkan_data(data):
+    data = data.dropna()
+    data['Temperature'] = data['Temperature'].astype(float)
+    data['Voltage'] = data['Voltage'].astype(float)
+    data['Timestamp'] = pd.to_datetime(data['Timestamp'])
+    data = data.drop_duplicates()
+    Q1 = data.quantile(0.25)
+    Q3 = data.quantile(0.75)
+    IQR = Q3 - Q1
+    data = data[~((data < (Q1 - 1.5 * IQR)) | (data > (Q3 + 1.5 * IQR))).any(axis=1)]
+    return data
+
+
+def proses_spreadsheet(data):
+    import berhasil
+
+    data = bersihkan_data(data)
+    if len(data) > 100:
+        data = data.iloc[-100:]
+    suhu_list = data['Temperature'].to_numpy()
+    tegangan_list = data['Voltage'].to_numpy()
+    time_list = pd.DatetimeIndex(data['Timestamp'])
+    temp_status_list, volt_status_list = berhasil.prediksi_status_semua(suhu_list, tegangan_list)
+    berhasil.catat_prediksi(data['Timestamp'], suhu_list, tegangan_list, temp_status_list, volt_status_list)
+    return suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list
+
+
+class Pengukur:
+    def __init__(self, memori):
+        self.memori = memori
+        self.hasil = []
+
+    def ukur(self, ukuran, tahap, fungsi):
+        gc.collect()
+        if self.memori:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        mulai = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            keluaran = fungsi()
+        durasi = time.perf_counter() - mulai
+        catatan = {'ukuran': ukuran, 'tahap': tahap}
+        if self.memori:
+            _, puncak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            catatan['puncak_memori_mb'] = puncak / 2 ** 20
+        else:
+            catatan['detik'] = durasi
+        self.hasil.append(catatan)
+        return keluaran
+
+
+def jalankan_tahap(ukuran, seed, memori, folder):
+    # Tahap-tahap perbarui_visualisasi dan halaman prediksi, berurutan seperti di aplikasi
+    import streamlit as st
+
+    import berhasil
+    from pembaca_sheet import PembacaSheetInkremental
+    from penyimpanan import PenyimpananLokal
+    from pipeline import PipelineSensor
+    from poller import Snapshot
+
+    p = Pengukur(memori)
+    sheet = SheetPalsu(buat_data_sensor(ukuran, seed))
+    pembaca = PembacaSheetInkremental(sheet=sheet)
+    penyimpanan = PenyimpananLokal(os.path.join(folder, f'benchmark_{ukuran}_{int(memori)}.sqlite'))
+
+    data = p.ukur(ukuran, 'ambil_sheet', pembaca.baca)
+    p.ukur(ukuran, 'simpan_lokal', lambda: penyimpanan.ganti(data))
+    sheet.baris.extend(buat_data_sensor(100, seed + 1, mulai=sheet.baris[-1][0]))
+    p.ukur(ukuran, 'ambil_sheet_inkremental', pembaca.baca)
+    penyimpanan.tambah(pembaca.baris_baru)
+    # Riwayat lengkap dibaca dari penyimpanan lokal, seperti di aplikasi
+    data = penyimpanan.muat()
+
+    p.ukur(ukuran, 'bersihkan_data', lambda: bersihkan_data(data.copy()))
+    p.ukur(ukuran, 'proses_spreadsheet', lambda: proses_spreadsheet(data.copy()))
+
+    pipeline = PipelineSensor(penyimpanan, pembaca, prediktor=berhasil.prediksi_baris_baru)
+    data_bersih = p.ukur(ukuran, 'pipeline_data_bersih', pipeline.data_bersih)
+    riwayat = p.ukur(ukuran, 'siapkan_riwayat', lambda: berhasil.siapkan_riwayat(data_bersih, pipeline.agregat))
+
+    snapshot = Snapshot(versi=1, waktu=datetime.now(), galat=None, **riwayat)
+    chart_placeholder, pesan_placeholder = st.empty(), st.empty()
+    for rentang in ("100 data terakhir", "Semua", "30 hari (per jam)"):
+        p.ukur(ukuran, f'perbarui_visualisasi[{rentang}]', lambda: berhasil.perbarui_visualisasi(
+            snapshot, chart_placeholder, pesan_placeholder, rentang))
+
+    statistik = p.ukur(ukuran, 'statistik_agregat', pipeline.agregat.statistik)
+    p.ukur(ukuran, 'plot_prediksi_30_hari', lambda: berhasil.plot_prediksi_30_hari(statistik, st.empty()))
+    return p.hasil
+
+
+def _skrip_runtime():
+    # Dijalankan oleh AppTest sebagai skrip Streamlit; parameter lewat variabel lingkungan
+    import json
+    import os
+
+    import benchmark
+
+    import berhasil
+    konfigurasi = json.loads(os.environ['BENCHMARK_KONFIGURASI'])
+    # Model dan tabel keputusan dimuat sekali di awal, seperti setelah start aplikasi
+    hasil = []
+    pengukur = benchmark.Pengukur(memori=False)
+    pengukur.ukur(0, 'muat_model', berhasil.siapkan_sumber_daya)
+    model = berhasil.dapatkan_model()
+    pengukur.ukur(0, 'bangun_tabel_keputusan', lambda: berhasil.dapatkan_tabel(model.versi))
+    hasil.extend(pengukur.hasil)
+    for ukuran in konfigurasi['ukuran']:
+        hasil.extend(benchmark.jalankan_tahap(ukuran, konfigurasi['seed'], False, konfigurasi['folder']))
+        if konfigurasi['memori']:
+            hasil.extend(benchmark.jalankan_tahap(ukuran, konfigurasi['seed'], True, konfigurasi['folder']))
+    log = berhasil.dapatkan_log_prediksi()
+    if log is not None:
+        log.tutup()
+    with open(konfigurasi['keluaran_sementara'], 'w', encoding='utf-8') as f:
+        json.dump(hasil, f)
+
+
+def gabungkan(catatan):
+    # Satu baris per (ukuran, tahap) berisi detik dan puncak memori
+    tabel = {}
+    for c in catatan:
+        baris = tabel.setdefault((c['ukuran'], c['tahap']), {'ukuran': c['ukuran'], 'tahap': c['tahap']})
+        baris.update({k: v for k, v in c.items() if k not in ('ukuran', 'tahap')})
+    return list(tabel.values())
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    import sklearn
+    return {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        # ru_maxrss dalam KiB di Linux
+        'puncak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def bandingkan(lama, baru, toleransi=0.2, minimum_detik=0.02):
+    # Tahap yang lebih lambat > toleransi (dan selisihnya di atas minimum_detik, agar
+    # derau pada tahap yang sangat singkat tidak ikut dihitung) dianggap regresi
+    acuan = {(h['ukuran'], h['tahap']): h for h in lama['hasil']}
+    regresi = []
+    print(f"{'ukuran':>9} {'tahap':<40} {'lama (s)':>10} {'baru (s)':>10} {'rasio':>7}")
+    for h in baru['hasil']:
+        sebelum = acuan.get((h['ukuran'], h['tahap']))
+        if sebelum is None or 'detik' not in h or 'detik' not in sebelum:
+            continue
+        rasio = h['detik'] / sebelum['detik'] if sebelum['detik'] else float('inf')
+        tanda = ''
+        if rasio > 1 + toleransi and h['detik'] - sebelum['detik'] > minimum_detik:
+            tanda = '  <-- regresi'
+            regresi.append(h)
+        print(f"{h['ukuran']:>9} {h['tahap']:<40} {sebelum['detik']:>10.4f} {h['detik']:>10.4f} {rasio:>7.2f}{tanda}")
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline monitoring dengan sheet palsu")
+    parser.add_argument('--ukuran', type=int, nargs='+', default=list(UKURAN_BAWAAN))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keluaran', default='hasil_benchmark.json')
+    parser.add_argument('--bandingkan', metavar='JSON_LAMA', help="Bandingkan dengan hasil benchmark sebelumnya")
+    parser.add_argument('--toleransi', type=float, default=0.2)
+    parser.add_argument('--tanpa-memori', action='store_true', help="Lewati pengukuran tracemalloc")
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as folder:
+        sementara = os.path.join(folder, 'hasil.json')
+        os.environ['BENCHMARK_KONFIGURASI'] = json.dumps({
+            'ukuran': args.ukuran, 'seed': args.seed, 'memori': not args.tanpa_memori,
+            'folder': folder, 'keluaran_sementara': sementara})
+        # Server ingest tidak perlu untuk benchmark; log prediksi ditulis ke folder sementara
+        os.environ.setdefault('INGEST_PORT', '0')
+        os.environ['LOG_PREDIKSI'] = os.path.join(folder, 'log_prediksi')
+        at = AppTest.from_function(_skrip_runtime, default_timeout=3600).run()
+        if at.exception:
+            galat = at.exception[0]
+            raise SystemExit(f"Benchmark gagal: {galat.message}\n" + "\n".join(galat.stack_trace))
+        with open(sementara, encoding='utf-8') as f:
+            catatan = json.load(f)
+
+    hasil = {'metadata': metadata(), 'hasil': gabungkan(catatan)}
+    with open(args.keluaran, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+
+    print(f"{'ukuran':>9} {'tahap':<40} {'detik':>10} {'memori (MB)':>12}")
+    for h in hasil['hasil']:
+        memori = f"{h['puncak_memori_mb']:.1f}" if 'puncak_memori_mb' in h else '-'
+        print(f"{h['ukuran']:>9} {h['tahap']:<40} {h.get('detik', float('nan')):>10.4f} {memori:>12}")
+    print(f"Puncak RSS proses: {hasil['metadata']['puncak_rss_mb']:.0f} MB. Disimpan ke {args.keluaran}")
+
+    if args.bandingkan:
+        with open(args.bandingkan, encoding='utf-8') as f:
+            lama = json.load(f)
+        regresi = bandingkan(lama, hasil, toleransi=args.toleransi)
+        if regresi:
+            print(f"{len(regresi)} tahap lebih lambat dari {args.bandingkan}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
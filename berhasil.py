@@ -1,32 +1,111 @@
 import pandas as pd
-import joblib
-import plotly.graph_objs as go
 import numpy as np
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import logging
+import os
 import time
 import streamlit as st
 from datetime import datetime, timedelta
-from streamlit_option_menu import option_menu
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-
-# Atur Google Sheets API
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name('data-monitoring-424622-f89eeef34709.json', scope)
-client = gspread.authorize(creds)
-
-# Memuat model dan scaler yang sudah disimpan
-rf_temp = joblib.load('temp_model.joblib')
-rf_volt = joblib.load('volt_model.joblib')
-scaler = joblib.load('scaler_rf.joblib')
-
-def prediksi_status(suhu, tegangan, model):
-    data_input = pd.DataFrame([[suhu, tegangan]], columns=['Temperature', 'Voltage'])
-    data_input_scaled = scaler.transform(data_input)
-    status_terprediksi = model.predict(data_input_scaled)
-    return status_terprediksi[0]
+from pembaca_sheet import buat_client, buat_pembaca
+from penyimpanan import PenyimpananLokal
+from poller import PollerLatar
+from pipeline import PipelineSensor
+from agregat import STATUS
+from downsampling import indeks_tampil
+from grafik import dapatkan_grafik, GrafikPita, SERI_MONITORING, SERI_PREDIKSI
+from server_ingest import ServerIngest
+from sumber_data import muat_sumber
+from inferensi import PengelolaModel
+from tabel_keputusan import TabelKeputusan, laporan_ketidaksesuaian
+from simulasi import simulasikan, simulasikan_ramalan
+from peramalan import PeramalSensor, ramalan_per_hari
+from metrik import METRIK, ServerMetrik
+from log_prediksi import LogPrediksi
+from peringatan import MesinPeringatan, PemantauPeringatan, PengirimWebhook
+
+log = logging.getLogger(__name__)
+
+# Anggaran waktu muat model + client Google Sheets saat proses pertama kali start.
+# Terukur ~1.7 detik (impor sklearn + joblib.load ketiga model ~1.65 detik, impor dan
+# otorisasi gspread ~0.06 detik); halaman Home/Tentang tidak memuat keduanya.
+ANGGARAN_STARTUP_DETIK = 3.0
+
+@st.cache_resource
+def dapatkan_client():
+    # Atur Google Sheets API, sekali per proses, dengan pool koneksi untuk semua sheet
+    return buat_client(ukuran_pool=len(dapatkan_daftar_sumber()))
+
+# MODE_KLASIFIKASI=tabel: status dibaca dari tabel keputusan 2D (lihat tabel_keputusan.py),
+# sel di batas keputusan tetap dihitung model. Resolusi grid lewat RESOLUSI_TABEL.
+MODE_KLASIFIKASI = os.environ.get('MODE_KLASIFIKASI', 'model')
+RESOLUSI_TABEL = int(os.environ.get('RESOLUSI_TABEL', 400))
+
+@st.cache_resource
+def dapatkan_pengelola_model():
+    # Model dimuat sekali per proses; versi baru dari latih_ulang.py (atau file model yang
+    # diganti) dimuat di thread latar lalu ditukar tanpa restart
+    return PengelolaModel().mulai()
+
+def dapatkan_model():
+    return dapatkan_pengelola_model().model
+
+@st.cache_resource(max_entries=1)
+def dapatkan_tabel(versi):
+    # Dibangun ulang otomatis saat versi model berubah; rentang grid dari data historis semua sensor
+    model = dapatkan_model()
+    data = pd.concat([dapatkan_penyimpanan(nama).muat(batas=100000) for nama in dapatkan_daftar_sumber()])
+    tabel = TabelKeputusan.dari_data(model, data['Temperature'], data['Voltage'],
+                                     resolusi=(RESOLUSI_TABEL, RESOLUSI_TABEL))
+    tabel.laporan = laporan_ketidaksesuaian(tabel, data['Temperature'], data['Voltage'])
+    log.info("Tabel keputusan model %s: %s", versi, tabel.laporan)
+    return tabel
+
+def fungsi_klasifikasi():
+    model = dapatkan_model()
+    if MODE_KLASIFIKASI == 'tabel':
+        return dapatkan_tabel(model.versi).prediksi
+    return model.prediksi
+
+def siapkan_sumber_daya():
+    # Dipanggil hanya oleh halaman model. Pada rerun keduanya sudah ada di cache,
+    # jadi durasi di sini hanya terasa sekali per proses.
+    mulai = time.perf_counter()
+    dapatkan_model()
+    dapatkan_client()
+    durasi = time.perf_counter() - mulai
+    if durasi > ANGGARAN_STARTUP_DETIK:
+        log.warning("Memuat model dan client butuh %.2f detik, melebihi anggaran %s detik",
+                    durasi, ANGGARAN_STARTUP_DETIK)
+    return durasi
+
+# Folder log prediksi per bacaan (lihat log_prediksi.py); LOG_PREDIKSI= (kosong) untuk menonaktifkan
+LOG_PREDIKSI = os.environ.get('LOG_PREDIKSI', 'log_prediksi')
+
+@st.cache_resource
+def dapatkan_log_prediksi():
+    # Satu penulis per proses; baris yang sama dari banyak sesi/refresh hanya dicatat sekali
+    return LogPrediksi(LOG_PREDIKSI) if LOG_PREDIKSI else None
+
+def catat_prediksi(waktu, suhu, tegangan, temp_status, volt_status, sensor=''):
+    pencatat = dapatkan_log_prediksi()
+    if pencatat is not None:
+        pencatat.catat(waktu, suhu, tegangan, temp_status, volt_status, dapatkan_model().versi, sensor)
+
+@st.cache_resource
+def dapatkan_daftar_sumber():
+    # Daftar sensor/ruangan dari sumber_data.json; tanpa file dipakai sheet bawaan
+    daftar = muat_sumber('sumber_data.json')
+    return {sumber.nama: sumber for sumber in daftar}
+
+@st.cache_resource
+def dapatkan_penyimpanan(nama):
+    return PenyimpananLokal(dapatkan_daftar_sumber()[nama].path_db)
+
+@st.cache_resource
+def dapatkan_pembaca(nama):
+    return buat_pembaca(dapatkan_daftar_sumber()[nama], dapatkan_client)
+
+def prediksi_status_semua(suhu, tegangan):
+    return fungsi_klasifikasi()(suhu, tegangan)
 
 def interpret_status(status):
     if status == 2:
@@ -38,239 +117,13 @@ def interpret_status(status):
     else:
         return "unknown"
 
-def bersihkan_data(data):
-    data = data.dropna()
-    data['Temperature'] = data['Temperature'].astype(float)
-    data['Voltage'] = data['Voltage'].astype(float)
-    data['Timestamp'] = pd.to_datetime(data['Timestamp'])
-    data = data.drop_duplicates()
-    Q1 = data.quantile(0.25)
-    Q3 = data.quantile(0.75)
-    IQR = Q3 - Q1
-    data = data[~((data < (Q1 - 1.5 * IQR)) | (data > (Q3 + 1.5 * IQR))).any(axis=1)]
-    return data
-
-def generate_future_data(current_data, days=30):
-    suhu_mean = current_data['Temperature'].mean()
-    suhu_std = current_data['Temperature'].std()
-    tegangan_mean = current_data['Voltage'].mean()
-    tegangan_std = current_data['Voltage'].std()
-    future_suhu = np.random.normal(suhu_mean, suhu_std, days)
-    future_tegangan = np.random.normal(tegangan_mean, tegangan_std, days)
-    return future_suhu, future_tegangan
-
-def proses_spreadsheet(data):
-    suhu_list = []
-    tegangan_list = []
-    temp_status_list = []
-    volt_status_list = []
-    time_list = []
-    data = bersihkan_data(data)
-    if len(data) > 100:
-        data = data.iloc[-100:]
-    for index, row in data.iterrows():
-        suhu = row['Temperature']
-        tegangan = row['Voltage']
-        time = row['Timestamp']
-        # Ubah timestamp agar sesuai dengan waktu sekarang
-        time = datetime.now().replace(hour=time.hour, minute=time.minute, second=time.second, microsecond=0)
-        temp_status = prediksi_status(suhu, tegangan, rf_temp)
-        volt_status = prediksi_status(suhu, tegangan, rf_volt)
-        suhu_list.append(suhu)
-        tegangan_list.append(tegangan)
-        temp_status_list.append(temp_status)
-        volt_status_list.append(volt_status)
-        time_list.append(time)
-        print(f"Waktu: {time}, Suhu: {suhu}, Tegangan: {tegangan}, TempStatus Terprediksi: {temp_status}, VoltStatus Terprediksi: {volt_status}")
-    return suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list
-
-def plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list, chart_placeholder):
-    chart_placeholder.empty()
-    
-    with chart_placeholder.container():
-        # Plot Suhu
-        fig_suhu = go.Figure()
-        fig_suhu.add_trace(go.Scatter(
-            x=time_list,
-            y=suhu_list,
-            mode='lines+markers',
-            name='Suhu',
-            line=dict(color='blue', shape='spline'),
-            marker=dict(size=8, color='blue')
-        ))
-
-        fig_suhu.update_layout(
-            title='Grafik Suhu',
-            xaxis_title='Waktu',
-            yaxis_title='Nilai Suhu',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_suhu)
-
-        # Plot Tegangan
-        fig_tegangan = go.Figure()
-        fig_tegangan.add_trace(go.Scatter(
-            x=time_list,
-            y=tegangan_list,
-            mode='lines+markers',
-            name='Tegangan',
-            line=dict(color='red', shape='spline'),
-            marker=dict(size=8, color='red')
-        ))
-
-        fig_tegangan.update_layout(
-            title='Grafik Tegangan',
-            xaxis_title='Waktu',
-            yaxis_title='Nilai Tegangan',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_tegangan)
-
-        # Plot TempStatus
-        fig_temp_status = go.Figure()
-        fig_temp_status.add_trace(go.Scatter(
-            x=time_list,
-            y=temp_status_list,
-            mode='lines+markers',
-            name='TempStatus',
-            line=dict(color='green', shape='spline'),
-            marker=dict(size=8, color='green')
-        ))
-
-        fig_temp_status.update_layout(
-            title='TempStatus Terprediksi',
-            xaxis_title='Waktu',
-            yaxis_title='TempStatus',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_temp_status)
-        
-        # Plot VoltStatus
-        fig_volt_status = go.Figure()
-        fig_volt_status.add_trace(go.Scatter(
-            x=time_list,
-            y=volt_status_list,
-            mode='lines+markers',
-            name='VoltStatus',
-            line=dict(color='purple', shape='spline'),
-            marker=dict(size=8, color='purple')
-        ))
-
-        fig_volt_status.update_layout(
-            title='VoltStatus Terprediksi',
-            xaxis_title='Waktu',
-            yaxis_title='VoltStatus',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        st.plotly_chart(fig_volt_status)
+def plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list, chart_placeholder, gabungan=False):
+    # Figure dibuat sekali per sesi; di sini hanya data x/y yang diganti
+    grafik = dapatkan_grafik('monitoring', SERI_MONITORING, gabungan)
+    grafik.perbarui(time_list, [suhu_list, tegangan_list, temp_status_list, volt_status_list])
+    slot_pesan = grafik.tampilkan(chart_placeholder)
 
+    with slot_pesan.container():
         # Peringatan TempStatus rendah atau tinggi hanya untuk data terbaru
         if temp_status_list[-1] == 1:
             st.warning(f"Warning: TempStatus is LOW at {time_list[-1]}")
@@ -287,222 +140,280 @@ def plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, ti
         else:
             st.success(f"VoltStatus is NORMAL at {time_list[-1]}")
 
-def plot_prediksi_30_hari(data, chart_placeholder):
-    future_suhu, future_tegangan = generate_future_data(data)
-    future_temp_status_list = []
-    future_volt_status_list = []
-    time_list = []
+@st.cache_data(max_entries=20, show_spinner=False)
+def hitung_simulasi(rerata, kovarians, jumlah_data, versi, seed, jumlah_jalur, hari=30):
+    # Di-cache per (statistik data, versi model, seed, jumlah jalur): rerun langsung memakai
+    # hasil yang sama. Klasifikasi mengikuti MODE_KLASIFIKASI, sama dengan dashboard.
+    return simulasikan(rerata, kovarians, fungsi_klasifikasi(),
+                       hari=hari, jumlah_jalur=jumlah_jalur, seed=seed)
+
+@st.cache_resource
+def dapatkan_peramal(nama):
+    # Model Holt-Winters per sensor; state-nya disimpan di samping file penyimpanan.
+    # Rata-rata per jam diambil dari agregat pipeline, bukan dari baris mentah.
+    return PeramalSensor(dapatkan_penyimpanan(nama), dapatkan_daftar_sumber()[nama].path_peramalan,
+                         agregat=dapatkan_pipeline(nama).agregat)
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def hitung_simulasi_ramalan(_ramalan, nama, jam_berikutnya, hari, per_jam, versi, seed, jumlah_jalur):
+    # State peramal hanya berubah saat jam_berikutnya maju, jadi itu kunci cache-nya
+    return simulasikan_ramalan(_ramalan, fungsi_klasifikasi(), jumlah_jalur=jumlah_jalur, seed=seed)
+
+def tampilkan_hasil_simulasi(hasil, time_list, chart_placeholder, keterangan):
+    p5_suhu, median_suhu, p95_suhu = hasil.persentil_suhu
+    p5_tegangan, median_tegangan, p95_tegangan = hasil.persentil_tegangan
+    grafik = dapatkan_grafik('prediksi', SERI_PREDIKSI, kelas=GrafikPita)
+    grafik.perbarui(time_list, [p95_suhu, p5_suhu, median_suhu, p95_tegangan, p5_tegangan, median_tegangan,
+                                hasil.peluang_temp_low, hasil.peluang_temp_high,
+                                hasil.peluang_volt_low, hasil.peluang_volt_high], keterangan=keterangan)
+    grafik.tampilkan(chart_placeholder)
+
+def plot_prediksi_30_hari(statistik, chart_placeholder, seed=0, jumlah_jalur=10000, hari=30):
+    # statistik: (rerata, kovarians, jumlah) dari agregat harian pipeline (AgregatWaktu.statistik)
+    if statistik is None:
+        chart_placeholder.info("Belum cukup data untuk prediksi.")
+        return None
+    with METRIK.ukur('simulasi_monte_carlo'):
+        hasil = hitung_simulasi(*statistik, dapatkan_model().versi, seed, jumlah_jalur, hari)
     start_time = datetime.now() + timedelta(hours=1)  # Menggunakan waktu sekarang untuk prediksi ke depan
-    for i, (suhu, tegangan) in enumerate(zip(future_suhu, future_tegangan)):
-        temp_status = prediksi_status(suhu, tegangan, rf_temp)
-        volt_status = prediksi_status(suhu, tegangan, rf_volt)
-        time = start_time + timedelta(days=i)
-        time = time.replace(microsecond=0)
-        future_temp_status_list.append(temp_status)
-        future_volt_status_list.append(volt_status)
-        time_list.append(time)
-        print(f"Prediksi 30 Hari - Waktu: {time}, Suhu: {suhu}, Tegangan: {tegangan}, TempStatus Terprediksi: {temp_status}, VoltStatus Terprediksi: {volt_status}")
-    
-    chart_placeholder.empty()
-    
-    with chart_placeholder.container():
-        # Plot Suhu Prediksi
-        fig_suhu_prediksi = go.Figure()
-        fig_suhu_prediksi.add_trace(go.Scatter(
-            x=time_list,
-            y=future_suhu,
-            mode='lines+markers',
-            name='Suhu Prediksi',
-            line=dict(color='blue', shape='spline'),
-            marker=dict(size=8, color='blue')
-        ))
-
-        fig_suhu_prediksi.update_layout(
-            title='Grafik Prediksi Suhu 30 Hari ke Depan',
-            xaxis_title='Waktu',
-            yaxis_title='Nilai Suhu',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_suhu_prediksi)
-
-        # Plot Tegangan Prediksi
-        fig_tegangan_prediksi = go.Figure()
-        fig_tegangan_prediksi.add_trace(go.Scatter(
-            x=time_list,
-            y=future_tegangan,
-            mode='lines+markers',
-            name='Tegangan Prediksi',
-            line=dict(color='red', shape='spline'),
-            marker=dict(size=8, color='red')
-        ))
-
-        fig_tegangan_prediksi.update_layout(
-            title='Grafik Prediksi Tegangan 30 Hari ke Depan',
-            xaxis_title='Waktu',
-            yaxis_title='Nilai Tegangan',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_tegangan_prediksi)
-
-        # Plot TempStatus Prediksi
-        fig_temp_status_prediksi = go.Figure()
-        fig_temp_status_prediksi.add_trace(go.Scatter(
-            x=time_list,
-            y=future_temp_status_list,
-            mode='lines+markers',
-            name='TempStatus Prediksi',
-            line=dict(color='green', shape='spline'),
-            marker=dict(size=8, color='green')
-        ))
-
-        fig_temp_status_prediksi.update_layout(
-            title='TempStatus Terprediksi 30 Hari ke Depan',
-            xaxis_title='Waktu',
-            yaxis_title='TempStatus',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_temp_status_prediksi)
-        
-        # Plot VoltStatus Prediksi
-        fig_volt_status_prediksi = go.Figure()
-        fig_volt_status_prediksi.add_trace(go.Scatter(
-            x=time_list,
-            y=future_volt_status_list,
-            mode='lines+markers',
-            name='VoltStatus Prediksi',
-            line=dict(color='purple', shape='spline'),
-            marker=dict(size=8, color='purple')
-        ))
-
-        fig_volt_status_prediksi.update_layout(
-            title='VoltStatus Terprediksi 30 Hari ke Depan',
-            xaxis_title='Waktu',
-            yaxis_title='VoltStatus',
-            legend=dict(
-                title=dict(text='Parameter', font=dict(size=12, color='white')),
-                font=dict(
-                    size=12,
-                    color='white'
-                )
-            ),
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='grey',
-                tickfont=dict(color='white'),
-                titlefont=dict(color='white')
-            ),
-            font=dict(
-                family="Arial, sans-serif",
-                size=12,
-                color="white"
-            )
-        )
-        
-        st.plotly_chart(fig_volt_status_prediksi)
+    time_list = [(start_time + timedelta(days=i)).replace(microsecond=0) for i in range(hasil.langkah)]
+    tampilkan_hasil_simulasi(hasil, time_list, chart_placeholder, f"{hari} Hari ke Depan")
+    return hasil
+
+def plot_prediksi_deret_waktu(nama, chart_placeholder, seed=0, jumlah_jalur=2000, hari=30, per_jam=False):
+    # Holt-Winters per jam: hanya jam yang baru lengkap dimasukkan ke model setiap refresh
+    peramal = dapatkan_peramal(nama)
+    with METRIK.ukur('perbarui_peramal'):
+        peramal.perbarui()
+    ramalan = peramal.ramalan(hari * 24)
+    if ramalan is None:
+        chart_placeholder.info("Model deret waktu butuh minimal 2 hari data per jam.")
+        return None
+    if not per_jam:
+        ramalan = ramalan_per_hari(ramalan)
+    # Jalur x titik waktu dibatasi agar simulasi per jam tetap di bawah satu detik
+    jumlah_jalur = min(jumlah_jalur, max(200, 300000 // len(ramalan)))
+    hasil = hitung_simulasi_ramalan(ramalan, nama, str(peramal.jam_berikutnya), hari, per_jam,
+                                    dapatkan_model().versi, seed, jumlah_jalur)
+    keterangan = f"{hari} Hari ke Depan ({'per jam' if per_jam else 'per hari'})"
+    tampilkan_hasil_simulasi(hasil, list(ramalan.index), chart_placeholder, keterangan)
+    return hasil
+
+RENTANG_WAKTU = {
+    "100 data terakhir": None,
+    "1 jam": pd.Timedelta(hours=1),
+    "6 jam": pd.Timedelta(hours=6),
+    "1 hari": pd.Timedelta(days=1),
+    "7 hari": pd.Timedelta(days=7),
+    "Semua": pd.Timedelta.max,
+}
+
+# Rentang panjang dibaca dari agregat pipeline (rata-rata per bucket), bukan dari riwayat per bacaan
+RENTANG_AGREGAT = {
+    "30 hari (per jam)": ('jam', pd.Timedelta(days=30)),
+    "1 tahun (per hari)": ('hari', pd.Timedelta(days=365)),
+}
+
+def prediksi_baris_baru(data, sensor=''):
+    # Pipeline hanya meneruskan baris yang belum pernah diprediksi, jadi tidak ada yang perlu di-cache
+    temp_status, volt_status = prediksi_status_semua(data['Temperature'].to_numpy(), data['Voltage'].to_numpy())
+    catat_prediksi(data['Timestamp'], data['Temperature'].to_numpy(), data['Voltage'].to_numpy(),
+                   temp_status, volt_status, sensor)
+    return temp_status, volt_status
+
+def siapkan_riwayat(jendela, agregat=None):
+    # Seluruh riwayat bersih untuk snapshot (view ke riwayat pipeline, tanpa salinan);
+    # status sudah diprediksi oleh pipeline. Tabel agregat jam/hari untuk rentang panjang.
+    waktu_asli = pd.DatetimeIndex(jendela.waktu)
+    return dict(
+        suhu=jendela.suhu,
+        tegangan=jendela.tegangan,
+        temp_status=jendela.temp_status,
+        volt_status=jendela.volt_status,
+        time_list=waktu_asli,
+        waktu_asli=waktu_asli,
+        agregat={nama: agregat.tabel(nama) for nama in ('jam', 'hari')} if agregat is not None else None,
+    )
 
-def perbarui_visualisasi(sheet, chart_placeholder, last_data):
-    data = pd.DataFrame(sheet.get_all_records())
-    if not data.equals(last_data):
-        suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list = proses_spreadsheet(data)
-        plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list, chart_placeholder)
+def pilih_rentang(snapshot, rentang, maks_titik=2000):
+    # Potong riwayat sesuai rentang waktu lalu perkecil jumlah titiknya
+    durasi = RENTANG_WAKTU[rentang]
+    n = len(snapshot.suhu)
+    if durasi is None:
+        awal = max(n - 100, 0)
+    elif durasi == pd.Timedelta.max:
+        awal = 0
     else:
-        # Update grafik meskipun tidak ada perubahan data
-        suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list = proses_spreadsheet(data)
-        plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list, chart_placeholder)
-    return data
+        awal = int(np.argmax(snapshot.waktu_asli >= snapshot.waktu_asli[-1] - durasi))
+    indeks = awal + indeks_tampil(
+        snapshot.waktu_asli[awal:], snapshot.suhu[awal:], snapshot.tegangan[awal:],
+        snapshot.temp_status[awal:], snapshot.volt_status[awal:], maks_titik=maks_titik)
+    # Riwayat disimpan float32; dibulatkan agar tampilan tidak memuat digit semu seperti 25.299999
+    return (snapshot.suhu[indeks].astype(np.float64).round(4), snapshot.tegangan[indeks].astype(np.float64).round(4),
+            snapshot.temp_status[indeks], snapshot.volt_status[indeks], snapshot.time_list[indeks])
+
+def pilih_agregat(snapshot, rentang):
+    # Rata-rata per bucket dan status terbanyak di bucket itu, dengan tanggal sebenarnya
+    resolusi, durasi = RENTANG_AGREGAT[rentang]
+    tabel = snapshot.agregat[resolusi]
+    awal = np.searchsorted(tabel['kunci'], tabel['kunci'][-1] - durasi.value)
+    waktu = pd.DatetimeIndex(tabel['kunci'][awal:].view('datetime64[ns]'))
+    status = []
+    for jenis in ('temp', 'volt'):
+        jumlah = np.stack([tabel[f'{jenis}_{nama}'][awal:] for nama in STATUS], axis=1)
+        # Bucket tanpa status terprediksi (semua jumlah 0) ditampilkan sebagai 0
+        status.append(np.where(jumlah.any(axis=1), np.array(list(STATUS.values()))[jumlah.argmax(axis=1)], 0))
+    return (tabel['suhu_rata'][awal:].round(4), tabel['tegangan_rata'][awal:].round(4), status[0], status[1], waktu)
+
+def tampilkan_ringkasan(snapshot, ringkasan_placeholder):
+    # Grid status terbaru semua sensor
+    with ringkasan_placeholder.container():
+        kolom = st.columns(min(len(snapshot), 4))
+        for i, (nama, snap) in enumerate(snapshot.items()):
+            with kolom[i % len(kolom)]:
+                st.markdown(f"**{nama}**")
+                if snap.kosong:
+                    st.caption("Belum ada data.")
+                    continue
+                st.metric("Suhu", f"{snap.suhu[-1]:.1f}")
+                st.metric("Tegangan", f"{snap.tegangan[-1]:.2f}")
+                st.caption(f"TempStatus: {interpret_status(snap.temp_status[-1])} | "
+                           f"VoltStatus: {interpret_status(snap.volt_status[-1])} | {snap.time_list[-1]}")
+                if snap.galat:
+                    st.caption("⚠ Sinkronisasi gagal, data lokal")
+
+def perbarui_visualisasi(snapshot, chart_placeholder, pesan_placeholder, rentang="100 data terakhir", gabungan=False):
+    # Sesi hanya menampilkan snapshot; sinkronisasi dan prediksi dikerjakan poller
+    if snapshot.galat:
+        pesan_placeholder.warning(f"Sinkronisasi Google Sheets gagal, menampilkan data lokal: {snapshot.galat}")
+    else:
+        pesan_placeholder.empty()
+    if snapshot.kosong or (rentang in RENTANG_AGREGAT and not snapshot.agregat):
+        pesan_placeholder.info("Belum ada data.")
+        return
+    with METRIK.ukur('pilih_rentang'):
+        if rentang in RENTANG_AGREGAT:
+            suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list = pilih_agregat(snapshot, rentang)
+        else:
+            suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list = pilih_rentang(snapshot, rentang)
+    with METRIK.ukur('render_grafik'):
+        plot_grafik(suhu_list, tegangan_list, temp_status_list, volt_status_list, time_list, chart_placeholder, gabungan)
+
+def tampilkan_diagnostik(diagnostik_placeholder):
+    # Panel Diagnostik di sidebar: durasi per tahap dan penghitung dari METRIK
+    if not METRIK.aktif:
+        diagnostik_placeholder.caption("Metrik dinonaktifkan (METRIK=0).")
+        return
+    ringkasan = METRIK.ringkasan()
+    baris = ["| Tahap | n | p50 (ms) | p95 (ms) | maks (ms) |", "| --- | ---: | ---: | ---: | ---: |"]
+    for nama, h in ringkasan['tahap'].items():
+        baris.append(f"| {nama} | {h['jumlah']} | {h['p50_detik'] * 1000:.1f} | "
+                     f"{h['p95_detik'] * 1000:.1f} | {h['maks_detik'] * 1000:.1f} |")
+    with diagnostik_placeholder.container():
+        st.markdown("\n".join(baris))
+        st.caption("  \n".join(f"{nama}: {nilai}" for nama, nilai in ringkasan['penghitung'].items()))
+
+@st.cache_resource
+def dapatkan_pipeline(nama):
+    # Satu pipeline per sensor untuk seluruh proses: pembersihan dilakukan secara streaming,
+    # prediksi hanya untuk baris baru, dan agregat waktunya dipakai juga oleh halaman prediksi
+    return PipelineSensor(dapatkan_penyimpanan(nama), dapatkan_pembaca(nama),
+                          prediktor=lambda data: prediksi_baris_baru(data, nama),
+                          versi_model=lambda: dapatkan_model().versi)
+
+def perbarui_pipeline(nama):
+    # Untuk halaman tanpa tampilan live: semua panggilan Sheets tetap milik poller, yang juga
+    # membawa riwayat dan agregat pipeline ke baris terbaru. Di sini hanya ditunggu snapshot
+    # pertamanya, lalu galat sinkronisasi terakhirnya ditampilkan.
+    poller = dapatkan_poller()
+    snapshot = poller.snapshot() or poller.tunggu(0, timeout=15)
+    if snapshot is None:
+        st.info("Data sensor belum tersedia, menunggu sinkronisasi pertama.")
+    elif snapshot[nama].galat:
+        st.warning(f"Sinkronisasi Google Sheets gagal, menampilkan data lokal: {snapshot[nama].galat}")
+    galat_poller = poller.galat
+    if galat_poller is not None:
+        waktu_galat, pesan_galat = galat_poller
+        st.warning(f"Pemrosesan data gagal ({waktu_galat:%H:%M:%S}): {pesan_galat}")
+    return dapatkan_pipeline(nama)
+
+@st.cache_resource
+def dapatkan_poller():
+    # Satu poller untuk seluruh proses, berapa pun jumlah tab yang terbuka
+    tugas = {}
+    for nama in dapatkan_daftar_sumber():
+        penyimpanan = dapatkan_penyimpanan(nama)
+        pipeline = dapatkan_pipeline(nama)
+        # Putaran tanpa baris baru (dan tanpa ganti model) tidak membersihkan, memprediksi,
+        # maupun menerbitkan snapshot baru
+        tugas[nama] = (pipeline.sinkronkan,
+                       lambda pipeline=pipeline: siapkan_riwayat(pipeline.data_bersih(), pipeline.agregat),
+                       lambda penyimpanan=penyimpanan: (penyimpanan.tanda(), dapatkan_model().versi))
+    return PollerLatar(tugas, interval=15).mulai()
+
+@st.cache_resource
+def dapatkan_pemantau_peringatan():
+    # WEBHOOK_PERINGATAN=<url>: setiap bacaan baru semua sensor dievaluasi di thread latar
+    # dan perubahan status dikirim ke webhook (lihat peringatan.py). Untuk peringatan tanpa
+    # dashboard terbuka, jalankan `python peringatan.py pantau` atau `server_ingest.py --webhook`.
+    url = os.environ.get('WEBHOOK_PERINGATAN')
+    if not url:
+        return {}
+    mesin = MesinPeringatan(PengirimWebhook(url))
+    return {nama: PemantauPeringatan(nama, dapatkan_penyimpanan(nama), mesin, prediksi_status_semua).mulai()
+            for nama in dapatkan_daftar_sumber()}
+
+def saat_bacaan_diterima(nama):
+    poller = dapatkan_poller()
+    pemantau = dapatkan_pemantau_peringatan().get(nama)
+
+    def picu():
+        poller.picu()
+        if pemantau is not None:
+            pemantau.picu()
+    return picu
+
+@st.cache_resource
+def dapatkan_server_ingest():
+    # Server ingest untuk ESP8266 (sensor pertama di daftar sumber); bacaan baru
+    # langsung memicu poller sehingga dashboard terbarui dalam hitungan detik.
+    # Hanya dijalankan jika INGEST_PORT diisi. Server tidak memakai autentikasi, jadi
+    # bawaannya hanya menerima koneksi dari komputer ini; INGEST_HOST=0.0.0.0 untuk LAN.
+    port = int(os.environ.get('INGEST_PORT') or 0)
+    if not port:
+        return None
+    host = os.environ.get('INGEST_HOST', '127.0.0.1')
+    nama = next(iter(dapatkan_daftar_sumber()))
+    sheet = None
+    if os.environ.get('INGEST_TERUSKAN_KE_SHEET') == '1':
+        sheet = dapatkan_pembaca(nama).sheet
+    sumber = dapatkan_daftar_sumber()[nama]
+    server = ServerIngest(dapatkan_penyimpanan(nama), sheet=sheet, saat_diterima=saat_bacaan_diterima(nama), host=host,
+                          port=port, klasifikasi=prediksi_status_semua, format_waktu=sumber.format_waktu,
+                          zona_waktu=sumber.zona_waktu)
+    try:
+        return server.mulai_di_thread()
+    except OSError as e:
+        log.warning("Server ingest tidak dijalankan: %s", e)
+        return None
+
+@st.cache_resource(show_spinner=False)
+def dapatkan_server_metrik():
+    # METRIK_PORT=<port>: /metrics dan /metrics.json di 127.0.0.1 tanpa server ingest
+    # (server ingest dengan INGEST_PORT juga menyajikannya)
+    port = int(os.environ.get('METRIK_PORT') or 0)
+    if not port:
+        return None
+    try:
+        return ServerMetrik(METRIK, port=port).mulai_di_thread()
+    except OSError as e:
+        log.warning("Server metrik tidak dijalankan: %s", e)
+        return None
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     st.set_page_config(page_title="Aplikasi Monitoring Suhu dan Tegangan", layout="wide", initial_sidebar_state="expanded", page_icon="🐣")
+    dapatkan_server_metrik()
     
     # Sidebar dengan logo dan gambar di atas menu
     with st.sidebar:
@@ -532,7 +443,10 @@ def main():
             main_page = st.selectbox("Pilih Halaman Utama", ["Home", "Tentang"])
         st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
         with st.expander("🛠 Model Configuration"):
-            model_page = st.selectbox("Pilih Halaman Model", ["Monitoring", "Prediksi 30 Hari"])
+            # Tanpa pilihan awal, sehingga Home/Tentang tidak ikut memuat model dan API
+            model_page = st.selectbox("Pilih Halaman Model", ["Monitoring", "Prediksi 30 Hari"],
+                                      index=None, placeholder="Pilih halaman model")
+            sensor = st.selectbox("Pilih Sensor", list(dapatkan_daftar_sumber()))
         
         # Menambahkan logo WhatsApp, Instagram, dan Email GIF dengan jarak dan posisi
         st.markdown(
@@ -580,29 +494,81 @@ def main():
 
     if model_page == "Monitoring":
         st.write("<h1 style='text-align: center; color: white;'>Monitoring suhu dan tegangan</h1>", unsafe_allow_html=True)
-        sheet_url = 'https://docs.google.com/spreadsheets/d/1t3iwJI4UICYilpjplZ2KbGwJ4MQEsbCWL2AGaXvX_mQ/edit#gid=0'
-        sheet = client.open_by_url(sheet_url).sheet1
+        ringkasan_placeholder = st.empty()
+        pesan_placeholder = st.empty()
         chart_placeholder = st.empty()
-        last_data = pd.DataFrame()
+        siapkan_sumber_daya()
+        poller = dapatkan_poller()
+        dapatkan_pemantau_peringatan()
+        dapatkan_server_ingest()
+        versi_terakhir = 0
+        versi_poller = 0
+        galat_ditampilkan = False
 
         # Placeholder untuk memulai/menghentikan pembaruan otomatis
         auto_update = st.checkbox('Mulai Pembaruan Otomatis', value=True)
+        rentang = st.selectbox("Rentang waktu", list(RENTANG_WAKTU) + list(RENTANG_AGREGAT))
+        gabungan = st.sidebar.checkbox("Gabungkan grafik (sumbu waktu bersama)", value=False)
+        statistik_placeholder = st.sidebar.empty()
+        with st.sidebar.expander("Diagnostik"):
+            diagnostik_placeholder = st.empty()
         
         while auto_update:
-            with chart_placeholder.container():
-                last_data = perbarui_visualisasi(sheet, chart_placeholder, last_data)
-            time.sleep(15)  # Check for updates every 15 seconds
+            snapshot = poller.tunggu(versi_poller, timeout=15)
+            if snapshot is not None:
+                versi_poller = max(s.versi for s in snapshot.values())
+            galat_poller = poller.galat
+            # Setelah poller pulih, pesan galatnya diganti tampilan snapshot terbaru
+            if snapshot is not None and (snapshot[sensor].versi != versi_terakhir
+                                         or (galat_ditampilkan and galat_poller is None)):
+                versi_terakhir = snapshot[sensor].versi
+                galat_ditampilkan = False
+                if len(snapshot) > 1:
+                    tampilkan_ringkasan(snapshot, ringkasan_placeholder)
+                perbarui_visualisasi(snapshot[sensor], chart_placeholder, pesan_placeholder, rentang, gabungan)
+            if galat_poller is not None:
+                waktu_galat, pesan_galat = galat_poller
+                pesan_placeholder.error(f"Pemrosesan data gagal ({waktu_galat:%H:%M:%S}): {pesan_galat}")
+                galat_ditampilkan = True
+            keterangan = []
+            if MODE_KLASIFIKASI == 'tabel':
+                tabel = dapatkan_tabel(dapatkan_model().versi)
+                keterangan.append(
+                    f"Tabel keputusan {tabel.resolusi[0]}x{tabel.resolusi[1]}: {tabel.jumlah_lookup} lookup, "
+                    f"{tabel.jumlah_fallback} ke model, beda dengan model di data historis "
+                    f"{tabel.laporan['rasio_beda_temp']:.2%}/{tabel.laporan['rasio_beda_volt']:.2%}")
+            pencatat = dapatkan_log_prediksi()
+            if pencatat is not None:
+                statistik_log = pencatat.statistik()
+                keterangan.append(
+                    f"Log prediksi: {statistik_log['ditulis']} baris ditulis, "
+                    f"{statistik_log['duplikat']} duplikat dilewati")
+            if keterangan:
+                statistik_placeholder.caption("  \n".join(keterangan))
+            tampilkan_diagnostik(diagnostik_placeholder)
         
         st.write("Pembaruan otomatis dihentikan.")
     
     if model_page == "Prediksi 30 Hari":
         st.write("<h1 style='text-align: center; color: white;'>Prediksi 30 hari</h1>", unsafe_allow_html=True)
-        sheet_url = 'https://docs.google.com/spreadsheets/d/1t3iwJI4UICYilpjplZ2KbGwJ4MQEsbCWL2AGaXvX_mQ/edit#gid=0'
-        sheet = client.open_by_url(sheet_url).sheet1
-        data = pd.DataFrame(sheet.get_all_records())
-        data = bersihkan_data(data)
+        siapkan_sumber_daya()
+        pipeline = perbarui_pipeline(sensor)
+        metode = st.radio("Metode", ["Monte Carlo (distribusi historis)", "Holt-Winters (deret waktu per jam)"], horizontal=True)
+        kolom_hari, kolom_seed, kolom_jalur = st.columns(3)
+        hari = kolom_hari.number_input("Horizon (hari)", min_value=1, max_value=90, value=30, step=1)
+        seed = kolom_seed.number_input("Seed simulasi", min_value=0, value=0, step=1)
+        jumlah_jalur = kolom_jalur.select_slider("Jumlah jalur Monte Carlo", [1000, 5000, 10000, 20000, 50000], value=10000)
+        monte_carlo = metode.startswith("Monte Carlo")
+        per_jam = st.checkbox("Tampilkan per jam", value=False, disabled=monte_carlo)
         chart_placeholder = st.empty()
-        plot_prediksi_30_hari(data, chart_placeholder)
+        if monte_carlo:
+            hasil = plot_prediksi_30_hari(pipeline.agregat.statistik(), chart_placeholder, seed=int(seed), jumlah_jalur=jumlah_jalur, hari=int(hari))
+        else:
+            hasil = plot_prediksi_deret_waktu(sensor, chart_placeholder, seed=int(seed), jumlah_jalur=jumlah_jalur,
+                                              hari=int(hari), per_jam=per_jam)
+        if hasil is not None:
+            st.caption(f"{hasil.jumlah_jalur} jalur x {hasil.langkah} titik waktu, seed {hasil.seed}, "
+                       f"disimulasikan dalam {hasil.durasi:.2f} detik. Pita = P5-P95, garis = median.")
 
 if __name__ == "__main__":
     main()
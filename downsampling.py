@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def lttb(x, y, n_keluar):
+    # Largest-Triangle-Three-Buckets (Steinarsson, 2013). Mengembalikan indeks
+    # titik yang dipertahankan; titik pertama dan terakhir selalu ikut.
+    n = len(x)
+    if n_keluar >= n or n_keluar < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    batas = np.linspace(1, n - 1, n_keluar - 1).astype(int)
+    indeks = np.empty(n_keluar, dtype=np.int64)
+    indeks[0] = 0
+    indeks[-1] = n - 1
+    a = 0
+    for i in range(n_keluar - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        awal_berikut = akhir
+        akhir_berikut = batas[i + 2] if i + 2 < len(batas) else n
+        if awal_berikut >= akhir_berikut:
+            awal_berikut, akhir_berikut = n - 1, n
+        cx = x[awal_berikut:akhir_berikut].mean()
+        cy = y[awal_berikut:akhir_berikut].mean()
+        luas = np.abs((x[a] - cx) * (y[awal:akhir] - y[a]) - (x[a] - x[awal:akhir]) * (cy - y[a]))
+        a = awal + int(np.argmax(luas))
+        indeks[i + 1] = a
+    return indeks
+
+
+def minmax(y, n_bucket):
+    # Ambil indeks nilai minimum dan maksimum di setiap bucket, sehingga lonjakan
+    # (misalnya status LOW/HIGH sesaat) tidak hilang saat data diperkecil
+    n = len(y)
+    if 2 * n_bucket >= n or n_bucket < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    batas = np.linspace(0, n, n_bucket + 1).astype(int)
+    bucket = np.repeat(np.arange(n_bucket), np.diff(batas))
+    # Argmin/argmax per bucket tanpa loop: urutkan per (bucket, nilai)
+    urut = np.lexsort((y, bucket))
+    idx_min = urut[batas[:-1]]
+    idx_max = urut[batas[1:] - 1]
+    return np.unique(np.concatenate([idx_min, idx_max]))
+
+
+def indeks_tampil(waktu, suhu, tegangan, temp_status, volt_status, maks_titik=2000):
+    # Gabungan indeks yang dipilih untuk keempat grafik, sehingga semua grafik
+    # tetap memakai sumbu waktu yang sama dan jumlah titik tidak lebih dari maks_titik
+    n = len(suhu)
+    if n <= maks_titik:
+        return np.arange(n)
+    x = np.asarray(waktu, dtype='datetime64[ns]').astype(np.int64)
+    jatah = maks_titik // 4
+    return np.unique(np.concatenate([
+        lttb(x, suhu, jatah),
+        lttb(x, tegangan, jatah),
+        minmax(temp_status, jatah // 2),
+        minmax(volt_status, jatah // 2),
+    ]))
@@ -0,0 +1,199 @@
+import numpy as np
+
+# RandomForestClassifier yang "dikompilasi" menjadi array node datar, sehingga satu
+# bacaan bisa diklasifikasi tanpa overhead predict sklearn (validasi input, joblib,
+# thread pool). Transformasi StandardScaler dilipat ke dalam ambang split, jadi input
+# yang diterima adalah nilai mentah Temperature dan Voltage.
+#
+# Hasilnya identik bit demi bit dengan scaler.transform + rf.predict:
+# - sklearn membandingkan float32((x - mean) / scale) <= ambang. Fungsi itu monoton
+#   naik terhadap x, jadi untuk setiap split ada float64 terbesar T yang masih ke kiri;
+#   T dicari dengan bisection atas urutan bit float64 (lihat _lipat_ambang).
+# - NaN mengikuti missing_go_to_left milik node, sama seperti sklearn.
+# - Probabilitas daun dinormalisasi per pohon, dijumlahkan berurutan sesuai urutan
+#   estimators_, dibagi jumlah pohon, lalu argmax (urutan operasi sama dengan sklearn
+#   untuk n_jobs=None).
+
+_BIT_TANDA = np.int64(-0x8000000000000000)
+_BIT_NILAI = np.int64(0x7FFFFFFFFFFFFFFF)
+
+
+def _ke_kunci(x):
+    # float64 -> int64 yang urutannya sama dengan urutan nilai float
+    bit = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bit >= 0, bit, -(bit & _BIT_NILAI))
+
+
+def _dari_kunci(kunci):
+    bit = np.where(kunci >= 0, kunci, (-kunci) | _BIT_TANDA)
+    return bit.astype(np.int64).view(np.float64)
+
+
+def _lipat_ambang(ambang, mean, scale):
+    # Cari float64 terbesar x dengan float32((x - mean) / scale) <= ambang
+    def ke_kiri(x):
+        with np.errstate(over='ignore'):
+            return ((x - mean) / scale).astype(np.float32) <= ambang
+
+    maks = np.finfo(np.float64).max
+    bawah = np.full(len(ambang), _ke_kunci(-maks))
+    atas = np.full(len(ambang), _ke_kunci(maks))
+    # Batas yang sudah memenuhi/ tidak memenuhi di ujung rentang
+    semua_kiri = ke_kiri(np.full(len(ambang), maks))
+    tidak_ada_kiri = ~ke_kiri(np.full(len(ambang), -maks))
+    # Invarian: ke_kiri(bawah) benar, ke_kiri(atas) salah
+    while True:
+        aktif = atas > bawah + 1
+        if not aktif.any():
+            break
+        # (bawah + atas) // 2 tanpa overflow int64
+        tengah = (bawah >> 1) + (atas >> 1) + (bawah & atas & 1)
+        kiri = ke_kiri(_dari_kunci(tengah))
+        bawah = np.where(aktif & kiri, tengah, bawah)
+        atas = np.where(aktif & ~kiri, tengah, atas)
+    hasil = _dari_kunci(bawah)
+    hasil[semua_kiri] = np.inf
+    hasil[tidak_ada_kiri] = -np.inf
+    return hasil
+
+
+class HutanKompilasi:
+
+    def __init__(self, kiri, kanan, fitur, ambang, nan_ke_kiri, proba_daun, akar, kelas, kedalaman):
+        self.kiri = kiri
+        self.kanan = kanan
+        # anak[2 * node + ke_kanan]: satu gather per tingkat, tanpa np.where
+        self.anak = np.column_stack([kiri, kanan]).ravel()
+        self.fitur = fitur
+        self.ambang = ambang
+        self.nan_ke_kiri = nan_ke_kiri
+        self.proba_daun = proba_daun
+        self.akar = akar
+        self.kelas = kelas
+        self.kedalaman = kedalaman
+
+    @classmethod
+    def dari_model(cls, rf, scaler=None):
+        kiri, kanan, fitur, ambang, nan_ke_kiri, proba, akar = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in rf.estimators_:
+            tree = estimator.tree_
+            if tree.n_outputs != 1:
+                raise ValueError("Hanya model dengan satu output yang didukung")
+            node = tree.__getstate__()['nodes']
+            daun = node['left_child'] == -1
+            # Daun menunjuk dirinya sendiri, sehingga traversal boleh berjalan terus
+            indeks = np.arange(tree.node_count) + offset
+            kiri.append(np.where(daun, indeks, node['left_child'] + offset))
+            kanan.append(np.where(daun, indeks, node['right_child'] + offset))
+            fitur.append(np.where(daun, 0, node['feature']))
+            ambang.append(np.where(daun, np.inf, node['threshold']))
+            nan_ke_kiri.append(node['missing_go_to_left'].astype(bool) & ~daun)
+            # Sama dengan DecisionTreeClassifier.predict_proba
+            nilai = tree.value[:, 0, :]
+            normalisasi = nilai.sum(axis=1)
+            normalisasi[normalisasi == 0.0] = 1.0
+            proba.append(nilai / normalisasi[:, np.newaxis])
+            akar.append(offset)
+            offset += tree.node_count
+
+        fitur = np.concatenate(fitur).astype(np.intp)
+        ambang = np.concatenate(ambang)
+        if scaler is not None:
+            mean = np.zeros(rf.n_features_in_) if scaler.mean_ is None else scaler.mean_
+            scale = np.ones(rf.n_features_in_) if scaler.scale_ is None else scaler.scale_
+            split = np.isfinite(ambang)
+            ambang[split] = _lipat_ambang(ambang[split], mean[fitur[split]], scale[fitur[split]])
+        return cls(
+            kiri=np.concatenate(kiri).astype(np.intp),
+            kanan=np.concatenate(kanan).astype(np.intp),
+            fitur=fitur,
+            ambang=ambang,
+            nan_ke_kiri=np.concatenate(nan_ke_kiri),
+            proba_daun=np.concatenate(proba),
+            akar=np.asarray(akar, dtype=np.intp),
+            kelas=np.asarray(rf.classes_),
+            kedalaman=max(e.tree_.max_depth for e in rf.estimators_),
+        )
+
+    def daun(self, X):
+        # Indeks daun (n_pohon, n_baris); semua pohon dan baris ditelusuri sekaligus,
+        # satu langkah per tingkat kedalaman
+        X = np.asarray(X, dtype=np.float64)
+        node = np.repeat(self.akar[:, np.newaxis], len(X), axis=1)
+        # Indeks datar ke X.ravel(): baris * n_fitur + fitur
+        basis = np.arange(len(X))[np.newaxis, :] * X.shape[1]
+        nilai = X.ravel()
+        ada_nan = np.isnan(nilai).any()
+        for _ in range(self.kedalaman):
+            x = nilai[basis + self.fitur[node]]
+            ke_kanan = x > self.ambang[node]
+            if ada_nan:
+                ke_kanan = np.where(np.isnan(x), ~self.nan_ke_kiri[node], ke_kanan)
+            node = self.anak[2 * node + ke_kanan]
+        return node
+
+    def prediksi_proba(self, X):
+        # Reduksi pada sumbu pohon (sumbu terluar) dijumlahkan berurutan oleh numpy,
+        # sama dengan akumulasi per estimator di sklearn
+        hasil = self.proba_daun[self.daun(X)].sum(axis=0)
+        hasil /= len(self.akar)
+        return hasil
+
+    def prediksi(self, X):
+        return self.kelas.take(np.argmax(self.prediksi_proba(X), axis=1), axis=0)
+
+
+def prediksi_status_kompilasi(suhu, tegangan, hutan_temp, hutan_volt):
+    # Pengganti prediksi_status_batch untuk nilai mentah (tanpa scaler.transform)
+    X = np.column_stack([np.asarray(suhu, dtype=float), np.asarray(tegangan, dtype=float)])
+    if len(X) == 0:
+        kosong = np.empty(0, dtype=int)
+        return kosong, kosong.copy()
+    return hutan_temp.prediksi(X), hutan_volt.prediksi(X)
+
+
+def verifikasi(scaler, rf_temp, rf_volt, jumlah=50000, seed=0):
+    # Bandingkan dengan scaler.transform + predict sklearn: titik acak di sekitar data,
+    # nilai tepat di ambang split (dan tetangga float-nya), serta NaN.
+    # Mengembalikan jumlah baris yang berbeda per model.
+    from inferensi import prediksi_status_batch
+
+    rng = np.random.default_rng(seed)
+    suhu = rng.uniform(-50, 150, jumlah)
+    tegangan = rng.uniform(0, 400, jumlah)
+    ambang_suhu, ambang_tegangan = [], []
+    for hutan in (HutanKompilasi.dari_model(rf_temp, scaler), HutanKompilasi.dari_model(rf_volt, scaler)):
+        split = np.isfinite(hutan.ambang)
+        for nilai, f in zip(hutan.ambang[split], hutan.fitur[split]):
+            tetangga = [np.nextafter(nilai, -np.inf), nilai, np.nextafter(nilai, np.inf)]
+            (ambang_suhu if f == 0 else ambang_tegangan).extend(tetangga)
+    # Nilai di ambang satu fitur dipasangkan dengan nilai acak fitur lain
+    suhu = np.concatenate([suhu, ambang_suhu, rng.uniform(-50, 150, len(ambang_tegangan)), [np.nan, 30.0, np.nan]])
+    tegangan = np.concatenate([tegangan, rng.uniform(0, 400, len(ambang_suhu)), ambang_tegangan, [220.0, np.nan, np.nan]])
+
+    temp_sk, volt_sk = prediksi_status_batch(suhu, tegangan, scaler, rf_temp, rf_volt)
+    temp_k, volt_k = prediksi_status_kompilasi(
+        suhu, tegangan, HutanKompilasi.dari_model(rf_temp, scaler), HutanKompilasi.dari_model(rf_volt, scaler))
+    return {'jumlah': len(suhu), 'beda_temp': int((temp_sk != temp_k).sum()), 'beda_volt': int((volt_sk != volt_k).sum())}
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    import joblib
+
+    scaler = joblib.load('scaler_rf.joblib')
+    rf_temp = joblib.load('temp_model.joblib')
+    rf_volt = joblib.load('volt_model.joblib')
+    hasil = verifikasi(scaler, rf_temp, rf_volt)
+    print(f"{hasil['jumlah']} baris: beda TempStatus {hasil['beda_temp']}, beda VoltStatus {hasil['beda_volt']}")
+
+    hutan_temp = HutanKompilasi.dari_model(rf_temp, scaler)
+    hutan_volt = HutanKompilasi.dari_model(rf_volt, scaler)
+    ulang = 2000
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        prediksi_status_kompilasi([30.0], [220.0], hutan_temp, hutan_volt)
+    print(f"Satu bacaan: {(time.perf_counter() - mulai) / ulang * 1e6:.0f} µs (kedua model)")
+    sys.exit(1 if hasil['beda_temp'] or hasil['beda_volt'] else 0)
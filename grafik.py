@@ -0,0 +1,169 @@
+import plotly.graph_objs as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+# Tata letak bersama untuk semua grafik, dibuat sekali sebagai template Plotly
+TEMPLATE_GRAFIK = go.layout.Template(layout=dict(
+    legend=dict(
+        title=dict(text='Parameter', font=dict(size=12, color='white')),
+        font=dict(
+            size=12,
+            color='white'
+        )
+    ),
+    hovermode='x unified',
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    xaxis=dict(
+        showgrid=True,
+        gridcolor='grey',
+        tickfont=dict(color='white'),
+        titlefont=dict(color='white')
+    ),
+    yaxis=dict(
+        showgrid=True,
+        gridcolor='grey',
+        tickfont=dict(color='white'),
+        titlefont=dict(color='white')
+    ),
+    font=dict(
+        family="Arial, sans-serif",
+        size=12,
+        color="white"
+    )
+))
+
+# (nama trace, judul grafik, judul sumbu y, warna)
+SERI_MONITORING = [
+    ('Suhu', 'Grafik Suhu', 'Nilai Suhu', 'blue'),
+    ('Tegangan', 'Grafik Tegangan', 'Nilai Tegangan', 'red'),
+    ('TempStatus', 'TempStatus Terprediksi', 'TempStatus', 'green'),
+    ('VoltStatus', 'VoltStatus Terprediksi', 'VoltStatus', 'purple'),
+]
+
+SERI_PREDIKSI = [
+    ('Suhu Prediksi', 'Grafik Prediksi Suhu', 'Nilai Suhu', 'blue'),
+    ('Tegangan Prediksi', 'Grafik Prediksi Tegangan', 'Nilai Tegangan', 'red'),
+    ('TempStatus', 'Peluang TempStatus LOW/HIGH', 'Peluang', 'green'),
+    ('VoltStatus', 'Peluang VoltStatus LOW/HIGH', 'Peluang', 'purple'),
+]
+
+# Di atas jumlah titik ini trace dirender dengan WebGL (Scattergl) tanpa marker
+BATAS_WEBGL = 1000
+
+
+def _buat_trace(nama, warna, webgl):
+    if webgl:
+        # Scattergl tidak mendukung garis spline
+        return go.Scattergl(mode='lines', name=nama, line=dict(color=warna))
+    return go.Scatter(
+        mode='lines+markers',
+        name=nama,
+        line=dict(color=warna, shape='spline'),
+        marker=dict(size=8, color=warna)
+    )
+
+
+class KumpulanGrafik:
+    # Figure dan tata letak dibuat sekali di server; setiap pembaruan hanya mengganti data x/y.
+    # plotly_chart tetap mengirim figure lengkap (data dan tata letak) ke browser setiap kali:
+    # terukur ~14 KB per refresh untuk 100 titik dan ~224 KB untuk 2000 titik (empat grafik),
+    # dengan tata letak hanya ~2.5 KB darinya. Yang dihemat adalah pembuatan figure di server.
+    # Dengan gabungan=True keempat seri digambar dalam satu figure subplot dengan sumbu x bersama.
+
+    def __init__(self, seri, gabungan=False):
+        self.seri = seri
+        self.gabungan = gabungan
+        self._placeholder = None
+        self._slot = []
+        self.slot_pesan = None
+        self._buat_figur(webgl=False)
+
+    def _buat_figur(self, webgl):
+        if self.gabungan:
+            fig = make_subplots(rows=len(self.seri), cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                                subplot_titles=[judul for _, judul, _, _ in self.seri])
+            for i, (nama, _, judul_y, warna) in enumerate(self.seri, start=1):
+                fig.add_trace(_buat_trace(nama, warna, webgl), row=i, col=1)
+                fig.update_yaxes(title_text=judul_y, row=i, col=1)
+            fig.update_xaxes(title_text='Waktu', row=len(self.seri), col=1)
+            fig.update_layout(template=TEMPLATE_GRAFIK, height=250 * len(self.seri))
+            self.figur = [fig]
+        else:
+            self.figur = []
+            for nama, judul, judul_y, warna in self.seri:
+                fig = go.Figure(layout=dict(template=TEMPLATE_GRAFIK, title=judul,
+                                            xaxis_title='Waktu', yaxis_title=judul_y))
+                fig.add_trace(_buat_trace(nama, warna, webgl))
+                self.figur.append(fig)
+        self._webgl = webgl
+
+    def _trace(self):
+        if self.gabungan:
+            return list(self.figur[0].data)
+        return [fig.data[0] for fig in self.figur]
+
+    def perbarui(self, x, daftar_y):
+        webgl = len(x) > BATAS_WEBGL
+        if webgl != self._webgl:
+            self._buat_figur(webgl)
+        for trace, y in zip(self._trace(), daftar_y):
+            trace.update(x=x, y=y)
+
+    def tampilkan(self, chart_placeholder):
+        # Slot dibuat sekali per placeholder; setelah itu grafik diganti di slot yang sama
+        # (posisinya di halaman tetap), tetapi isinya dikirim ulang seluruhnya
+        if self._placeholder is not chart_placeholder:
+            self._placeholder = chart_placeholder
+            with chart_placeholder.container():
+                self._slot = [st.empty() for _ in self.figur]
+                self.slot_pesan = st.empty()
+        for slot, fig in zip(self._slot, self.figur):
+            slot.plotly_chart(fig)
+        return self.slot_pesan
+
+
+class GrafikPita(KumpulanGrafik):
+    # Untuk hasil simulasi: dua seri pertama digambar sebagai median dengan pita P5-P95,
+    # dua seri status sebagai peluang LOW dan HIGH per hari.
+    # perbarui(x, [p95, p5, p50 suhu, p95, p5, p50 tegangan, low, high temp, low, high volt]);
+    # P5 diisi ke arah trace sebelumnya (P95) sehingga terbentuk pita
+
+    def _buat_figur(self, webgl):
+        self.figur = []
+        for i, (nama, judul, judul_y, warna) in enumerate(self.seri):
+            fig = go.Figure(layout=dict(template=TEMPLATE_GRAFIK, title=judul,
+                                        xaxis_title='Waktu', yaxis_title=judul_y))
+            if i < 2:
+                fig.add_trace(go.Scatter(mode='lines', name=f'{nama} P95', line=dict(width=0), showlegend=False))
+                fig.add_trace(go.Scatter(mode='lines', name=f'{nama} P5-P95', line=dict(width=0),
+                                         fill='tonexty', fillcolor=_transparan(warna)))
+                fig.add_trace(_buat_trace(f'{nama} (median)', warna, webgl=False))
+            else:
+                fig.add_trace(_buat_trace(f'{nama} LOW', 'orange', webgl=False))
+                fig.add_trace(_buat_trace(f'{nama} HIGH', 'red', webgl=False))
+                fig.update_yaxes(range=[0, 1], tickformat='.0%')
+            self.figur.append(fig)
+        self._webgl = webgl
+
+    def _trace(self):
+        return [trace for fig in self.figur for trace in fig.data]
+
+    def perbarui(self, x, daftar_y, keterangan='30 Hari ke Depan'):
+        # keterangan horizon ditambahkan ke judul, misalnya '7 Hari ke Depan (per jam)'
+        for fig, (_, judul, _, _) in zip(self.figur, self.seri):
+            fig.layout.title.text = f'{judul} {keterangan}'
+        for trace, y in zip(self._trace(), daftar_y):
+            trace.update(x=x, y=y)
+
+
+def _transparan(warna):
+    return {'blue': 'rgba(0,0,255,0.2)', 'red': 'rgba(255,0,0,0.2)'}.get(warna, 'rgba(128,128,128,0.2)')
+
+
+def dapatkan_grafik(nama, seri, gabungan=False, kelas=KumpulanGrafik):
+    # Satu KumpulanGrafik per sesi, disimpan di session_state agar figure dipakai ulang
+    kunci = f"grafik_{nama}_{'gabungan' if gabungan else 'terpisah'}"
+    if kunci not in st.session_state:
+        st.session_state[kunci] = kelas(seri, gabungan)
+    return st.session_state[kunci]
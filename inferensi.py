@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from forest_kompilasi import HutanKompilasi, prediksi_status_kompilasi
+
+log = logging.getLogger(__name__)
+
+FILE_MODEL = ('temp_model.joblib', 'volt_model.joblib', 'scaler_rf.joblib')
+# Model hasil latih ulang (latih_ulang.py): FOLDER_MODEL/<versi>/ berisi ketiga file FILE_MODEL,
+# FOLDER_MODEL/AKTIF berisi nama versi yang dipakai. Tanpa file AKTIF dipakai FILE_MODEL di root.
+FOLDER_MODEL = 'model'
+PENUNJUK_AKTIF = 'AKTIF'
+
+# Sampai jumlah baris ini hutan kompilasi lebih cepat dari predict sklearn
+# (terukur: 1 baris 0.35 ms vs 8 ms, 100 baris 2.8 ms vs 7.8 ms, 1000 baris 27 ms vs 13 ms)
+BATAS_KOMPILASI = 500
+
+
+def prediksi_status_batch(suhu, tegangan, scaler, rf_temp, rf_volt):
+    # Satu kali scaler.transform dan satu kali predict per model untuk semua baris
+    suhu = np.asarray(suhu, dtype=float)
+    tegangan = np.asarray(tegangan, dtype=float)
+    if len(suhu) == 0:
+        kosong = np.empty(0, dtype=int)
+        return kosong, kosong.copy()
+    data_input = pd.DataFrame({'Temperature': suhu, 'Voltage': tegangan})
+    data_input_scaled = scaler.transform(data_input)
+    temp_status = rf_temp.predict(data_input_scaled)
+    volt_status = rf_volt.predict(data_input_scaled)
+    return temp_status, volt_status
+
+
+def tanda_file(*paths):
+    # Tanda murah (mtime, ukuran) untuk mendeteksi file model yang diganti tanpa membaca isinya
+    tanda = []
+    for path in paths:
+        info = os.stat(path)
+        tanda.append((path, info.st_mtime_ns, info.st_size))
+    return tuple(tanda)
+
+
+def versi_model(*paths):
+    # Versi model diambil dari hash isi file joblib, sehingga cache otomatis
+    # tidak terpakai lagi begitu file model diganti
+    h = hashlib.md5()
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class ModelStatus:
+    # Scaler dan kedua RandomForest dimuat bersama, beserta versi file-nya
+    scaler: object
+    rf_temp: object
+    rf_volt: object
+    versi: str
+    durasi_muat: float = 0.0
+    hutan_temp: HutanKompilasi = None
+    hutan_volt: HutanKompilasi = None
+
+    def prediksi(self, suhu, tegangan):
+        # Hasil kedua jalur identik; yang dipilih hanya yang lebih cepat untuk ukuran input ini
+        if self.hutan_temp is not None and len(suhu) <= BATAS_KOMPILASI:
+            return prediksi_status_kompilasi(suhu, tegangan, self.hutan_temp, self.hutan_volt)
+        return prediksi_status_batch(suhu, tegangan, self.scaler, self.rf_temp, self.rf_volt)
+
+
+def path_model_aktif(folder=FOLDER_MODEL, bawaan=FILE_MODEL):
+    penunjuk = os.path.join(folder, PENUNJUK_AKTIF)
+    try:
+        with open(penunjuk, encoding='utf-8') as f:
+            versi = f.read().strip()
+    except FileNotFoundError:
+        return tuple(bawaan)
+    return tuple(os.path.join(folder, versi, os.path.basename(p)) for p in bawaan)
+
+
+class PengelolaModel:
+    # Memegang ModelStatus yang aktif dan menggantinya tanpa restart. Thread pemeriksa
+    # melihat tanda file (penunjuk AKTIF dan ketiga file model) setiap `interval` detik;
+    # model baru dimuat dan dikompilasi di thread itu, lalu referensinya ditukar sekaligus.
+    # Pemanggil yang sedang berjalan tetap memakai ModelStatus lama sampai selesai
+    # (ModelStatus tidak pernah diubah), pemanggil berikutnya langsung mendapat yang baru.
+
+    def __init__(self, folder=FOLDER_MODEL, bawaan=FILE_MODEL, interval=5.0):
+        self.folder = folder
+        self.bawaan = bawaan
+        self.interval = interval
+        self._tanda = None
+        self._model = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.jumlah_ganti = 0
+        self.periksa()
+
+    def _tanda_sekarang(self):
+        paths = path_model_aktif(self.folder, self.bawaan)
+        penunjuk = os.path.join(self.folder, PENUNJUK_AKTIF)
+        tanda_penunjuk = tanda_file(penunjuk) if os.path.exists(penunjuk) else None
+        return paths, (tanda_penunjuk, tanda_file(*paths))
+
+    @property
+    def model(self):
+        return self._model
+
+    def periksa(self):
+        # Mengembalikan True jika model diganti
+        with self._lock:
+            paths, tanda = self._tanda_sekarang()
+            if tanda == self._tanda:
+                return False
+            baru = muat_model(*paths)
+            if self._model is not None:
+                self.jumlah_ganti += 1
+                log.info("Model diganti: %s -> %s (%.2f detik)", self._model.versi, baru.versi, baru.durasi_muat)
+            self._model, self._tanda = baru, tanda
+            return True
+
+    def _jalankan(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.periksa()
+            except Exception as e:
+                # Misalnya file sedang ditulis; model lama tetap dipakai, dicoba lagi nanti
+                log.warning("Model baru belum bisa dimuat: %s", e)
+
+    def mulai(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._jalankan, name='pengelola-model', daemon=True)
+            self._thread.start()
+        return self
+
+
+def muat_model(path_temp='temp_model.joblib', path_volt='volt_model.joblib',
+               path_scaler='scaler_rf.joblib'):
+    # joblib (dan sklearn saat unpickle) baru diimpor di sini, bukan saat modul dimuat
+    import joblib
+    mulai = time.perf_counter()
+    rf_temp = joblib.load(path_temp)
+    rf_volt = joblib.load(path_volt)
+    scaler = joblib.load(path_scaler)
+    return ModelStatus(scaler=scaler, rf_temp=rf_temp, rf_volt=rf_volt,
+                       versi=versi_model(path_temp, path_volt, path_scaler),
+                       durasi_muat=time.perf_counter() - mulai,
+                       hutan_temp=HutanKompilasi.dari_model(rf_temp, scaler),
+                       hutan_volt=HutanKompilasi.dari_model(rf_volt, scaler))
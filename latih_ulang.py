@@ -0,0 +1,204 @@
+import argparse
+import copy
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from inferensi import FILE_MODEL, FOLDER_MODEL, PENUNJUK_AKTIF, muat_model, path_model_aktif, versi_model
+
+# Latih ulang scaler dan kedua RandomForest dari riwayat bacaan di penyimpanan lokal.
+#
+#   python latih_ulang.py                          # semua sensor di sumber_data.json, 100 pohon, semua core
+#   python latih_ulang.py --tambah-pohon 50        # warm start: model aktif + 50 pohon baru dari data terbaru
+#   python latih_ulang.py --db data_monitoring.sqlite --tanpa-aktifkan
+#
+# Label = TempStatus/VoltStatus yang dikirim perangkat (status yang diisi model oleh server
+# ingest tidak dipakai, lihat PenyimpananLokal.muat_label). 20% data terakhir (urut waktu) dipakai
+# sebagai validasi, untuk model baru dan model yang sedang aktif. Hasilnya disimpan ke
+# model/<versi>/ (ketiga file joblib + metrik.json) dan model/AKTIF diarahkan ke versi itu
+# dengan os.replace, kecuali akurasi validasinya lebih buruk dari model aktif (--paksa untuk
+# tetap mengaktifkan). Dashboard, server ingest, dan pemantau peringatan memuat versi baru
+# sendiri tanpa restart (lihat PengelolaModel di inferensi.py).
+
+KOLOM_FITUR = ['Temperature', 'Voltage']
+PARAMETER_RF = dict(n_estimators=100, random_state=42)
+
+
+def muat_data_latih(daftar_db):
+    from penyimpanan import PenyimpananLokal
+
+    data = pd.concat([PenyimpananLokal(path).muat_label() for path in daftar_db], ignore_index=True)
+    data = data.dropna(subset=KOLOM_FITUR + ['TempStatus', 'VoltStatus'])
+    data = data.drop_duplicates(subset=['Timestamp'] + KOLOM_FITUR)
+    data['TempStatus'] = data['TempStatus'].astype(int)
+    data['VoltStatus'] = data['VoltStatus'].astype(int)
+    return data.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+
+def bagi_waktu(data, proporsi_validasi=0.2):
+    # Validasi = bacaan terbaru, agar metrik mencerminkan kinerja pada data yang akan datang
+    batas = int(len(data) * (1 - proporsi_validasi))
+    return data.iloc[:batas], data.iloc[batas:]
+
+
+def evaluasi(scaler, rf, data, kolom):
+    from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+
+    if data.empty:
+        return None
+    prediksi = rf.predict(scaler.transform(data[KOLOM_FITUR]))
+    label = data[kolom].to_numpy()
+    kelas = sorted(set(rf.classes_.tolist()) | set(np.unique(label).tolist()))
+    return {
+        'akurasi': float(accuracy_score(label, prediksi)),
+        'f1_makro': float(f1_score(label, prediksi, labels=kelas, average='macro', zero_division=0)),
+        'kelas': kelas,
+        'matriks_kebingungan': confusion_matrix(label, prediksi, labels=kelas).tolist(),
+    }
+
+
+def _latih_satu(X, y, n_jobs, dasar=None, tambah_pohon=0):
+    from sklearn.ensemble import RandomForestClassifier
+
+    if dasar is None:
+        rf = RandomForestClassifier(**PARAMETER_RF, n_jobs=n_jobs)
+    else:
+        # warm_start: pohon lama dipertahankan, hanya tambah_pohon pohon baru yang dilatih
+        if set(np.unique(y).tolist()) != set(dasar.classes_.tolist()):
+            raise ValueError(f"Kelas data latih {sorted(np.unique(y).tolist())} berbeda dengan model dasar "
+                             f"{dasar.classes_.tolist()}; latih dari awal tanpa --tambah-pohon")
+        rf = copy.deepcopy(dasar)
+        rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + tambah_pohon, n_jobs=n_jobs)
+    rf.fit(X, y)
+    # Untuk prediksi, n_jobs=None (urutan akumulasi sama dengan hutan kompilasi, tanpa thread pool)
+    rf.set_params(warm_start=False, n_jobs=None)
+    return rf
+
+
+def latih(data, n_jobs=-1, dasar=None, tambah_pohon=0, proporsi_validasi=0.2):
+    # dasar: ModelStatus untuk warm start (scaler-nya dipakai apa adanya, karena ambang
+    # pohon lama bergantung pada skala itu)
+    from sklearn.preprocessing import StandardScaler
+
+    latih_data, validasi = bagi_waktu(data, proporsi_validasi)
+    if latih_data.empty:
+        raise ValueError("Tidak ada data berlabel untuk dilatih")
+    mulai = time.perf_counter()
+    if dasar is None:
+        scaler = StandardScaler().fit(latih_data[KOLOM_FITUR])
+    else:
+        scaler = dasar.scaler
+    X = scaler.transform(latih_data[KOLOM_FITUR])
+    rf_temp = _latih_satu(X, latih_data['TempStatus'].to_numpy(), n_jobs,
+                          dasar.rf_temp if dasar is not None else None, tambah_pohon)
+    rf_volt = _latih_satu(X, latih_data['VoltStatus'].to_numpy(), n_jobs,
+                          dasar.rf_volt if dasar is not None else None, tambah_pohon)
+    metrik = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'durasi_latih': time.perf_counter() - mulai,
+        'jumlah_latih': len(latih_data),
+        'jumlah_validasi': len(validasi),
+        'rentang_latih': [str(latih_data['Timestamp'].min()), str(latih_data['Timestamp'].max())],
+        'rentang_validasi': [str(validasi['Timestamp'].min()), str(validasi['Timestamp'].max())] if len(validasi) else None,
+        'n_pohon': len(rf_temp.estimators_),
+        'warm_start_dari': dasar.versi if dasar is not None else None,
+        'temp': evaluasi(scaler, rf_temp, validasi, 'TempStatus'),
+        'volt': evaluasi(scaler, rf_volt, validasi, 'VoltStatus'),
+    }
+    return scaler, rf_temp, rf_volt, metrik
+
+
+def simpan_versi(scaler, rf_temp, rf_volt, metrik, folder=FOLDER_MODEL):
+    # Ditulis ke folder sementara lalu di-rename, sehingga folder versi selalu lengkap
+    import joblib
+
+    nama = datetime.now().strftime('%Y%m%d-%H%M%S')
+    tujuan = os.path.join(folder, nama)
+    sementara = tujuan + '.tmp'
+    os.makedirs(sementara, exist_ok=True)
+    paths = [os.path.join(sementara, f) for f in FILE_MODEL]
+    for objek, path in zip((rf_temp, rf_volt, scaler), paths):
+        joblib.dump(objek, path)
+    metrik = dict(metrik, versi=nama, hash=versi_model(*paths))
+    with open(os.path.join(sementara, 'metrik.json'), 'w', encoding='utf-8') as f:
+        json.dump(metrik, f, indent=2)
+    os.replace(sementara, tujuan)
+    return nama
+
+
+def aktifkan(nama, folder=FOLDER_MODEL):
+    # Penunjuk diganti secara atomik; pembaca melihat versi lama atau baru, tidak pernah setengah
+    sementara = os.path.join(folder, PENUNJUK_AKTIF + '.tmp')
+    with open(sementara, 'w', encoding='utf-8') as f:
+        f.write(nama + '\n')
+    os.replace(sementara, os.path.join(folder, PENUNJUK_AKTIF))
+
+
+def hapus_versi_lama(simpan=5, folder=FOLDER_MODEL):
+    # Sisakan `simpan` versi terbaru, versi aktif tidak pernah dihapus
+    aktif = os.path.basename(os.path.dirname(path_model_aktif(folder)[0]))
+    daftar = sorted(d for d in os.listdir(folder)
+                    if os.path.isdir(os.path.join(folder, d)) and not d.endswith('.tmp'))
+    for nama in daftar[:-simpan]:
+        if nama != aktif:
+            shutil.rmtree(os.path.join(folder, nama))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latih ulang model status dari riwayat bacaan")
+    parser.add_argument('--db', action='append', help="File penyimpanan lokal (boleh lebih dari satu); "
+                                                      "bawaan: semua sumber di sumber_data.json")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Jumlah core untuk pelatihan (-1 = semua)")
+    parser.add_argument('--tambah-pohon', type=int, default=0,
+                        help="Warm start: tambahkan sejumlah pohon ke model aktif alih-alih melatih dari awal")
+    parser.add_argument('--validasi', type=float, default=0.2)
+    parser.add_argument('--tanpa-aktifkan', action='store_true', help="Simpan versi tanpa mengaktifkannya")
+    parser.add_argument('--paksa', action='store_true', help="Aktifkan walaupun akurasi validasi lebih buruk")
+    parser.add_argument('--simpan', type=int, default=5, help="Jumlah versi yang disimpan")
+    args = parser.parse_args()
+
+    daftar_db = args.db
+    if not daftar_db:
+        from sumber_data import muat_sumber
+        daftar_db = [s.path_db for s in muat_sumber('sumber_data.json', default_url=None)]
+    data = muat_data_latih(daftar_db)
+    print(f"{len(data)} bacaan berlabel dari {', '.join(daftar_db)}")
+
+    aktif = muat_model(*path_model_aktif())
+    dasar = aktif if args.tambah_pohon > 0 else None
+    scaler, rf_temp, rf_volt, metrik = latih(data, n_jobs=args.n_jobs, dasar=dasar,
+                                            tambah_pohon=args.tambah_pohon, proporsi_validasi=args.validasi)
+    _, validasi = bagi_waktu(data, args.validasi)
+    metrik['model_aktif'] = {
+        'versi': aktif.versi,
+        'temp': evaluasi(aktif.scaler, aktif.rf_temp, validasi, 'TempStatus'),
+        'volt': evaluasi(aktif.scaler, aktif.rf_volt, validasi, 'VoltStatus'),
+    }
+    nama = simpan_versi(scaler, rf_temp, rf_volt, metrik)
+    print(f"Versi {nama}: {metrik['n_pohon']} pohon, {metrik['jumlah_latih']} baris latih, "
+          f"{metrik['durasi_latih']:.1f} detik")
+    for kolom in ('temp', 'volt'):
+        baru, lama = metrik[kolom], metrik['model_aktif'][kolom]
+        if baru is not None:
+            print(f"  {kolom}: akurasi {baru['akurasi']:.4f} (aktif {lama['akurasi']:.4f}), "
+                  f"F1 makro {baru['f1_makro']:.4f} (aktif {lama['f1_makro']:.4f})")
+
+    lebih_buruk = any(
+        metrik[k] is not None and metrik[k]['akurasi'] < metrik['model_aktif'][k]['akurasi'] for k in ('temp', 'volt'))
+    if args.tanpa_aktifkan:
+        print(f"Tidak diaktifkan; aktifkan manual dengan menulis '{nama}' ke {os.path.join(FOLDER_MODEL, PENUNJUK_AKTIF)}")
+    elif lebih_buruk and not args.paksa:
+        print("Tidak diaktifkan: akurasi validasi lebih buruk dari model aktif (--paksa untuk tetap mengaktifkan)")
+    else:
+        aktifkan(nama)
+        print(f"Versi {nama} aktif")
+    hapus_versi_lama(args.simpan)
+
+
+if __name__ == '__main__':
+    main()
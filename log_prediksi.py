@@ -0,0 +1,247 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Log hasil prediksi per bacaan, pengganti print per baris. Jalur render hanya memasukkan
+# array ke antrian (tidak menunggu disk); thread penulis mengurasnya per interval dan membuang
+# bacaan yang sudah pernah dicatat. CSV ditambahkan ke file yang dirotasi per jumlah baris dan
+# di-fsync setiap interval. Parquet (jika pyarrow tersedia) baru punya footer setelah file
+# ditutup, jadi bacaannya dikumpulkan di memori dan ditulis sebagai satu file tertutup setiap
+# interval_file detik (lewat file sementara, sehingga file setengah jadi tidak pernah terbaca).
+# Isinya bisa dibaca lagi dengan baca_log untuk analisis drift atau bahan latih ulang.
+#
+# Bacaan yang sudah dicatat dikenali dari batas atas Timestamp per (sensor, versi model):
+# hanya bacaan yang lebih baru dari batas itu yang ditulis (bacaan dengan Timestamp yang sama
+# dibedakan dari suhu/tegangannya). Batas disimpan di BERKAS_BATAS di folder log, sehingga
+# prediksi ulang seluruh riwayat (pembangunan ulang pipeline, restart aplikasi) tidak menulis
+# ulang log. Bacaan yang datang terlambat dengan Timestamp lebih lama dari batas tidak dicatat.
+# Berkas batas baru diperbarui setelah bacaannya tersimpan di disk: bacaan yang hilang karena
+# proses berhenti mendadak dicatat lagi saat riwayat diprediksi ulang setelah restart.
+
+KOLOM_LOG = ['Timestamp', 'sensor', 'Temperature', 'Voltage', 'TempStatus', 'VoltStatus', 'versi_model', 'waktu_catat']
+BERKAS_BATAS = 'batas.json'
+
+
+def _ada_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LogPrediksi:
+
+    def __init__(self, folder='log_prediksi', format=None, maks_baris_per_file=200000, interval=5.0,
+                 kapasitas_antrian=10000, interval_file=300.0):
+        self.folder = folder
+        self.format = format or ('parquet' if _ada_pyarrow() else 'csv')
+        self.maks_baris_per_file = maks_baris_per_file
+        self.interval = interval
+        self.interval_file = interval_file
+        self._antrian = queue.Queue(maxsize=kapasitas_antrian)
+        # (sensor, versi) -> (Timestamp terakhir yang ditulis dalam ns, {(Temperature, Voltage)}
+        # bacaan yang sudah ditulis pada Timestamp itu)
+        self._batas = {}
+        self._path = None
+        # Bacaan yang sudah lolos saringan tetapi belum tersimpan di disk
+        self._tertunda = []
+        self._waktu_tulis = time.monotonic()
+        self._baris_file = 0
+        self._nomor_file = 0
+        self.jumlah_ditulis = 0
+        self.jumlah_duplikat = 0
+        self.jumlah_dibuang = 0
+        self._berhenti = threading.Event()
+        os.makedirs(folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._jalankan, name='log-prediksi', daemon=True)
+        self._thread.start()
+        atexit.register(self.tutup)
+
+    def catat(self, waktu, suhu, tegangan, temp_status, volt_status, versi, sensor=''):
+        # Dipanggil dari jalur render/poller: tidak pernah blok. Jika antrian penuh
+        # (disk macet), batch ini dibuang dan dihitung di jumlah_dibuang.
+        try:
+            self._antrian.put_nowait((waktu, suhu, tegangan, temp_status, volt_status, versi, sensor, datetime.now()))
+        except queue.Full:
+            self.jumlah_dibuang += len(suhu)
+
+    def _muat_batas(self):
+        # Bacaan yang sudah ada di log dari proses sebelumnya tidak dicatat lagi
+        # (poller memprediksi ulang seluruh riwayat setiap kali aplikasi start)
+        path = os.path.join(self.folder, BERKAS_BATAS)
+        if os.path.exists(path):
+            with open(path) as f:
+                for b in json.load(f):
+                    self._batas[(b['sensor'], b['versi_model'])] = (b['Timestamp'], {tuple(k) for k in b['kunci']})
+            return
+        # Log lama tanpa berkas batas: batas dihitung sekali dari isi log
+        self._perbarui_batas(baca_log(self.folder))
+
+    def _simpan_batas(self):
+        isi = [{'sensor': sensor, 'versi_model': versi, 'Timestamp': waktu, 'kunci': sorted(kunci)}
+               for (sensor, versi), (waktu, kunci) in self._batas.items()]
+        path = os.path.join(self.folder, BERKAS_BATAS)
+        sementara = path + '.tmp'
+        with open(sementara, 'w') as f:
+            json.dump(isi, f)
+        os.replace(sementara, path)
+
+    def _perbarui_batas(self, data):
+        if data.empty:
+            return
+        for (sensor, versi), bagian in data.groupby(['sensor', 'versi_model'], sort=False, dropna=False):
+            waktu = bagian['Timestamp'].to_numpy().view(np.int64)
+            terakhir = int(waktu.max())
+            pada = bagian[waktu == terakhir]
+            kunci = set(zip(pada['Temperature'].tolist(), pada['Voltage'].tolist()))
+            lama, kunci_lama = self._batas.get((sensor, versi), (None, set()))
+            if lama == terakhir:
+                kunci |= kunci_lama
+            elif lama is not None and lama > terakhir:
+                continue
+            self._batas[(sensor, versi)] = (terakhir, kunci)
+
+    def _saring_baru(self, data):
+        # True untuk bacaan yang belum pernah dicatat
+        baru = np.ones(len(data), dtype=bool)
+        waktu = data['Timestamp'].to_numpy().view(np.int64)
+        kelompok = data.groupby(['sensor', 'versi_model'], sort=False, dropna=False).indices
+        for kunci_kelompok, posisi in kelompok.items():
+            batas = self._batas.get(kunci_kelompok)
+            if batas is None:
+                continue
+            terakhir, kunci = batas
+            baru[posisi] = waktu[posisi] > terakhir
+            for i in posisi[waktu[posisi] == terakhir]:
+                baru[i] = (data['Temperature'].iat[i], data['Voltage'].iat[i]) not in kunci
+        return baru
+
+    def _jalankan(self):
+        try:
+            self._muat_batas()
+        except Exception:
+            log.exception("Log prediksi lama di %s tidak bisa dibaca", self.folder)
+        while True:
+            berhenti = self._berhenti.wait(self.interval)
+            try:
+                self._kuras(paksa=berhenti)
+            except Exception:
+                log.exception("Log prediksi gagal ditulis ke %s", self.folder)
+            if berhenti:
+                break
+
+    def _kuras(self, paksa=False):
+        bagian = []
+        while True:
+            try:
+                waktu, suhu, tegangan, temp_status, volt_status, versi, sensor, waktu_catat = self._antrian.get_nowait()
+            except queue.Empty:
+                break
+            n = len(suhu)
+            if not n:
+                continue
+            bagian.append(pd.DataFrame({
+                'Timestamp': pd.DatetimeIndex(waktu),
+                'sensor': sensor,
+                'Temperature': np.asarray(suhu, dtype=float),
+                'Voltage': np.asarray(tegangan, dtype=float),
+                'TempStatus': np.asarray(temp_status, dtype=np.int8),
+                'VoltStatus': np.asarray(volt_status, dtype=np.int8),
+                'versi_model': versi,
+                'waktu_catat': pd.Timestamp(waktu_catat),
+            }, index=pd.RangeIndex(n)))
+        if bagian:
+            data = pd.concat(bagian, ignore_index=True)
+            unik = ~data.duplicated(['sensor', 'Timestamp', 'Temperature', 'Voltage', 'versi_model']).to_numpy()
+            unik &= self._saring_baru(data)
+            self.jumlah_duplikat += int((~unik).sum())
+            if unik.any():
+                data = data[unik].reset_index(drop=True)
+                self._tertunda.append(data)
+                # Batas di memori langsung maju agar batch berikutnya tidak menulis ulang bacaan ini
+                self._perbarui_batas(data)
+        if not self._tertunda:
+            return
+        if self.format == 'parquet' and not paksa and time.monotonic() - self._waktu_tulis < self.interval_file:
+            return
+        # Jika penulisan gagal, bacaan tetap tertunda dan dicoba lagi pada putaran berikutnya
+        self._tulis(pd.concat(self._tertunda, ignore_index=True))
+        self._tertunda = []
+        self._waktu_tulis = time.monotonic()
+        self._simpan_batas()
+
+    def _rotasi(self):
+        self._nomor_file += 1
+        nama = f"prediksi_{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}_{self._nomor_file:04d}.{self.format}"
+        self._path = os.path.join(self.folder, nama)
+        self._baris_file = 0
+
+    def _tulis(self, data):
+        if self.format == 'parquet':
+            # Satu file tertutup (dengan footer) per penulisan
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._rotasi()
+            sementara = self._path + '.tmp'
+            with open(sementara, 'wb') as f:
+                pq.write_table(pa.Table.from_pandas(data, preserve_index=False), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(sementara, self._path)
+        else:
+            if self._path is None or self._baris_file >= self.maks_baris_per_file:
+                self._rotasi()
+            with open(self._path, 'a', newline='') as f:
+                data.to_csv(f, header=self._baris_file == 0, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+        self._baris_file += len(data)
+        self.jumlah_ditulis += len(data)
+
+    def tutup(self):
+        # Sisa antrian ditulis oleh thread penulis sebelum berhenti
+        if self._berhenti.is_set():
+            return
+        self._berhenti.set()
+        self._thread.join()
+
+    def statistik(self):
+        return {
+            'ditulis': self.jumlah_ditulis,
+            'duplikat': self.jumlah_duplikat,
+            'dibuang': self.jumlah_dibuang,
+            'antrian': self._antrian.qsize(),
+            'tertunda': sum(len(d) for d in self._tertunda),
+            'file': self._path,
+        }
+
+
+def baca_log(folder='log_prediksi', sensor=None):
+    # Gabungkan semua file log (CSV dan Parquet) menjadi satu DataFrame urut waktu
+    bagian = []
+    for path in sorted(glob.glob(os.path.join(folder, 'prediksi_*.*'))):
+        if path.endswith('.parquet'):
+            bagian.append(pd.read_parquet(path))
+        elif path.endswith('.csv'):
+            bagian.append(pd.read_csv(path, parse_dates=['Timestamp', 'waktu_catat'],
+                                      dtype={'sensor': str, 'versi_model': str}, keep_default_na=False,
+                                      float_precision='round_trip'))
+    if not bagian:
+        return pd.DataFrame(columns=KOLOM_LOG)
+    data = pd.concat(bagian, ignore_index=True)
+    if sensor is not None:
+        data = data[data['sensor'] == sensor]
+    return data.sort_values('Timestamp', kind='stable').reset_index(drop=True)
@@ -0,0 +1,179 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrik ringan untuk setiap tahap pipeline: durasi per tahap (histogram) dan penghitung
+# (baris masuk, outlier, prediksi, panggilan API). Satu registri per proses (METRIK),
+# ditampilkan di panel Diagnostik sidebar dan di /metrics (format teks Prometheus) serta
+# /metrics.json pada server ingest, atau pada ServerMetrik untuk proses tanpa server ingest.
+#
+#   with METRIK.ukur('pembersihan'):
+#       ...
+#   METRIK.tambah('baris_outlier', n)
+#
+# METRIK=0 di environment menonaktifkan semuanya: ukur() mengembalikan context manager
+# kosong yang sama setiap kali dan tambah() langsung kembali, tanpa memanggil jam maupun lock.
+
+# Batas atas bucket histogram (detik), seperti bucket bawaan klien Prometheus
+BATAS_DETIK = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+_KOSONG = nullcontext()
+
+
+class Histogram:
+
+    def __init__(self, batas=BATAS_DETIK):
+        self.batas = batas
+        self.per_bucket = [0] * len(batas)
+        self.jumlah = 0
+        self.total = 0.0
+        self.maks = 0.0
+
+    def amati(self, x):
+        self.per_bucket[bisect.bisect_left(self.batas, x)] += 1
+        self.jumlah += 1
+        self.total += x
+        if x > self.maks:
+            self.maks = x
+
+    def kuantil(self, p):
+        # Interpolasi linear di dalam bucket, sama dengan histogram_quantile di Prometheus;
+        # bucket terakhir (inf) memakai nilai maksimum yang teramati
+        if not self.jumlah:
+            return math.nan
+        target = p * self.jumlah
+        kumulatif = 0
+        for i, n in enumerate(self.per_bucket):
+            if n and kumulatif + n >= target:
+                bawah = self.batas[i - 1] if i else 0.0
+                atas = min(self.batas[i], self.maks)
+                return bawah + (atas - bawah) * (target - kumulatif) / n
+            kumulatif += n
+        return self.maks
+
+
+class _Pengukur:
+    __slots__ = ('metrik', 'tahap', 'mulai')
+
+    def __init__(self, metrik, tahap):
+        self.metrik = metrik
+        self.tahap = tahap
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *galat):
+        self.metrik.amati(self.tahap, time.perf_counter() - self.mulai)
+        return False
+
+
+class Metrik:
+
+    def __init__(self, aktif=True, awalan='monitoring'):
+        self.aktif = aktif
+        self.awalan = awalan
+        self._lock = threading.Lock()
+        self._histogram = {}
+        self._penghitung = {}
+
+    def ukur(self, tahap):
+        if not self.aktif:
+            return _KOSONG
+        return _Pengukur(self, tahap)
+
+    def amati(self, tahap, detik):
+        if not self.aktif:
+            return
+        with self._lock:
+            histogram = self._histogram.get(tahap)
+            if histogram is None:
+                histogram = self._histogram[tahap] = Histogram()
+            histogram.amati(detik)
+
+    def tambah(self, nama, n=1):
+        if not self.aktif or not n:
+            return
+        with self._lock:
+            self._penghitung[nama] = self._penghitung.get(nama, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self._histogram.clear()
+            self._penghitung.clear()
+
+    def ringkasan(self):
+        with self._lock:
+            tahap = {
+                nama: {
+                    'jumlah': h.jumlah,
+                    'total_detik': h.total,
+                    'rata_detik': h.total / h.jumlah,
+                    'p50_detik': h.kuantil(0.5),
+                    'p95_detik': h.kuantil(0.95),
+                    'maks_detik': h.maks,
+                }
+                for nama, h in sorted(self._histogram.items())
+            }
+            return {'aktif': self.aktif, 'tahap': tahap, 'penghitung': dict(sorted(self._penghitung.items()))}
+
+    def ke_prometheus(self):
+        # Format eksposisi teks Prometheus 0.0.4; bucket dikumulatifkan saat ekspor
+        nama_histogram = f'{self.awalan}_tahap_detik'
+        baris = [f'# HELP {nama_histogram} Durasi tahap pipeline dalam detik',
+                 f'# TYPE {nama_histogram} histogram']
+        with self._lock:
+            for tahap, h in sorted(self._histogram.items()):
+                kumulatif = 0
+                for batas, n in zip(h.batas, h.per_bucket):
+                    kumulatif += n
+                    le = '+Inf' if math.isinf(batas) else repr(batas)
+                    baris.append(f'{nama_histogram}_bucket{{tahap="{tahap}",le="{le}"}} {kumulatif}')
+                baris.append(f'{nama_histogram}_sum{{tahap="{tahap}"}} {h.total!r}')
+                baris.append(f'{nama_histogram}_count{{tahap="{tahap}"}} {h.jumlah}')
+            for nama, nilai in sorted(self._penghitung.items()):
+                baris.append(f'# TYPE {self.awalan}_{nama}_total counter')
+                baris.append(f'{self.awalan}_{nama}_total {nilai}')
+        return '\n'.join(baris) + '\n'
+
+
+class ServerMetrik:
+    # Listener HTTP kecil yang hanya menyajikan /metrics dan /metrics.json, untuk dashboard
+    # yang tidak menjalankan server ingest. Bawaannya hanya menerima koneksi dari komputer ini.
+
+    def __init__(self, metrik, host='127.0.0.1', port=9108):
+        class Penangan(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    data, jenis = metrik.ke_prometheus().encode(), 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    data, jenis = json.dumps(metrik.ringkasan()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', jenis)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Penangan)
+        self.url = f"http://{host}:{self.server.server_address[1]}/metrics"
+
+    def mulai_di_thread(self):
+        threading.Thread(target=self.server.serve_forever, name='server-metrik', daemon=True).start()
+        return self
+
+    def hentikan(self):
+        self.server.shutdown()
+
+
+METRIK = Metrik(aktif=os.environ.get('METRIK', '1') != '0')
@@ -2,6 +2,7 @@
 #include <LiquidCrystal_I2C.h>
 #include <ESP8266WiFi.h>
 #include <WiFiClientSecure.h>
+#include <ESP8266HTTPClient.h>
 #include <Adafruit_MLX90614.h>
 #include <math.h>
 #include <RTClib.h>
@@ -18,6 +19,12 @@ const char* host = "script.google.com";
 const int httpsPort = 443;
 const char* googleScriptId = "AKfycbzaPuB7GuMhKg0i9idfXV6S8e03FhJfuZVM50COGOgIfPMcbL3-455NkpV6sA9-tCou"; // Replace with your Google Script ID
 
+// Local ingest server (server_ingest.py) on the LAN
+const bool useLocalIngest = false; // true = send readings to server_ingest.py instead of Google Apps Script
+const char* ingestHost = ""; // IP address of the PC running server_ingest.py (required when useLocalIngest is true)
+const int ingestPort = 8765;
+const int maxBufferedReadings = 5; // readings kept while the ingest server cannot be reached
+
 // SHA1 fingerprint of the certificate
 const char* fingerprint = "5A:DA:6A:A7:18:DA:E0:89:56:E6:D0:10:8F:43:AA:03:9F:70:8F:BF";
 
@@ -41,6 +48,17 @@ float FinalRMSVoltage; // final voltage value with offset value
 float voltageOffset1 = 0.00; // to Offset deviation and accuracy. Offset any fake current when no current operates.
 float voltageOffset2 = 0.00; // too offset value due to calculation error from squared and square root
 
+// Readings not yet accepted by the local ingest server
+struct Reading {
+    int temperature;
+    float voltage;
+    int tempStatus;
+    int voltStatus;
+    unsigned long takenAt; // millis() when the reading was taken
+};
+Reading readingBuffer[maxBufferedReadings];
+int bufferedReadings = 0;
+
 // Variables for display control
 unsigned long previousMillis = 0;
 const long interval = 2000; // Interval for switching display (2 seconds)
@@ -137,7 +155,11 @@ void loop() {
         Serial.print("\tVolt Status: ");
         Serial.println(voltStatus);
 
-        sendData(elapsedTime, Temperature, FinalRMSVoltage, tempStatus, voltStatus);
+        if (useLocalIngest && strlen(ingestHost) > 0) {
+            bufferReading(Temperature, FinalRMSVoltage, tempStatus, voltStatus);
+        } else {
+            sendData(elapsedTime, Temperature, FinalRMSVoltage, tempStatus, voltStatus);
+        }
         
         // Update display based on the interval
         unsigned long currentMillis = millis();
@@ -244,3 +266,57 @@ void sendData(String elapsedTime, int Temperature, float Voltage, int tempStatus
     Serial.println("==========");
     Serial.println("Closing connection");
 }
+
+void bufferReading(int Temperature, float Voltage, int tempStatus, int voltStatus) {
+    if (bufferedReadings == maxBufferedReadings) {
+        // Server unreachable for a while: drop the oldest reading
+        for (int i = 1; i < maxBufferedReadings; i++) {
+            readingBuffer[i - 1] = readingBuffer[i];
+        }
+        bufferedReadings--;
+    }
+
+    readingBuffer[bufferedReadings].temperature = Temperature;
+    readingBuffer[bufferedReadings].voltage = Voltage;
+    readingBuffer[bufferedReadings].tempStatus = tempStatus;
+    readingBuffer[bufferedReadings].voltStatus = voltStatus;
+    readingBuffer[bufferedReadings].takenAt = millis();
+    bufferedReadings++;
+
+    // Send right away; readings from failed attempts are sent along with this one
+    sendBatch();
+}
+
+void sendBatch() {
+    WiFiClient plainClient;
+    HTTPClient http;
+    String url = "http://" + String(ingestHost) + ":" + String(ingestPort) + "/ingest";
+
+    // umur_ms tells the server how old each reading is, so it can timestamp them
+    unsigned long now = millis();
+    String body = "[";
+    for (int i = 0; i < bufferedReadings; i++) {
+        if (i > 0) {
+            body += ",";
+        }
+        body += "{\"Temperature\":" + String(readingBuffer[i].temperature);
+        body += ",\"Voltage\":" + String(readingBuffer[i].voltage, decimalPrecision);
+        body += ",\"TempStatus\":" + String(readingBuffer[i].tempStatus);
+        body += ",\"VoltStatus\":" + String(readingBuffer[i].voltStatus);
+        body += ",\"umur_ms\":" + String(now - readingBuffer[i].takenAt) + "}";
+    }
+    body += "]";
+
+    http.begin(plainClient, url);
+    http.addHeader("Content-Type", "application/json");
+    int httpCode = http.POST(body);
+    if (httpCode == HTTP_CODE_OK) {
+        Serial.print("Batch sent: ");
+        Serial.println(http.getString());
+        bufferedReadings = 0;
+    } else {
+        Serial.print("Batch failed, HTTP code: ");
+        Serial.println(httpCode);
+    }
+    http.end();
+}
@@ -0,0 +1,144 @@
+import time
+
+import pandas as pd
+
+from metrik import METRIK
+from pengurai_sheet import FORMAT_WAKTU_SHEET, urai_nilai
+
+FILE_KREDENSIAL = 'data-monitoring-424622-f89eeef34709.json'
+
+
+def buat_client(ukuran_pool=None, kredensial=FILE_KREDENSIAL):
+    # Client Google Sheets API dari service account. gspread/oauth2client baru diimpor di sini.
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    creds = ServiceAccountCredentials.from_json_keyfile_name(kredensial, scope)
+    client = gspread.authorize(creds)
+    if ukuran_pool:
+        # Satu client gspread dipakai bersama oleh thread pekerja; pool koneksinya
+        # diperbesar agar semua sheet bisa diambil bersamaan
+        from requests.adapters import HTTPAdapter
+        client.http_client.session.mount('https://', HTTPAdapter(pool_connections=ukuran_pool,
+                                                                 pool_maxsize=ukuran_pool))
+    return client
+
+
+def buat_pembaca(sumber, dapatkan_client):
+    # Pembaca untuk satu SumberData; sheet baru dibuka saat pertama kali dibaca
+    def buka_sheet():
+        spreadsheet = dapatkan_client().open_by_url(sumber.sheet_url)
+        return spreadsheet.worksheet(sumber.worksheet) if sumber.worksheet else spreadsheet.sheet1
+
+    return PembacaSheetInkremental(buka_sheet=buka_sheet, format_waktu=sumber.format_waktu,
+                                   zona_waktu=sumber.zona_waktu)
+
+
+class PembacaSheetInkremental:
+    # Membaca Google Sheet secara bertahap: hanya baris baru yang diambil lewat
+    # range read dan dikembalikan sebagai baris_baru; riwayatnya disimpan oleh
+    # PenyimpananLokal, bukan di sini. Secara berkala dilakukan pembacaan penuh
+    # (rekonsiliasi, penuh=True) untuk menangkap baris yang diedit atau dihapus
+    # langsung di sheet.
+    #
+    # Isi yang sudah dibaca diringkas sebagai (jumlah baris, hash bergulir semua baris
+    # mentah). Jika baris-baris awal hasil rekonsiliasi sama dengan ringkasan itu, tidak ada
+    # yang diedit: baris sesudahnya ditambahkan seperti pembacaan inkremental, sehingga
+    # penyimpanan dan pipeline tidak dibangun ulang.
+    # hash() string diacak per proses, jadi ringkasan ini hanya berlaku di memori.
+
+    def __init__(self, sheet=None, interval_rekonsiliasi=300, buka_sheet=None,
+                 format_waktu=FORMAT_WAKTU_SHEET, zona_waktu=None):
+        # buka_sheet: fungsi tanpa argumen yang membuka worksheet saat pertama kali
+        # dibutuhkan, sehingga banyak sheet bisa dibuka bersamaan dari thread pekerja.
+        # format_waktu/zona_waktu: cara mengurai kolom Timestamp (lihat pengurai_sheet.py)
+        self._sheet = sheet
+        self._buka_sheet = buka_sheet
+        self.format_waktu = format_waktu
+        self.zona_waktu = zona_waktu
+        self.interval_rekonsiliasi = interval_rekonsiliasi
+        self.header = []
+        self.baris_terakhir = 1  # baris 1 adalah header
+        self.waktu_rekonsiliasi = None
+        self.baris_baru = pd.DataFrame()
+        self.penuh = False
+        self.hash_isi = 0
+        self.jumlah_panggilan_api = 0
+
+    @property
+    def sheet(self):
+        if self._sheet is None:
+            with METRIK.ukur('sheet_buka'):
+                self._sheet = self._buka_sheet()
+            self.jumlah_panggilan_api += 1
+            METRIK.tambah('panggilan_api')
+        return self._sheet
+
+    def _urai(self, values):
+        with METRIK.ukur('urai_sheet'):
+            return urai_nilai(self.header, values, self.format_waktu, self.zona_waktu)
+
+    def _hash_baris(self, hash_awal, values, lebar):
+        for row in values:
+            row = tuple(row[:lebar]) + ('',) * (lebar - len(row))
+            hash_awal = hash((hash_awal, row))
+        return hash_awal
+
+    def perlu_rekonsiliasi(self):
+        if self.waktu_rekonsiliasi is None or not self.header:
+            return True
+        return time.monotonic() - self.waktu_rekonsiliasi >= self.interval_rekonsiliasi
+
+    def rekonsiliasi(self):
+        # Pembacaan penuh: baris_baru berisi seluruh isi sheet saat ini
+        sheet = self.sheet
+        with METRIK.ukur('sheet_baca_penuh'):
+            entire_sheet = sheet.get_values()
+        self.jumlah_panggilan_api += 1
+        METRIK.tambah('panggilan_api')
+        self.waktu_rekonsiliasi = time.monotonic()
+        if entire_sheet == [[]] or not entire_sheet:
+            self.header = []
+            self.baris_baru = pd.DataFrame()
+            self.baris_terakhir = 1
+            self.hash_isi = 0
+        else:
+            header = entire_sheet[0]
+            if header == self.header and len(entire_sheet) >= self.baris_terakhir:
+                awalan = self._hash_baris(0, entire_sheet[1:self.baris_terakhir], len(header))
+                if awalan == self.hash_isi:
+                    # Baris yang sudah dibaca tidak diedit atau dihapus; sisanya baris baru
+                    METRIK.tambah('rekonsiliasi_tanpa_perubahan')
+                    self._tambahkan(entire_sheet[self.baris_terakhir:])
+                    return
+            self.header = header
+            self.hash_isi = self._hash_baris(0, entire_sheet[1:], len(header))
+            self.baris_baru = self._urai(entire_sheet[1:])
+            self.baris_terakhir = len(entire_sheet)
+        self.penuh = True
+
+    def ambil_baris_baru(self):
+        # Range read mulai dari baris setelah baris terakhir yang sudah dibaca
+        from gspread.utils import rowcol_to_a1
+        kolom_akhir = rowcol_to_a1(1, len(self.header)).rstrip("0123456789")
+        sheet = self.sheet
+        with METRIK.ukur('sheet_baca_baru'):
+            values = sheet.get_values(f"A{self.baris_terakhir + 1}:{kolom_akhir}")
+        self.jumlah_panggilan_api += 1
+        METRIK.tambah('panggilan_api')
+        if values == [[]]:
+            values = []
+        self._tambahkan(values)
+
+    def _tambahkan(self, values):
+        self.baris_terakhir += len(values)
+        self.hash_isi = self._hash_baris(self.hash_isi, values, len(self.header))
+        self.baris_baru = self._urai(values)
+        self.penuh = False
+
+    def baca(self):
+        if self.perlu_rekonsiliasi():
+            self.rekonsiliasi()
+        else:
+            self.ambil_baris_baru()
+        return self.baris_baru
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+# Dua minggu data 1 Hz, sama dengan kapasitas riwayat pipeline
+KAPASITAS_UNIK = 14 * 24 * 3600
+
+
+class SketsaKuantil:
+    # Sketsa kuantil yang diperbarui per batch (bentuk sederhana sketsa KLL, Karnin dkk. 2016):
+    # tingkat i berisi nilai berbobot 2^i. Saat satu tingkat berisi lebih dari k nilai, isinya
+    # diurutkan dan setiap nilai kedua dinaikkan ke tingkat berikutnya. Memori O(k log(n/k)),
+    # galat peringkat sekitar 1/k; selama n <= k kuantilnya eksak.
+
+    def __init__(self, k=1024):
+        self.k = k
+        self.n = 0
+        self._tingkat = [np.empty(0)]
+        self._geser = 0
+
+    def tambah(self, x):
+        x = np.asarray(x, dtype=float)
+        if not len(x):
+            return
+        self.n += len(x)
+        self._tingkat[0] = np.concatenate([self._tingkat[0], x])
+        for i in range(len(self._tingkat)):
+            isi = self._tingkat[i]
+            if len(isi) <= self.k:
+                break
+            isi = np.sort(isi)
+            # Nilai ganjil-genap yang dinaikkan bergantian agar tidak bias ke satu sisi
+            self._geser ^= 1
+            sisa = isi[:0]
+            if len(isi) % 2:
+                sisa, isi = (isi[:1], isi[1:]) if self._geser else (isi[-1:], isi[:-1])
+            if i + 1 == len(self._tingkat):
+                self._tingkat.append(np.empty(0))
+            self._tingkat[i + 1] = np.concatenate([self._tingkat[i + 1], isi[self._geser::2]])
+            self._tingkat[i] = sisa
+
+    def kuantil(self, p):
+        if self.n == 0:
+            return np.full(len(p), np.nan)
+        if len(self._tingkat) == 1:
+            return np.quantile(self._tingkat[0], p)
+        nilai = np.concatenate(self._tingkat)
+        bobot = np.concatenate([np.full(len(t), 2.0 ** i) for i, t in enumerate(self._tingkat)])
+        urutan = np.argsort(nilai)
+        nilai, bobot = nilai[urutan], bobot[urutan]
+        # Posisi tengah setiap nilai pada sumbu peringkat, diinterpolasi linear
+        posisi = np.cumsum(bobot) - bobot / 2
+        return np.interp(np.asarray(p) * bobot.sum(), posisi, nilai)
+
+
+class KuantilJendela:
+    # Kuantil eksak atas N nilai terakhir (jendela bergulir), untuk data yang
+    # distribusinya bergeser dari waktu ke waktu.
+
+    def __init__(self, jendela):
+        self.jendela = jendela
+        self.n = 0
+        self._nilai = np.empty(0)
+
+    def tambah(self, x):
+        x = np.asarray(x, dtype=float)
+        self.n += len(x)
+        self._nilai = np.concatenate([self._nilai, x])[-self.jendela:]
+
+    def kuantil(self, p):
+        if not len(self._nilai):
+            return np.full(len(p), np.nan)
+        # Interpolasi linear, sama dengan DataFrame.quantile
+        return np.quantile(self._nilai, p)
+
+
+def _campur(x):
+    # Fungsi akhir splitmix64 (perkalian uint64 sengaja melimpah)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+
+def kunci_baris(waktu, suhu, tegangan):
+    # Hash 64-bit (Timestamp, Temperature, Voltage), kunci unik yang sama dengan tabel
+    # penyimpanan lokal. NaN (dengan bit berapa pun) dan -0.0 dinormalkan dulu sehingga
+    # baris yang sama selalu menghasilkan hash yang sama.
+    h = _campur(np.asarray(waktu, dtype='datetime64[ns]').view(np.uint64))
+    for x in (suhu, tegangan):
+        x = np.asarray(x, dtype=float)
+        x = np.where(np.isnan(x), np.nan, x + 0.0)
+        h = _campur(h ^ x.view(np.uint64))
+    return h
+
+
+class PembersihStreaming:
+    # Versi streaming dari benchmark.bersihkan_data: bacaan baru difilter per batch terhadap
+    # estimasi Q1/Q3 berjalan per kolom sensor, tanpa loop Python per baris.
+    #
+    # Batch dibagi menjadi potongan: `pemanasan` baris, lalu 1/32 jumlah bacaan yang sudah
+    # dinilai (paling banyak ukuran_potongan baris), sehingga estimasi tidak pernah tertinggal
+    # lebih dari ~3% data. Bacaan satu potongan dinilai sekaligus terhadap estimasi Q1/Q3
+    # sebelum potongan itu, lalu estimasi diperbarui dengan potongan tersebut. Estimasi
+    # memakai SketsaKuantil (seluruh data) atau KuantilJendela (`jendela` bacaan terakhir).
+    #
+    # Toleransi terhadap IQR batch: galat sketsa dan estimasi yang tertinggal satu potongan
+    # hanya mengubah keputusan untuk bacaan yang nilainya berada di sekitar batas Q1 - 1.5*IQR
+    # atau Q3 + 1.5*IQR. Pada data benchmark (2% outlier, pola harian, bacaan per 15 detik)
+    # ketidaksesuaian dengan bersihkan_data sekitar 1% baris untuk 20 ribu baris dan < 0.5%
+    # untuk >= 100 ribu baris; untuk data kurang dari sehari bisa sampai ~10% karena pola
+    # harian belum terlihat seluruhnya oleh estimasi berjalan. Perbedaan lain yang disengaja:
+    # bacaan dinilai dengan estimasi pada saat bacaan itu datang (tidak dinilai ulang
+    # belakangan), duplikat hanya dikenali di antara kapasitas_unik bacaan terakhir, dan kolom
+    # status tidak ikut difilter. Gunakan bandingkan_dengan_batch untuk mengukur tingkat
+    # ketidaksesuaian pada data nyata.
+
+    def __init__(self, kolom=('Temperature', 'Voltage'), jendela=None, pemanasan=20, ukuran_potongan=1024,
+                 kapasitas_unik=KAPASITAS_UNIK):
+        self.kolom = list(kolom)
+        self.jendela = jendela
+        self.pemanasan = pemanasan
+        self.ukuran_potongan = ukuran_potongan
+        self.kapasitas_unik = jendela or kapasitas_unik
+        self.reset()
+
+    def _buat_estimator(self):
+        if self.jendela:
+            return KuantilJendela(self.jendela)
+        return SketsaKuantil()
+
+    def reset(self):
+        self._estimator = {k: self._buat_estimator() for k in self.kolom}
+        # Hash bacaan yang sudah terlihat: potongan-potongan menurut urutan kedatangan
+        # (untuk membuang yang terlama) dan salinan terurut untuk pencarian, dibagi menjadi
+        # bagian besar dan bagian kecil berisi hash terbaru. Setiap putaran hanya bagian
+        # kecil yang diurutkan ulang; bagian kecil digabung ke bagian besar setelah mencapai
+        # 1/16 ukurannya.
+        self._urutan_terlihat = []
+        self._jumlah_terlihat = 0
+        self._terlihat = np.empty(0, dtype=np.uint64)
+        self._terlihat_baru = np.empty(0, dtype=np.uint64)
+        self.n = 0
+        self.jumlah_duplikat = 0
+        self.jumlah_outlier = 0
+
+    def _tandai_duplikat(self, kunci):
+        # True untuk bacaan yang sudah terlihat sebelumnya (termasuk di batch yang sama)
+        duplikat = pd.Index(kunci).duplicated()
+        for terlihat in (self._terlihat, self._terlihat_baru):
+            if len(terlihat):
+                posisi = np.minimum(np.searchsorted(terlihat, kunci), len(terlihat) - 1)
+                duplikat |= terlihat[posisi] == kunci
+        baru = kunci[~duplikat]
+        if not len(baru):
+            return duplikat
+        self._urutan_terlihat.append(baru)
+        self._jumlah_terlihat += len(baru)
+        if self._jumlah_terlihat > self.kapasitas_unik * 5 // 4:
+            # Dibuang sekaligus seperempat kapasitas, agar pengurutan ulang jarang terjadi
+            semua = np.concatenate(self._urutan_terlihat)[-self.kapasitas_unik:]
+            self._urutan_terlihat, self._jumlah_terlihat = [semua], len(semua)
+            self._terlihat = np.sort(semua)
+            self._terlihat_baru = self._terlihat[:0]
+            return duplikat
+        self._terlihat_baru = np.sort(np.concatenate([self._terlihat_baru, baru]))
+        if len(self._terlihat_baru) > max(len(self._terlihat) // 16, 4096):
+            # Dua deret terurut disambung; mergesort menggabungkannya dalam O(n)
+            self._terlihat = np.sort(np.concatenate([self._terlihat, self._terlihat_baru]), kind='mergesort')
+            self._terlihat_baru = self._terlihat[:0]
+            self._urutan_terlihat = [np.concatenate(self._urutan_terlihat)]
+        return duplikat
+
+    def _tandai_outlier(self, nilai):
+        outlier = np.zeros(len(nilai), dtype=bool)
+        mulai = 0
+        while mulai < len(nilai):
+            ukuran = min(max(self.n // 64, self.pemanasan, 1), self.ukuran_potongan)
+            potongan = nilai[mulai:mulai + ukuran]
+            if self.n >= self.pemanasan:
+                for j, k in enumerate(self.kolom):
+                    q1, q3 = self._estimator[k].kuantil([0.25, 0.75])
+                    iqr = q3 - q1
+                    x = potongan[:, j]
+                    outlier[mulai:mulai + ukuran] |= (x < q1 - 1.5 * iqr) | (x > q3 + 1.5 * iqr)
+            for j, k in enumerate(self.kolom):
+                self._estimator[k].tambah(potongan[:, j])
+            self.n += len(potongan)
+            mulai += ukuran
+        return outlier
+
+    def saring(self, data):
+        if data.empty:
+            return data
+        data = data.copy()
+        for k in self.kolom:
+            data[k] = pd.to_numeric(data[k], errors='coerce').astype(float)
+        data['Timestamp'] = pd.to_datetime(data['Timestamp'])
+        duplikat = self._tandai_duplikat(kunci_baris(data['Timestamp'], data['Temperature'], data['Voltage']))
+        self.jumlah_duplikat += int(duplikat.sum())
+        nilai = data[self.kolom].to_numpy()
+        valid = ~duplikat & ~np.isnan(nilai).any(axis=1)
+        lolos = valid.copy()
+        outlier = self._tandai_outlier(nilai[valid])
+        self.jumlah_outlier += int(outlier.sum())
+        lolos[valid] = ~outlier
+        return data[lolos]
+
+
+def bandingkan_dengan_batch(data, fungsi_batch, **kwargs):
+    # Proporsi baris yang keputusannya (dipertahankan/dibuang) berbeda antara
+    # pembersih streaming dan bersihkan_data batch
+    data = data.reset_index(drop=True)
+    batch = fungsi_batch(data)
+    streaming = PembersihStreaming(**kwargs).saring(data)
+    batch_idx = set(batch.index)
+    stream_idx = set(streaming.index)
+    return len(batch_idx ^ stream_idx) / max(len(data), 1)
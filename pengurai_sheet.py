@@ -0,0 +1,72 @@
+import logging
+
+import pandas as pd
+
+from metrik import METRIK
+
+log = logging.getLogger(__name__)
+
+# Mengubah nilai mentah Google Sheets (list baris string, hasil get_values) langsung menjadi
+# kolom bertipe, satu kolom sekaligus: Timestamp datetime64, Temperature/Voltage float64,
+# TempStatus/VoltStatus Int64, kolom lain tetap string. Sel yang tidak valid menjadi NaN/NaT
+# (dibuang oleh penyimpanan lokal), tanpa konversi per baris di Python.
+#
+# Timestamp diurai dengan format yang dikonfigurasi per sumber (sumber_data.json), tanpa
+# menebak format per sel. Sel yang tidak cocok menjadi NaT, kecuali sel yang diakhiri offset
+# zona (+07:00, Z): sel itu diurai ulang sebagai ISO 8601 lalu dikonversi ke zona_waktu sumber
+# (UTC jika zona_waktu tidak diisi). Sel tanpa zona dianggap sudah dalam zona_waktu sumber.
+# Hasilnya waktu lokal tanpa zona, bentuk yang disimpan penyimpanan lokal, dengan tanggal aslinya.
+# Sel tidak kosong yang tetap tidak terurai dihitung di metrik baris_waktu_invalid dan
+# dilaporkan sekali per pemanggilan beserta contoh selnya.
+
+FORMAT_WAKTU_SHEET = '%Y-%m-%d %H:%M:%S'
+KOLOM_ANGKA = ['Temperature', 'Voltage']
+KOLOM_STATUS = ['TempStatus', 'VoltStatus']
+_POLA_ZONA = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+
+def _ke_lokal(waktu, zona_waktu):
+    if waktu.dt.tz is not None:
+        waktu = waktu.dt.tz_convert(zona_waktu or 'UTC').dt.tz_localize(None)
+    return waktu.astype('datetime64[ns]')
+
+
+def urai_waktu(teks, format_waktu=FORMAT_WAKTU_SHEET, zona_waktu=None):
+    teks = pd.Series(teks, dtype=object).fillna('')
+    utc = format_waktu is not None and '%z' in format_waktu
+    hasil = _ke_lokal(pd.to_datetime(teks, format=format_waktu, errors='coerce', utc=utc), zona_waktu)
+    gagal = hasil.isna() & (teks != '')
+    if gagal.any():
+        sisa = teks[gagal].astype(str).str.strip()
+        sisa = sisa[sisa.str.contains(_POLA_ZONA)]
+        if len(sisa):
+            hasil[sisa.index] = _ke_lokal(pd.to_datetime(sisa, format='ISO8601', errors='coerce', utc=True), zona_waktu)
+        gagal = hasil.isna() & (teks != '')
+        if gagal.any():
+            METRIK.tambah('baris_waktu_invalid', int(gagal.sum()))
+            log.warning("%d sel Timestamp tidak cocok dengan format %r, contoh: %r",
+                        int(gagal.sum()), format_waktu, teks[gagal].iloc[0])
+    return hasil
+
+
+def urai_nilai(header, values, format_waktu=FORMAT_WAKTU_SHEET, zona_waktu=None):
+    lebar = len(header)
+    if not values or not lebar:
+        return pd.DataFrame(columns=header)
+    # Baris yang lebih pendek dari header diisi sel kosong, kelebihan kolom dibuang
+    mentah = pd.DataFrame(values).iloc[:, :lebar].reindex(columns=range(lebar)).fillna('')
+    mentah.columns = header
+    # Baris tanpa isi sama sekali dilewati
+    mentah = mentah[(mentah != '').any(axis=1)].reset_index(drop=True)
+    data = {}
+    for kolom in header:
+        if kolom == 'Timestamp':
+            data[kolom] = urai_waktu(mentah[kolom], format_waktu, zona_waktu)
+        elif kolom in KOLOM_ANGKA:
+            data[kolom] = pd.to_numeric(mentah[kolom], errors='coerce').astype(float)
+        elif kolom in KOLOM_STATUS:
+            angka = pd.to_numeric(mentah[kolom], errors='coerce').astype(float)
+            data[kolom] = angka.where(angka % 1 == 0).astype('Int64')
+        else:
+            data[kolom] = mentah[kolom]
+    return pd.DataFrame(data)
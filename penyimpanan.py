@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+from metrik import METRIK
+from pengurai_sheet import urai_waktu
+
+KOLOM = ['Timestamp', 'Temperature', 'Voltage', 'TempStatus', 'VoltStatus']
+# Sumber bacaan yang TempStatus/VoltStatus-nya diisi model di server ingest, bukan dikirim perangkat
+SUMBER_MODEL = 'lokal_model'
+
+
+class PenyimpananLokal:
+    # Salinan lokal isi Google Sheet dalam SQLite (append-only, terindeks waktu).
+    # Halaman dashboard membaca dari sini, sehingga tetap bisa dipakai walaupun
+    # Sheets API sedang lambat atau terkena batas kuota.
+
+    def __init__(self, path='data_monitoring.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._lock_sinkron = threading.Lock()
+        # Bertambah setiap kali isi tabel diganti (rekonsiliasi), agar pembaca
+        # inkremental tahu bahwa id lama tidak berlaku lagi
+        self.generasi = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS bacaan (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Timestamp INTEGER NOT NULL,
+                Temperature REAL NOT NULL,
+                Voltage REAL NOT NULL,
+                TempStatus INTEGER,
+                VoltStatus INTEGER,
+                sumber TEXT NOT NULL DEFAULT 'sheet',
+                UNIQUE (Timestamp, Temperature, Voltage)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bacaan_timestamp ON bacaan (Timestamp)")
+        self._conn.commit()
+
+    @staticmethod
+    def _ketik(data):
+        # Ubah data mentah sheet menjadi kolom bertipe; baris yang tidak valid dibuang
+        if data.empty:
+            return pd.DataFrame(columns=KOLOM)
+        waktu = data['Timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(waktu):
+            # Teks mentah diurai dengan format sheet, tanpa menebak format per sel
+            waktu = urai_waktu(waktu)
+        hasil = pd.DataFrame({
+            'Timestamp': waktu.to_numpy(),
+            'Temperature': pd.to_numeric(data['Temperature'], errors='coerce'),
+            'Voltage': pd.to_numeric(data['Voltage'], errors='coerce'),
+        })
+        for kolom in ['TempStatus', 'VoltStatus']:
+            if kolom in data:
+                hasil[kolom] = pd.to_numeric(data[kolom], errors='coerce').astype('Int64')
+            else:
+                hasil[kolom] = pd.array([pd.NA] * len(data), dtype='Int64')
+        return hasil.dropna(subset=['Timestamp', 'Temperature', 'Voltage'])
+
+    @staticmethod
+    def _ke_baris(data, sumber):
+        waktu = data['Timestamp'].astype('int64').tolist()
+        temp_status = [None if pd.isna(x) else int(x) for x in data['TempStatus']]
+        volt_status = [None if pd.isna(x) else int(x) for x in data['VoltStatus']]
+        return list(zip(waktu, data['Temperature'].tolist(), data['Voltage'].tolist(),
+                        temp_status, volt_status, [sumber] * len(data)))
+
+    def tambah(self, data, sumber='sheet'):
+        baris = self._ke_baris(self._ketik(data), sumber)
+        with self._lock:
+            sebelum = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bacaan (Timestamp, Temperature, Voltage, TempStatus, VoltStatus, sumber) "
+                "VALUES (?, ?, ?, ?, ?, ?)", baris)
+            self._conn.commit()
+            return self._conn.total_changes - sebelum
+
+    def ganti(self, data, sumber='sheet'):
+        # Dipakai saat rekonsiliasi: semua baris dari sumber ini diganti isi terbaru. Baris
+        # yang isinya tidak berubah tetap di tempat dengan id lamanya; hanya baris yang
+        # hilang/berubah yang dihapus, dan baris baru/berubah mendapat id baru.
+        baris = self._ke_baris(self._ketik(data), sumber)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS bacaan_baru (Timestamp INTEGER, Temperature REAL, "
+                    "Voltage REAL, TempStatus INTEGER, VoltStatus INTEGER, sumber TEXT)")
+                self._conn.execute("DELETE FROM bacaan_baru")
+                self._conn.executemany("INSERT INTO bacaan_baru VALUES (?, ?, ?, ?, ?, ?)", baris)
+                self._conn.execute("""
+                    DELETE FROM bacaan WHERE sumber = ? AND id NOT IN (
+                        SELECT a.id FROM bacaan a JOIN bacaan_baru b
+                        ON a.Timestamp = b.Timestamp AND a.Temperature = b.Temperature AND a.Voltage = b.Voltage
+                        AND a.TempStatus IS b.TempStatus AND a.VoltStatus IS b.VoltStatus)
+                """, (sumber,))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO bacaan (Timestamp, Temperature, Voltage, TempStatus, VoltStatus, sumber) "
+                    "SELECT * FROM bacaan_baru b WHERE NOT EXISTS (SELECT 1 FROM bacaan a WHERE "
+                    "a.Timestamp = b.Timestamp AND a.Temperature = b.Temperature AND a.Voltage = b.Voltage) "
+                    "ORDER BY rowid")
+                self._conn.execute("DELETE FROM bacaan_baru")
+            self.generasi += 1
+        return len(baris)
+
+    def sinkronkan(self, pembaca):
+        # Ambil baris baru dari sheet lewat pembaca inkremental lalu simpan
+        with self._lock_sinkron:
+            pembaca.baca()
+            if pembaca.baris_baru.empty and not pembaca.penuh:
+                return 0
+            with METRIK.ukur('simpan_lokal'):
+                if pembaca.penuh:
+                    return self.ganti(pembaca.baris_baru)
+                return self.tambah(pembaca.baris_baru)
+
+    def muat(self, mulai=None, sampai=None, batas=None):
+        kondisi = []
+        parameter = []
+        if mulai is not None:
+            kondisi.append("Timestamp >= ?")
+            parameter.append(pd.Timestamp(mulai).value)
+        if sampai is not None:
+            kondisi.append("Timestamp <= ?")
+            parameter.append(pd.Timestamp(sampai).value)
+        query = "SELECT Timestamp, Temperature, Voltage, TempStatus, VoltStatus FROM bacaan"
+        if kondisi:
+            query += " WHERE " + " AND ".join(kondisi)
+        if batas is not None:
+            query = f"SELECT * FROM ({query} ORDER BY Timestamp DESC, id DESC LIMIT ?) ORDER BY Timestamp"
+            parameter.append(int(batas))
+        else:
+            query += " ORDER BY Timestamp, id"
+        with self._lock:
+            data = pd.read_sql_query(query, self._conn, params=parameter)
+        data['Timestamp'] = pd.to_datetime(data['Timestamp'], unit='ns')
+        return data
+
+    def muat_label(self):
+        # Bacaan yang statusnya dari perangkat, untuk data latih: baris yang statusnya (salah
+        # satu atau keduanya) diisi model tidak ikut, agar model tidak dilatih dengan tebakannya sendiri
+        with self._lock:
+            data = pd.read_sql_query(
+                "SELECT Timestamp, Temperature, Voltage, TempStatus, VoltStatus FROM bacaan "
+                "WHERE sumber != ? ORDER BY Timestamp, id", self._conn, params=[SUMBER_MODEL])
+        data['Timestamp'] = pd.to_datetime(data['Timestamp'], unit='ns')
+        return data
+
+    def muat_sejak(self, id_terakhir):
+        # Baris yang ditambahkan setelah id_terakhir, beserta kolom id
+        with self._lock:
+            data = pd.read_sql_query(
+                "SELECT id, Timestamp, Temperature, Voltage, TempStatus, VoltStatus FROM bacaan "
+                "WHERE id > ? ORDER BY id", self._conn, params=[int(id_terakhir)])
+        data['Timestamp'] = pd.to_datetime(data['Timestamp'], unit='ns')
+        return data
+
+    def tanda(self):
+        # Penanda isi yang murah: berubah setiap ada baris baru (id naik) atau isi diganti
+        with self._lock:
+            id_terakhir = self._conn.execute("SELECT MAX(id) FROM bacaan").fetchone()[0]
+        return self.generasi, id_terakhir
+
+    def jumlah(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM bacaan").fetchone()[0]
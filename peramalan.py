@@ -0,0 +1,229 @@
+import json
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Peramalan deret waktu per jam: Holt-Winters aditif dengan tren teredam dan musim harian
+# (24 jam), satu model per kolom sensor. Parameter dipilih sekali saat model pertama kali
+# dilatih dari seluruh riwayat; setelah itu setiap refresh hanya memasukkan jam-jam yang
+# baru lengkap, sehingga biaya per refresh tidak bergantung pada panjang riwayat.
+# State disimpan ke file JSON dan dipakai lagi saat aplikasi dijalankan ulang.
+
+PERIODE_HARIAN = 24
+# Nama kolom sensor di agregat.py
+KOLOM_AGREGAT = {'Temperature': 'suhu', 'Voltage': 'tegangan'}
+GRID_PARAMETER = [
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5)
+    for beta in (0.01, 0.05)
+    for gamma in (0.05, 0.2, 0.4)
+]
+
+
+class HoltWinters:
+    # ETS(A,Ad,A): level, tren teredam (phi) dan musim aditif dengan periode tetap
+
+    def __init__(self, alpha=0.3, beta=0.01, gamma=0.2, phi=0.98, periode=PERIODE_HARIAN):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.phi = phi
+        self.periode = periode
+        self.level = None
+        self.tren = 0.0
+        self.musim = [0.0] * periode
+        self.indeks = 0
+        self._awal = []
+        self.jumlah_galat = 0
+        self.jumlah_kuadrat_galat = 0.0
+
+    @property
+    def siap(self):
+        return self.level is not None
+
+    def _inisialisasi(self):
+        # Level/tren dari rata-rata dua periode pertama, musim dari selisih periode pertama
+        y = pd.Series(self._awal, dtype=float).interpolate(limit_direction='both').to_numpy()
+        m = self.periode
+        rata1, rata2 = y[:m].mean(), y[m:2 * m].mean()
+        self.level = rata2
+        self.tren = (rata2 - rata1) / m
+        self.musim = [((y[i] - rata1) + (y[m + i] - rata2)) / 2 for i in range(m)]
+        self.indeks = 0
+        self._awal = []
+
+    def perbarui(self, y):
+        # Satu observasi per jam; NaN (jam tanpa data) memajukan model tanpa koreksi
+        if not self.siap:
+            self._awal.append(y)
+            if len(self._awal) >= 2 * self.periode and not all(math.isnan(v) for v in self._awal):
+                self._inisialisasi()
+            return None
+        s = self.musim[self.indeks]
+        ramalan = self.level + self.phi * self.tren + s
+        galat = None
+        if not math.isnan(y):
+            galat = y - ramalan
+            self.jumlah_galat += 1
+            self.jumlah_kuadrat_galat += galat * galat
+        else:
+            y = ramalan
+        level_lama = self.level
+        self.level = self.alpha * (y - s) + (1 - self.alpha) * (level_lama + self.phi * self.tren)
+        self.tren = self.beta * (self.level - level_lama) + (1 - self.beta) * self.phi * self.tren
+        self.musim[self.indeks] = self.gamma * (y - self.level) + (1 - self.gamma) * s
+        self.indeks = (self.indeks + 1) % self.periode
+        return galat
+
+    def ramalan(self, langkah):
+        # Rata-rata dan simpangan baku ramalan 1..langkah jam ke depan
+        # (rumus varians ETS(A,Ad,A), Hyndman dkk. 2008)
+        h = np.arange(1, langkah + 1)
+        phi_h = np.cumsum(self.phi ** h)
+        musim = np.asarray(self.musim)[(self.indeks + h - 1) % self.periode]
+        rata = self.level + phi_h * self.tren + musim
+        sigma2 = self.jumlah_kuadrat_galat / max(self.jumlah_galat, 1)
+        j = np.arange(1, langkah)
+        c = self.alpha * (1 + self.beta * np.cumsum(self.phi ** j)) + self.gamma * (j % self.periode == 0)
+        varians = sigma2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+        return rata, np.sqrt(varians)
+
+    def ke_dict(self):
+        return {k: getattr(self, k) for k in (
+            'alpha', 'beta', 'gamma', 'phi', 'periode', 'level', 'tren', 'musim', 'indeks',
+            'jumlah_galat', 'jumlah_kuadrat_galat')} | {'awal': self._awal}
+
+    @classmethod
+    def dari_dict(cls, isi):
+        model = cls(isi['alpha'], isi['beta'], isi['gamma'], isi['phi'], isi['periode'])
+        for k in ('level', 'tren', 'musim', 'indeks', 'jumlah_galat', 'jumlah_kuadrat_galat'):
+            setattr(model, k, isi[k])
+        model._awal = list(isi.get('awal', []))
+        return model
+
+
+def latih_holt_winters(y, periode=PERIODE_HARIAN):
+    # Pilih (alpha, beta, gamma) dengan galat satu langkah terkecil, hanya sekali di awal
+    terbaik, sse_terbaik = None, math.inf
+    for alpha, beta, gamma in GRID_PARAMETER:
+        model = HoltWinters(alpha, beta, gamma, periode=periode)
+        for nilai in y:
+            model.perbarui(nilai)
+        if model.jumlah_galat and model.jumlah_kuadrat_galat < sse_terbaik:
+            terbaik, sse_terbaik = model, model.jumlah_kuadrat_galat
+    if terbaik is None:
+        # Riwayat belum cukup dua hari: parameter bawaan, inisialisasi menunggu data berikutnya
+        terbaik = HoltWinters(periode=periode)
+        for nilai in y:
+            terbaik.perbarui(nilai)
+    return terbaik
+
+
+class PeramalSensor:
+    # Model per kolom untuk satu sensor, diumpan per jam dari agregat jam pipeline
+    # (agregat.py) atau, tanpa agregat, dari baris mentah penyimpanan lokal.
+    # Jam yang sedang berjalan belum dimasukkan sampai ada bacaan di jam berikutnya;
+    # bacaan yang datang terlambat untuk jam yang sudah dimasukkan diabaikan.
+
+    def __init__(self, penyimpanan, path_status=None, kolom=('Temperature', 'Voltage'), agregat=None):
+        self.penyimpanan = penyimpanan
+        self.path_status = path_status
+        self.kolom = list(kolom)
+        self.agregat = agregat
+        self.model = {}
+        self.jam_berikutnya = None
+        self.jumlah_jam_dimasukkan = 0
+        self._lock = threading.Lock()
+        self._muat_status()
+
+    def _muat_status(self):
+        if not self.path_status or not os.path.exists(self.path_status):
+            return
+        try:
+            with open(self.path_status, encoding='utf-8') as f:
+                isi = json.load(f)
+            self.model = {k: HoltWinters.dari_dict(v) for k, v in isi['model'].items()}
+            self.jam_berikutnya = pd.Timestamp(isi['jam_berikutnya']) if isi['jam_berikutnya'] else None
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("State peramalan %s tidak bisa dibaca, dilatih ulang: %s", self.path_status, e)
+            self.model = {}
+            self.jam_berikutnya = None
+
+    def _simpan_status(self):
+        if not self.path_status:
+            return
+        isi = {
+            'jam_berikutnya': str(self.jam_berikutnya) if self.jam_berikutnya is not None else None,
+            'model': {k: m.ke_dict() for k, m in self.model.items()},
+        }
+        sementara = self.path_status + '.tmp'
+        with open(sementara, 'w', encoding='utf-8') as f:
+            json.dump(isi, f)
+        os.replace(sementara, self.path_status)
+
+    def _data_per_jam(self):
+        if self.agregat is not None:
+            # Rata-rata per jam sudah dihitung pipeline; hanya bucket sejak jam_berikutnya yang dibaca
+            tabel = self.agregat.tabel('jam', mulai=self.jam_berikutnya)
+            per_jam = pd.DataFrame({k: tabel[f'{KOLOM_AGREGAT[k]}_rata'] for k in self.kolom},
+                                   index=pd.DatetimeIndex(tabel['kunci'].view('datetime64[ns]')))
+        else:
+            # Hanya baris sejak jam_berikutnya yang dibaca dari penyimpanan
+            data = self.penyimpanan.muat(mulai=self.jam_berikutnya)
+            per_jam = data.set_index('Timestamp')[self.kolom].astype(float).resample('h').mean()
+        if per_jam.empty:
+            return None
+        # Jam tanpa bacaan tetap dimasukkan sebagai NaN
+        awal = self.jam_berikutnya if self.jam_berikutnya is not None else per_jam.index.min()
+        per_jam = per_jam.reindex(pd.date_range(awal, per_jam.index.max(), freq='h'))
+        # Jam terakhir mungkin belum lengkap
+        per_jam = per_jam.iloc[:-1]
+        return per_jam if len(per_jam) else None
+
+    def perbarui(self):
+        with self._lock:
+            return self._perbarui()
+
+    def _perbarui(self):
+        per_jam = self._data_per_jam()
+        if per_jam is None:
+            return 0
+        if not self.model:
+            self.model = {k: latih_holt_winters(per_jam[k].tolist()) for k in self.kolom}
+        else:
+            for k in self.kolom:
+                for nilai in per_jam[k].tolist():
+                    self.model[k].perbarui(nilai)
+        self.jam_berikutnya = per_jam.index[-1] + pd.Timedelta(hours=1)
+        self.jumlah_jam_dimasukkan += len(per_jam)
+        self._simpan_status()
+        return len(per_jam)
+
+    @property
+    def siap(self):
+        return bool(self.model) and all(m.siap for m in self.model.values())
+
+    def ramalan(self, jam):
+        # DataFrame per jam: <kolom> (rata-rata) dan <kolom>_std untuk setiap kolom
+        with self._lock:
+            if not self.siap:
+                return None
+            indeks = pd.date_range(self.jam_berikutnya, periods=jam, freq='h')
+            hasil = {}
+            for k in self.kolom:
+                rata, std = self.model[k].ramalan(jam)
+                hasil[k] = rata
+                hasil[f'{k}_std'] = std
+        return pd.DataFrame(hasil, index=indeks)
+
+
+def ramalan_per_hari(ramalan):
+    # Rata-rata harian dari ramalan per jam. Simpangan baku dirata-rata (bukan dibagi
+    # akar jumlah jam) karena galat ramalan antarjam dalam satu hari sangat berkorelasi.
+    return ramalan.resample('D').mean()
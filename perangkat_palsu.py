@@ -0,0 +1,75 @@
+import argparse
+import json
+import random
+import time
+from urllib.request import Request, urlopen
+
+# Klien palsu pengganti ESP8266 untuk mencoba server_ingest.py secara lokal:
+# mengirim bacaan sintetis satu per satu (GET) atau per batch (POST).
+
+
+def getStatus(value, min, max):
+    # Sama dengan getStatus() di sketch ESP8266
+    if value < min:
+        return 1
+    elif value > max:
+        return 3
+    return 2
+
+
+def buat_bacaan():
+    suhu = int(random.gauss(34, 1.5))
+    tegangan = round(random.gauss(215, 12), 2)
+    return {
+        'Temperature': suhu,
+        'Voltage': tegangan,
+        'TempStatus': getStatus(suhu, 33, 35),
+        'VoltStatus': getStatus(tegangan, 200, 230),
+    }
+
+
+def kirim_batch(url, batch):
+    mulai = time.monotonic()
+    body = json.dumps(batch).encode()
+    request = Request(url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+    with urlopen(request, timeout=5) as response:
+        hasil = json.loads(response.read())
+    return hasil, time.monotonic() - mulai
+
+
+def kirim_satu(url, bacaan):
+    mulai = time.monotonic()
+    query = '&'.join(f"{k}={v}" for k, v in bacaan.items())
+    with urlopen(f"{url}?{query}", timeout=5) as response:
+        hasil = json.loads(response.read())
+    return hasil, time.monotonic() - mulai
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perangkat sensor palsu untuk server ingest lokal")
+    parser.add_argument('--url', default='http://127.0.0.1:8765/ingest')
+    parser.add_argument('--jumlah', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=5, help="1 = kirim satu per satu lewat GET")
+    parser.add_argument('--interval', type=float, default=0.5, help="detik antar bacaan")
+    args = parser.parse_args()
+
+    antrian = []
+    for i in range(args.jumlah):
+        bacaan = buat_bacaan()
+        bacaan['_dibuat'] = time.monotonic()
+        antrian.append(bacaan)
+        if len(antrian) >= args.batch or i == args.jumlah - 1:
+            sekarang = time.monotonic()
+            for b in antrian:
+                b['umur_ms'] = int((sekarang - b.pop('_dibuat')) * 1000)
+            if args.batch == 1:
+                hasil, durasi = kirim_satu(args.url, antrian[0])
+            else:
+                hasil, durasi = kirim_batch(args.url, antrian)
+            print(f"Kirim {len(antrian)} bacaan: {hasil} ({durasi * 1000:.1f} ms)")
+            antrian = []
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+from metrik import METRIK
+
+log = logging.getLogger(__name__)
+
+# Peringatan tanpa browser: setiap bacaan baru di penyimpanan lokal langsung diklasifikasi,
+# perubahan TempStatus/VoltStatus dilacak per sensor, dan notifikasi dikirim ke webhook.
+#
+#   python peringatan.py penerima --port 8800                 # penerima webhook lokal untuk uji coba
+#   python peringatan.py pantau --webhook http://127.0.0.1:8800/  # sinkronkan sheet + evaluasi
+#
+# Agar status yang naik-turun di sekitar batas tidak menghasilkan badai notifikasi:
+# - debounce: status baru baru dianggap berlaku setelah muncul pada `bacaan_masuk` bacaan
+#   berturut-turut (LOW/HIGH), atau `bacaan_keluar` bacaan berturut-turut untuk kembali ke
+#   NORMAL. bacaan_keluar > bacaan_masuk memberi histeresis: lebih mudah masuk ke kondisi
+#   abnormal daripada keluar darinya.
+# - jeda_minimum: notifikasi untuk kolom yang sama tidak dikirim lebih sering dari ini;
+#   perubahan di dalam jeda diringkas ke notifikasi berikutnya (status terakhir saja).
+
+NAMA_STATUS = {1: 'LOW', 2: 'NORMAL', 3: 'HIGH'}
+STATUS_NORMAL = 2
+KOLOM_STATUS = ('TempStatus', 'VoltStatus')
+
+
+class PelacakStatus:
+    # State debounce/histeresis satu kolom status satu sensor
+
+    def __init__(self, bacaan_masuk=3, bacaan_keluar=5, jeda_minimum=60.0):
+        self.bacaan_masuk = bacaan_masuk
+        self.bacaan_keluar = bacaan_keluar
+        self.jeda_minimum = jeda_minimum
+        self.status = None
+        self.kandidat = None
+        self.hitungan = 0
+        self.terakhir_dikirim = None
+        self.waktu_kirim = -float('inf')
+        self.tertunda = False
+
+    def terima(self, status, sekarang):
+        # Mengembalikan True jika status berlaku berubah dan notifikasi boleh dikirim sekarang
+        if self.status is None:
+            # Bacaan pertama menjadi status awal tanpa notifikasi
+            self.status = self.terakhir_dikirim = status
+            return False
+        if status == self.status:
+            self.kandidat, self.hitungan = None, 0
+        else:
+            if status != self.kandidat:
+                self.kandidat, self.hitungan = status, 0
+            self.hitungan += 1
+            perlu = self.bacaan_keluar if status == STATUS_NORMAL else self.bacaan_masuk
+            if self.hitungan >= perlu:
+                self.status = status
+                self.kandidat, self.hitungan = None, 0
+                self.tertunda = True
+        return self.siap_kirim(sekarang)
+
+    def siap_kirim(self, sekarang):
+        if not self.tertunda or sekarang - self.waktu_kirim < self.jeda_minimum:
+            return False
+        self.tertunda = False
+        if self.status == self.terakhir_dikirim:
+            # Berubah lalu kembali lagi di dalam jeda: tidak ada yang perlu dikabarkan
+            return False
+        return True
+
+    def tandai_terkirim(self, sekarang):
+        self.terakhir_dikirim = self.status
+        self.waktu_kirim = sekarang
+
+
+class MesinPeringatan:
+    # Menerima bacaan yang sudah berstatus lalu menghasilkan kejadian perubahan status
+
+    def __init__(self, kirim, bacaan_masuk=3, bacaan_keluar=5, jeda_minimum=60.0):
+        # kirim(kejadian): dipanggil untuk setiap notifikasi, harus cepat (lihat PengirimWebhook)
+        self.kirim = kirim
+        self.bacaan_masuk = bacaan_masuk
+        self.bacaan_keluar = bacaan_keluar
+        self.jeda_minimum = jeda_minimum
+        self._pelacak = {}
+        self._lock = threading.Lock()
+        self.jumlah_kejadian = 0
+
+    def _dapatkan_pelacak(self, sensor, kolom):
+        kunci = (sensor, kolom)
+        if kunci not in self._pelacak:
+            self._pelacak[kunci] = PelacakStatus(self.bacaan_masuk, self.bacaan_keluar, self.jeda_minimum)
+        return self._pelacak[kunci]
+
+    def proses(self, sensor, waktu, suhu, tegangan, temp_status, volt_status, sekarang=None):
+        # Satu pemanggilan untuk satu batch bacaan berurutan; semua bacaan diperiksa,
+        # bukan hanya yang terakhir
+        sekarang = time.monotonic() if sekarang is None else sekarang
+        kejadian = []
+        with self._lock:
+            for kolom, daftar_status in zip(KOLOM_STATUS, (temp_status, volt_status)):
+                pelacak = self._dapatkan_pelacak(sensor, kolom)
+                for i, status in enumerate(np.asarray(daftar_status).tolist()):
+                    if pelacak.terima(status, sekarang):
+                        pelacak.tandai_terkirim(sekarang)
+                        kejadian.append(self._buat_kejadian(sensor, kolom, pelacak, waktu[i], suhu[i], tegangan[i]))
+        for k in kejadian:
+            self.jumlah_kejadian += 1
+            METRIK.tambah('peringatan_dikirim')
+            self.kirim(k)
+        return kejadian
+
+    def periksa_tertunda(self, sekarang=None):
+        # Perubahan yang tertahan jeda_minimum dikirim begitu jedanya lewat, walau tanpa bacaan baru
+        sekarang = time.monotonic() if sekarang is None else sekarang
+        kejadian = []
+        with self._lock:
+            for (sensor, kolom), pelacak in self._pelacak.items():
+                if pelacak.siap_kirim(sekarang):
+                    pelacak.tandai_terkirim(sekarang)
+                    kejadian.append(self._buat_kejadian(sensor, kolom, pelacak, None, None, None))
+        for k in kejadian:
+            self.jumlah_kejadian += 1
+            METRIK.tambah('peringatan_dikirim')
+            self.kirim(k)
+        return kejadian
+
+    @staticmethod
+    def _buat_kejadian(sensor, kolom, pelacak, waktu, suhu, tegangan):
+        return {
+            'sensor': sensor,
+            'kolom': kolom,
+            'status': int(pelacak.status),
+            'label': NAMA_STATUS.get(pelacak.status, 'UNKNOWN'),
+            'Timestamp': None if waktu is None else str(waktu),
+            'Temperature': None if suhu is None else float(suhu),
+            'Voltage': None if tegangan is None else float(tegangan),
+            'waktu_kirim': datetime.now().isoformat(timespec='seconds'),
+        }
+
+
+class PengirimWebhook:
+    # Mengirim kejadian sebagai POST JSON dari thread sendiri, sehingga evaluasi tidak
+    # pernah menunggu jaringan. Gagal kirim dicoba lagi dengan jeda bertambah.
+
+    def __init__(self, url, timeout=5.0, percobaan=3, jeda_awal=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.percobaan = percobaan
+        self.jeda_awal = jeda_awal
+        self._antrian = queue.Queue()
+        self.jumlah_terkirim = 0
+        self.jumlah_gagal = 0
+        self._thread = threading.Thread(target=self._jalankan, name='pengirim-webhook', daemon=True)
+        self._thread.start()
+
+    def __call__(self, kejadian):
+        self._antrian.put(kejadian)
+
+    def _kirim(self, kejadian):
+        body = json.dumps(kejadian).encode()
+        request = Request(self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+        with urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _jalankan(self):
+        while True:
+            kejadian = self._antrian.get()
+            if kejadian is None:
+                break
+            for percobaan in range(self.percobaan):
+                try:
+                    self._kirim(kejadian)
+                    self.jumlah_terkirim += 1
+                    break
+                except OSError as e:
+                    if percobaan == self.percobaan - 1:
+                        self.jumlah_gagal += 1
+                        METRIK.tambah('peringatan_gagal')
+                        log.warning("Webhook %s gagal untuk %s %s: %s", self.url, kejadian['sensor'],
+                                    kejadian['kolom'], e)
+                    else:
+                        time.sleep(self.jeda_awal * 2 ** percobaan)
+
+    def tutup(self):
+        self._antrian.put(None)
+        self._thread.join()
+
+
+class PemantauPeringatan:
+    # Membaca bacaan baru dari penyimpanan lokal dan meneruskannya ke MesinPeringatan.
+    # picu() dipanggil oleh server ingest agar bacaan baru dievaluasi segera; tanpa picu,
+    # penyimpanan diperiksa setiap `interval` detik. Riwayat yang sudah ada saat mulai tidak
+    # dievaluasi. sinkron (opsional) dipanggil setiap `interval_sinkron` detik sebelum
+    # penyimpanan diperiksa, misalnya untuk menarik baris baru dari sheet.
+    #
+    # Kemajuan dicatat lewat id baris terakhir yang dievaluasi: bacaan yang terlambat masuk
+    # (Timestamp lebih lama dari bacaan terakhir) tetap dievaluasi, dan rekonsiliasi (ganti)
+    # mempertahankan id baris yang tidak berubah sehingga riwayat tidak masuk lagi ke debouncer.
+
+    def __init__(self, sensor, penyimpanan, mesin, klasifikasi, interval=1.0, sinkron=None, interval_sinkron=15.0):
+        self.sensor = sensor
+        self.penyimpanan = penyimpanan
+        self.mesin = mesin
+        # klasifikasi(suhu, tegangan) -> (temp_status, volt_status), sama dengan dashboard
+        self.klasifikasi = klasifikasi
+        self.interval = interval
+        self.sinkron = sinkron
+        self.interval_sinkron = interval_sinkron
+        self._id_terakhir = penyimpanan.tanda()[1] or 0
+        self._dipicu = threading.Event()
+        self._berhenti = threading.Event()
+        self._thread = None
+        self.jumlah_bacaan = 0
+
+    def mulai(self):
+        self._thread = threading.Thread(target=self.jalankan, name=f'peringatan-{self.sensor}', daemon=True)
+        self._thread.start()
+        return self
+
+    def picu(self):
+        self._dipicu.set()
+
+    def hentikan(self):
+        self._berhenti.set()
+        self._dipicu.set()
+
+    def langkah(self):
+        baru = self.penyimpanan.muat_sejak(self._id_terakhir)
+        if baru.empty:
+            return self.mesin.periksa_tertunda()
+        self._id_terakhir = int(baru['id'].max())
+        # Satu batch dievaluasi menurut urutan waktu, bukan urutan masuk
+        baru = baru.sort_values('Timestamp', kind='stable').dropna(subset=['Temperature', 'Voltage'])
+        if baru.empty:
+            return []
+        suhu = baru['Temperature'].to_numpy(dtype=float)
+        tegangan = baru['Voltage'].to_numpy(dtype=float)
+        with METRIK.ukur('evaluasi_peringatan'):
+            temp_status, volt_status = self.klasifikasi(suhu, tegangan)
+            self.jumlah_bacaan += len(baru)
+            return self.mesin.proses(self.sensor, baru['Timestamp'].tolist(), suhu, tegangan, temp_status, volt_status)
+
+    def jalankan(self):
+        sinkron_berikutnya = time.monotonic()
+        while not self._berhenti.is_set():
+            if self.sinkron is not None and time.monotonic() >= sinkron_berikutnya:
+                sinkron_berikutnya = time.monotonic() + self.interval_sinkron
+                try:
+                    self.sinkron()
+                except Exception:
+                    log.warning("Sinkronisasi %s gagal", self.sensor, exc_info=True)
+            try:
+                self.langkah()
+            except Exception:
+                log.exception("Evaluasi peringatan %s gagal", self.sensor)
+            self._dipicu.wait(self.interval)
+            self._dipicu.clear()
+
+
+class PenerimaWebhookLokal:
+    # Pengganti penerima webhook sungguhan untuk uji coba: menyimpan dan mencetak
+    # setiap kejadian yang diterima
+
+    def __init__(self, host='127.0.0.1', port=8800):
+        self.diterima = []
+        penerima = self
+
+        class Penangan(BaseHTTPRequestHandler):
+            def do_POST(self):
+                panjang = int(self.headers.get('Content-Length', 0) or 0)
+                kejadian = json.loads(self.rfile.read(panjang) or b'{}')
+                kejadian['waktu_terima'] = datetime.now().isoformat(timespec='milliseconds')
+                penerima.diterima.append(kejadian)
+                print(f"[{kejadian['waktu_terima']}] {kejadian.get('sensor')} {kejadian.get('kolom')} -> "
+                      f"{kejadian.get('label')} ({kejadian.get('Timestamp')}, suhu {kejadian.get('Temperature')}, "
+                      f"tegangan {kejadian.get('Voltage')})")
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Penangan)
+        self.url = f"http://{host}:{self.server.server_address[1]}/"
+
+    def mulai_di_thread(self):
+        threading.Thread(target=self.server.serve_forever, name='penerima-webhook', daemon=True).start()
+        return self
+
+    def hentikan(self):
+        self.server.shutdown()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    parser = argparse.ArgumentParser(description="Peringatan status sensor lewat webhook")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+    pantau = sub.add_parser('pantau', help="Sinkronkan sheet dan evaluasi bacaan baru di penyimpanan lokal")
+    pantau.add_argument('--sumber', default='sumber_data.json')
+    pantau.add_argument('--sensor', help="Nama sumber di --sumber (bawaan: sumber pertama)")
+    pantau.add_argument('--db', help="Bawaan: penyimpanan sumber tersebut")
+    pantau.add_argument('--webhook', required=True)
+    pantau.add_argument('--interval', type=float, default=1.0)
+    pantau.add_argument('--interval-sinkron', type=float, default=15.0)
+    pantau.add_argument('--tanpa-sinkron', action='store_true',
+                        help="Jangan baca sheet, misalnya saat penyimpanan diisi server_ingest.py")
+    pantau.add_argument('--bacaan-masuk', type=int, default=3)
+    pantau.add_argument('--bacaan-keluar', type=int, default=5)
+    pantau.add_argument('--jeda-minimum', type=float, default=60.0)
+    penerima = sub.add_parser('penerima', help="Penerima webhook lokal untuk uji coba")
+    penerima.add_argument('--host', default='127.0.0.1')
+    penerima.add_argument('--port', type=int, default=8800)
+    args = parser.parse_args()
+
+    if args.perintah == 'penerima':
+        server = PenerimaWebhookLokal(args.host, args.port)
+        print(f"Penerima webhook berjalan di {server.url}")
+        server.server.serve_forever()
+        return
+
+    from functools import partial
+
+    from inferensi import PengelolaModel
+    from pembaca_sheet import buat_client, buat_pembaca
+    from penyimpanan import PenyimpananLokal
+    from sumber_data import muat_sumber
+
+    daftar = {s.nama: s for s in muat_sumber(args.sumber)}
+    sumber = daftar[args.sensor] if args.sensor else next(iter(daftar.values()))
+    penyimpanan = PenyimpananLokal(args.db or sumber.path_db)
+    sinkron = None
+    if not args.tanpa_sinkron:
+        # Proses ini sendiri yang menarik baris baru dari sheet, tanpa dashboard terbuka
+        sinkron = partial(penyimpanan.sinkronkan, buat_pembaca(sumber, buat_client))
+
+    pengelola = PengelolaModel().mulai()
+    mesin = MesinPeringatan(PengirimWebhook(args.webhook), args.bacaan_masuk, args.bacaan_keluar, args.jeda_minimum)
+    pemantau = PemantauPeringatan(sumber.nama, penyimpanan, mesin,
+                                  lambda suhu, tegangan: pengelola.model.prediksi(suhu, tegangan),
+                                  interval=args.interval, sinkron=sinkron, interval_sinkron=args.interval_sinkron)
+    print(f"Memantau {penyimpanan.path} ({sumber.nama}), notifikasi ke {args.webhook}")
+    pemantau.jalankan()
+
+
+if __name__ == '__main__':
+    main()
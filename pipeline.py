@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+
+from agregat import AgregatWaktu
+from metrik import METRIK
+from pembersihan import PembersihStreaming
+from riwayat import PenyanggaRiwayat
+
+# Dua minggu data 1 Hz per sensor (~27 MB, lihat riwayat.py)
+KAPASITAS_RIWAYAT = 14 * 24 * 3600
+
+
+class PipelineSensor:
+    # Pipeline satu sensor: sheet -> penyimpanan lokal -> pembersihan streaming.
+    # Setiap putaran hanya baris baru yang dibersihkan; riwayat bersih disimpan di memori
+    # dalam PenyanggaRiwayat, data_bersih() mengembalikan view ke isinya (JendelaRiwayat).
+    # Setiap bacaan bersih juga digabung ke agregat per menit/jam/hari (lihat agregat.py).
+
+    def __init__(self, penyimpanan, pembaca, pembersih=None, prediktor=None, kapasitas=KAPASITAS_RIWAYAT,
+                 versi_model=None):
+        self.penyimpanan = penyimpanan
+        self.pembaca = pembaca
+        self.pembersih = pembersih or PembersihStreaming(kapasitas_unik=kapasitas)
+        # prediktor(data) -> (temp_status, volt_status), hanya dipanggil untuk baris baru
+        self.prediktor = prediktor
+        # versi_model() -> versi model aktif; jika berubah, status seluruh riwayat diprediksi ulang
+        self.versi_model = versi_model
+        self._versi = None
+        self.kapasitas = kapasitas
+        self._lock = threading.Lock()
+        self._id_terakhir = 0
+        # Timestamp terbaru yang sudah dimuat; riwayat dan agregat diisi urut waktu
+        self._waktu_terakhir = None
+        self._generasi = None
+        self.riwayat = PenyanggaRiwayat(kapasitas)
+        self.agregat = AgregatWaktu()
+
+    def sinkronkan(self):
+        return self.penyimpanan.sinkronkan(self.pembaca)
+
+    def _bangun_ulang(self):
+        self._generasi = self.penyimpanan.generasi
+        self._id_terakhir = 0
+        self._waktu_terakhir = None
+        self.riwayat.kosongkan()
+        self.agregat.kosongkan()
+        self.pembersih.reset()
+
+    def _muat_baru(self):
+        # Baris setelah id terakhir, diurutkan menurut waktu (urutan id tidak selalu urut
+        # waktu, misalnya baris yang diubah di tengah sheet mendapat id baru)
+        with METRIK.ukur('baca_lokal'):
+            baru = self.penyimpanan.muat_sejak(self._id_terakhir)
+        if baru.empty:
+            return baru
+        self._id_terakhir = int(baru['id'].max())
+        if not baru['Timestamp'].is_monotonic_increasing:
+            baru = baru.sort_values('Timestamp', kind='stable')
+        return baru
+
+    def data_bersih(self):
+        with self._lock:
+            if self._generasi != self.penyimpanan.generasi:
+                # Isi penyimpanan diganti (rekonsiliasi): bangun ulang dari awal
+                self._bangun_ulang()
+            self._prediksi_ulang()
+            baru = self._muat_baru()
+            if not baru.empty and self._waktu_terakhir is not None and baru['Timestamp'].iloc[0] < self._waktu_terakhir:
+                # Bacaan terlambat yang lebih lama dari riwayat (misalnya bacaan tertunda dari
+                # ESP8266): riwayat harus tetap urut waktu, jadi dibangun ulang dari awal
+                METRIK.tambah('bangun_ulang_terlambat')
+                self._bangun_ulang()
+                baru = self._muat_baru()
+            if not baru.empty:
+                self._waktu_terakhir = baru['Timestamp'].iloc[-1]
+                METRIK.tambah('baris_masuk', len(baru))
+                outlier, duplikat = self.pembersih.jumlah_outlier, self.pembersih.jumlah_duplikat
+                with METRIK.ukur('pembersihan'):
+                    baru = self.pembersih.saring(baru.drop(columns='id'))
+                METRIK.tambah('baris_outlier', self.pembersih.jumlah_outlier - outlier)
+                METRIK.tambah('baris_duplikat', self.pembersih.jumlah_duplikat - duplikat)
+                if not baru.empty:
+                    if self.prediktor is not None:
+                        with METRIK.ukur('prediksi'):
+                            temp_status, volt_status = self.prediktor(baru)
+                        METRIK.tambah('prediksi_dibuat', len(baru))
+                    else:
+                        # Tanpa prediktor status diisi 0 (tidak diketahui)
+                        temp_status = volt_status = np.zeros(len(baru), dtype=np.int8)
+                    suhu, tegangan = baru['Temperature'].to_numpy(), baru['Voltage'].to_numpy()
+                    self.riwayat.tambah(baru['Timestamp'], suhu, tegangan, temp_status, volt_status)
+                    with METRIK.ukur('agregat'):
+                        self.agregat.tambah(baru['Timestamp'], suhu, tegangan, temp_status, volt_status)
+            return self.riwayat.jendela()
+
+    def _prediksi_ulang(self):
+        if self.versi_model is None or self.prediktor is None:
+            return
+        versi = self.versi_model()
+        if versi == self._versi:
+            return
+        if self._versi is not None and len(self.riwayat):
+            jendela = self.riwayat.jendela()
+            with METRIK.ukur('prediksi_ulang'):
+                temp_status, volt_status = self.prediktor(jendela.ke_dataframe())
+            # Bucket di luar riwayat memori tetap memakai status dari model sebelumnya
+            self.agregat.koreksi_status(jendela.waktu, jendela.temp_status, jendela.volt_status,
+                                        temp_status, volt_status)
+            self.riwayat.ganti_status(temp_status, volt_status)
+        self._versi = versi
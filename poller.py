@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from metrik import METRIK
+
+log = logging.getLogger(__name__)
+
+
+def _baca_saja(array):
+    # View tanpa salinan: riwayat pipeline tidak pernah menulis ulang posisi yang sudah
+    # diterbitkan (lihat riwayat.py), jadi cukup dikunci agar pembaca tidak mengubahnya
+    array = np.asarray(array).view()
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    # Hasil satu putaran poller; tidak diubah lagi setelah diterbitkan
+    versi: int
+    waktu: datetime
+    suhu: np.ndarray
+    tegangan: np.ndarray
+    temp_status: np.ndarray
+    volt_status: np.ndarray
+    time_list: pd.DatetimeIndex
+    waktu_asli: pd.DatetimeIndex
+    galat: str = None
+    # Penanda isi data saat snapshot dibuat (lihat PollerLatar)
+    tanda: object = None
+    # Tabel agregat per resolusi ({'jam': ..., 'hari': ...}, lihat agregat.py), jika ada
+    agregat: dict = None
+
+    @property
+    def kosong(self):
+        return len(self.suhu) == 0
+
+
+class PollerLatar:
+    # Satu worker per proses: sinkronisasi, pembersihan dan prediksi dijalankan
+    # sekali per interval, lalu hasilnya diterbitkan sebagai Snapshot per sensor.
+    # Setiap sesi Streamlit cukup menampilkan snapshot terbaru.
+    #
+    # tugas: {nama_sensor: (sinkron, proses)} atau (sinkron, proses, tanda). Semua sensor
+    # diproses bersamaan di thread pool, sehingga waktu refresh tidak bertambah seiring
+    # jumlah sensor. tanda() mengembalikan penanda isi yang murah dihitung; jika sama
+    # dengan penanda snapshot sebelumnya, proses() dilewati dan snapshot lama dipakai
+    # lagi (versi tidak naik, sesi tidak menggambar ulang).
+
+    def __init__(self, tugas, interval=15, maks_pekerja=8):
+        self.tugas = dict(tugas)
+        self.interval = interval
+        self._pool = ThreadPoolExecutor(max_workers=max(1, min(maks_pekerja, len(self.tugas))),
+                                        thread_name_prefix='poller-sensor')
+        self._kondisi = threading.Condition()
+        self._snapshot = None
+        self._versi = 0
+        self._berhenti = threading.Event()
+        self._dipicu = threading.Event()
+        self._thread = None
+        # (waktu, pesan) putaran terakhir yang gagal seluruhnya, None setelah putaran berhasil
+        self.galat = None
+
+    def mulai(self):
+        with self._kondisi:
+            if self._thread is None or not self._thread.is_alive():
+                self._berhenti.clear()
+                self._thread = threading.Thread(target=self._jalankan, name='poller-latar', daemon=True)
+                self._thread.start()
+        return self
+
+    def hentikan(self):
+        self._berhenti.set()
+        self._dipicu.set()
+
+    def picu(self):
+        # Minta poller memproses data lokal sekarang juga, misalnya setelah
+        # bacaan baru masuk lewat server ingest; sinkronisasi sheet tetap per interval
+        self._dipicu.set()
+
+    def _proses_sensor(self, nama, sinkron, versi):
+        fungsi_sinkron, fungsi_proses = self.tugas[nama][:2]
+        fungsi_tanda = self.tugas[nama][2] if len(self.tugas[nama]) > 2 else None
+        sebelumnya = self._snapshot.get(nama) if self._snapshot is not None else None
+        galat = None
+        if sinkron:
+            try:
+                with METRIK.ukur('sinkronisasi'):
+                    fungsi_sinkron()
+            except Exception as e:
+                galat = str(e)
+                METRIK.tambah('galat_sinkronisasi')
+        elif sebelumnya is not None:
+            galat = sebelumnya.galat
+        tanda = None
+        if fungsi_tanda is not None:
+            tanda = fungsi_tanda()
+            if sebelumnya is not None and sebelumnya.tanda == tanda and sebelumnya.galat == galat:
+                METRIK.tambah('putaran_tanpa_perubahan')
+                return sebelumnya
+        # proses() mengembalikan dict berisi kolom-kolom riwayat yang akan ditampilkan
+        try:
+            with METRIK.ukur('proses_sensor'):
+                hasil = fungsi_proses()
+        except Exception as e:
+            METRIK.tambah('galat_proses')
+            # Sensor lain tetap diterbitkan; sensor ini memakai snapshot sebelumnya
+            if sebelumnya is None:
+                raise
+            log.warning("Data sensor %s gagal diproses, snapshot sebelumnya dipakai: %s", nama, e)
+            return replace(sebelumnya, versi=versi, waktu=datetime.now(), galat=str(e), tanda=None)
+        return Snapshot(
+            versi=versi,
+            waktu=datetime.now(),
+            suhu=_baca_saja(hasil['suhu']),
+            tegangan=_baca_saja(hasil['tegangan']),
+            temp_status=_baca_saja(hasil['temp_status']),
+            volt_status=_baca_saja(hasil['volt_status']),
+            time_list=pd.DatetimeIndex(hasil['time_list']),
+            waktu_asli=pd.DatetimeIndex(hasil['waktu_asli']),
+            galat=galat,
+            tanda=tanda,
+            agregat=hasil.get('agregat'),
+        )
+
+    def langkah(self, sinkron=True):
+        versi = self._versi + 1
+        nama = list(self.tugas)
+        with METRIK.ukur('putaran_poller'):
+            hasil = self._pool.map(lambda n: self._proses_sensor(n, sinkron, versi), nama)
+            hasil = dict(zip(nama, hasil))
+        if self._snapshot is not None and all(hasil[n] is self._snapshot.get(n) for n in nama):
+            # Tidak ada sensor yang berubah: tidak ada snapshot baru yang diterbitkan
+            return self._snapshot
+        snapshot = MappingProxyType(hasil)
+        with self._kondisi:
+            self._versi = versi
+            self._snapshot = snapshot
+            self._kondisi.notify_all()
+        return snapshot
+
+    def _jalankan(self):
+        sinkron_berikutnya = time.monotonic()
+        while not self._berhenti.is_set():
+            sinkron = time.monotonic() >= sinkron_berikutnya
+            if sinkron:
+                sinkron_berikutnya = time.monotonic() + self.interval
+            try:
+                self.langkah(sinkron=sinkron)
+                self.galat = None
+            except Exception as e:
+                METRIK.tambah('galat_poller')
+                log.exception("Poller gagal memproses data")
+                self.galat = (datetime.now(), str(e))
+            self._dipicu.wait(max(0.0, sinkron_berikutnya - time.monotonic()))
+            self._dipicu.clear()
+
+    def snapshot(self):
+        with self._kondisi:
+            return self._snapshot
+
+    def tunggu(self, versi_terakhir, timeout=None):
+        # Blok sampai ada snapshot yang lebih baru dari versi_terakhir;
+        # hasilnya {nama_sensor: Snapshot} yang tidak bisa diubah. Versi snapshot
+        # keseluruhan = versi terbesar di antara sensornya.
+        with self._kondisi:
+            self._kondisi.wait_for(
+                lambda: self._snapshot is not None and self._versi > versi_terakhir,
+                timeout=timeout)
+            return self._snapshot
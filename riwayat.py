@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Riwayat bacaan bersih satu sensor dalam array NumPy berkapasitas tetap: waktu int64
+# (nanodetik epoch), Temperature/Voltage float32 dan status terprediksi int8, 18 byte per
+# bacaan. Dua minggu data 1 Hz (~1.2 juta bacaan) muat dalam ~27 MB per sensor.
+#
+# Array berukuran kapasitas + cadangan. Bacaan baru ditulis setelah bacaan terakhir; saat
+# array penuh, `kapasitas` bacaan terakhir disalin ke array baru (amortisasi O(1) per
+# bacaan). N bacaan terakhir karena itu selalu bersebelahan, dan jendela() cukup
+# mengembalikan view tanpa salinan. Posisi yang sudah terlihat lewat view tidak pernah
+# ditulis ulang (pemindahan dan prediksi ulang selalu ke array baru), jadi view yang sudah
+# diterbitkan di snapshot tetap konsisten walaupun riwayat terus bertambah.
+
+KOLOM_RIWAYAT = {
+    'waktu': np.int64,
+    'suhu': np.float32,
+    'tegangan': np.float32,
+    'temp_status': np.int8,
+    'volt_status': np.int8,
+}
+
+
+@dataclass(frozen=True)
+class JendelaRiwayat:
+    # View hanya-baca ke N bacaan terakhir
+    waktu: np.ndarray  # datetime64[ns]
+    suhu: np.ndarray
+    tegangan: np.ndarray
+    temp_status: np.ndarray
+    volt_status: np.ndarray
+
+    def __len__(self):
+        return len(self.suhu)
+
+    def ke_dataframe(self):
+        # Salinan float64, bentuk yang dipakai prediktor pipeline
+        return pd.DataFrame({
+            'Timestamp': pd.DatetimeIndex(self.waktu),
+            'Temperature': self.suhu.astype(np.float64),
+            'Voltage': self.tegangan.astype(np.float64),
+        })
+
+
+class PenyanggaRiwayat:
+
+    def __init__(self, kapasitas, cadangan=None, ukuran_awal=1024):
+        self.kapasitas = int(kapasitas)
+        self.cadangan = int(cadangan) if cadangan is not None else max(self.kapasitas // 4, 1)
+        self.ukuran_awal = ukuran_awal
+        self.kosongkan()
+
+    def kosongkan(self):
+        self._array = {k: np.empty(0, dtype=t) for k, t in KOLOM_RIWAYAT.items()}
+        self._awal = 0
+        self._akhir = 0
+
+    def __len__(self):
+        return self._akhir - self._awal
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._array.values())
+
+    def _pindahkan(self, tambahan):
+        # Array baru (tumbuh dua kali lipat sampai kapasitas + cadangan) berisi bacaan
+        # yang masih disimpan di awal
+        simpan = min(len(self), self.kapasitas - tambahan)
+        ukuran_lama = len(self._array['suhu'])
+        ukuran = min(max(2 * ukuran_lama, simpan + tambahan, self.ukuran_awal), self.kapasitas + self.cadangan)
+        for k, lama in self._array.items():
+            baru = np.empty(ukuran, dtype=lama.dtype)
+            baru[:simpan] = lama[self._akhir - simpan:self._akhir]
+            self._array[k] = baru
+        self._awal, self._akhir = 0, simpan
+
+    def tambah(self, waktu, suhu, tegangan, temp_status, volt_status):
+        nilai = {
+            'waktu': np.asarray(waktu, dtype='datetime64[ns]').view(np.int64),
+            'suhu': np.asarray(suhu),
+            'tegangan': np.asarray(tegangan),
+            'temp_status': np.asarray(temp_status),
+            'volt_status': np.asarray(volt_status),
+        }
+        n = len(nilai['suhu'])
+        if n == 0:
+            return
+        if n > self.kapasitas:
+            nilai = {k: v[-self.kapasitas:] for k, v in nilai.items()}
+            n = self.kapasitas
+        if self._akhir + n > len(self._array['suhu']):
+            self._pindahkan(n)
+        for k, v in nilai.items():
+            self._array[k][self._akhir:self._akhir + n] = v
+        self._akhir += n
+        self._awal = max(self._awal, self._akhir - self.kapasitas)
+
+    def jendela(self, n=None):
+        awal = self._awal if n is None else max(self._awal, self._akhir - n)
+        view = {}
+        for k, a in self._array.items():
+            v = a[awal:self._akhir]
+            v.setflags(write=False)
+            view[k] = v
+        view['waktu'] = view['waktu'].view('datetime64[ns]')
+        return JendelaRiwayat(**view)
+
+    def ganti_status(self, temp_status, volt_status):
+        # Status seluruh isi riwayat (misalnya setelah model diganti), ke array baru
+        for k, nilai in (('temp_status', temp_status), ('volt_status', volt_status)):
+            baru = self._array[k].copy()
+            baru[self._awal:self._akhir] = nilai
+            self._array[k] = baru
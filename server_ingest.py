@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from metrik import METRIK
+from pengurai_sheet import FORMAT_WAKTU_SHEET, urai_waktu
+from penyimpanan import KOLOM, SUMBER_MODEL, PenyimpananLokal
+
+log = logging.getLogger(__name__)
+
+# Server HTTP ringan di LAN untuk menerima bacaan sensor langsung dari ESP8266.
+#
+#   GET  /ingest?Timestamp=...&Temperature=..&Voltage=..&TempStatus=..&VoltStatus=..
+#        (format query sama dengan yang dikirim sketch ke Apps Script)
+#   POST /ingest   body JSON: satu objek bacaan atau list objek (batch)
+#   GET  /health
+#   GET  /metrics, /metrics.json   (metrik pipeline, lihat metrik.py)
+#
+# Setiap bacaan berisi Temperature dan Voltage, opsional TempStatus/VoltStatus
+# (jika tidak dikirim dan server diberi fungsi klasifikasi, status diisi oleh model; bacaan itu
+# disimpan dengan sumber SUMBER_MODEL sehingga tidak dipakai sebagai label oleh latih_ulang.py,
+# dan diteruskan ke sheet tanpa status hasil model).
+# Waktu bacaan diambil dari Timestamp (jika cocok dengan format_waktu, atau ISO 8601 dengan
+# offset zona; lihat pengurai_sheet.py), atau dihitung dari waktu terima dikurangi umur_ms
+# (umur bacaan saat batch dikirim).
+
+
+def ubah_ke_bacaan(daftar_objek, waktu_terima, format_waktu=FORMAT_WAKTU_SHEET, zona_waktu=None):
+    teks = [o.get('Timestamp') for o in daftar_objek]
+    teks = ['' if t is None else str(t) for t in teks]
+    waktu = urai_waktu(teks, format_waktu, zona_waktu)
+    daftar_bacaan = []
+    for objek, w in zip(daftar_objek, waktu):
+        if pd.isna(w):
+            umur_ms = float(objek.get('umur_ms', 0) or 0)
+            w = waktu_terima - timedelta(milliseconds=umur_ms)
+        bacaan = {'Timestamp': pd.Timestamp(w).floor('s')}
+        for kolom in KOLOM[1:]:
+            bacaan[kolom] = objek.get(kolom)
+        daftar_bacaan.append(bacaan)
+    return daftar_bacaan
+
+
+class ServerIngest:
+    # Bacaan yang diterima langsung disimpan ke penyimpanan lokal, lalu (opsional)
+    # diteruskan ke Google Sheet secara batch dan dikabarkan ke dashboard lewat saat_diterima
+
+    def __init__(self, penyimpanan, sheet=None, interval_teruskan=30, saat_diterima=None,
+                 host='127.0.0.1', port=8765, klasifikasi=None, format_waktu=FORMAT_WAKTU_SHEET, zona_waktu=None):
+        self.penyimpanan = penyimpanan
+        self.format_waktu = format_waktu
+        self.zona_waktu = zona_waktu
+        self.sheet = sheet
+        self.interval_teruskan = interval_teruskan
+        self.saat_diterima = saat_diterima
+        # klasifikasi(suhu, tegangan) -> (temp_status, volt_status), misalnya ModelStatus.prediksi
+        self.klasifikasi = klasifikasi
+        self.host = host
+        self.port = port
+        # terima() dijalankan di thread pekerja; antrian sheet dan penghitung dijaga lock ini
+        self._lock = threading.Lock()
+        self._antrian_sheet = []
+        self.jumlah_diterima = 0
+        self.jumlah_diteruskan = 0
+        self._server = None
+
+    def terima(self, daftar_objek):
+        waktu_terima = datetime.now()
+        daftar_bacaan = ubah_ke_bacaan(daftar_objek, waktu_terima, self.format_waktu, self.zona_waktu)
+        # Baris sheet disiapkan sebelum status dilengkapi: sheet hanya berisi status dari perangkat
+        baris_sheet = []
+        if self.sheet is not None:
+            baris_sheet = [[b['Timestamp'].strftime(FORMAT_WAKTU_SHEET)] + ['' if b[k] is None else b[k] for k in KOLOM[1:]]
+                           for b in daftar_bacaan]
+        diisi = np.zeros(len(daftar_bacaan), dtype=bool)
+        if self.klasifikasi is not None:
+            diisi = self._lengkapi_status(daftar_bacaan)
+        data = pd.DataFrame(daftar_bacaan, columns=KOLOM)
+        with METRIK.ukur('ingest_simpan'):
+            baru = self.penyimpanan.tambah(data[~diisi], sumber='lokal')
+            if diisi.any():
+                baru += self.penyimpanan.tambah(data[diisi], sumber=SUMBER_MODEL)
+        with self._lock:
+            self.jumlah_diterima += len(daftar_bacaan)
+            self._antrian_sheet.extend(baris_sheet)
+        METRIK.tambah('ingest_diterima', len(daftar_bacaan))
+        if self.saat_diterima is not None and baru:
+            self.saat_diterima()
+        return baru
+
+    def _lengkapi_status(self, daftar_bacaan):
+        # Klasifikasi langsung di jalur ingest (hutan kompilasi, < 1 ms per bacaan).
+        # Hasilnya True untuk bacaan yang statusnya diisi model.
+        diisi = np.zeros(len(daftar_bacaan), dtype=bool)
+        kurang = [i for i, b in enumerate(daftar_bacaan)
+                  if b['TempStatus'] in (None, '') or b['VoltStatus'] in (None, '')]
+        if not kurang:
+            return diisi
+        suhu = pd.to_numeric(pd.Series([daftar_bacaan[i]['Temperature'] for i in kurang], dtype=object), errors='coerce')
+        tegangan = pd.to_numeric(pd.Series([daftar_bacaan[i]['Voltage'] for i in kurang], dtype=object), errors='coerce')
+        valid = (suhu.notna() & tegangan.notna()).to_numpy()
+        if not valid.any():
+            return diisi
+        kurang = np.asarray(kurang)[valid]
+        temp_status, volt_status = self.klasifikasi(suhu.to_numpy(float)[valid], tegangan.to_numpy(float)[valid])
+        for i, t, v in zip(kurang.tolist(), temp_status.tolist(), volt_status.tolist()):
+            b = daftar_bacaan[i]
+            if b['TempStatus'] in (None, ''):
+                b['TempStatus'] = t
+            if b['VoltStatus'] in (None, ''):
+                b['VoltStatus'] = v
+        diisi[kurang] = True
+        return diisi
+
+    async def _teruskan_ke_sheet(self):
+        # Bacaan dikirim ke Google Sheet dalam satu append_rows per interval
+        while True:
+            await asyncio.sleep(self.interval_teruskan)
+            with self._lock:
+                baris, self._antrian_sheet = self._antrian_sheet, []
+            if not baris:
+                continue
+            try:
+                await asyncio.to_thread(self.sheet.append_rows, baris, value_input_option='USER_ENTERED')
+                self.jumlah_diteruskan += len(baris)
+            except Exception:
+                log.exception("Gagal meneruskan %d bacaan ke Google Sheet", len(baris))
+                with self._lock:
+                    self._antrian_sheet = baris + self._antrian_sheet
+
+    async def _tangani(self, reader, writer):
+        try:
+            baris_awal = await reader.readline()
+            metode, target, _ = baris_awal.decode('latin-1').split(' ', 2)
+            header = {}
+            while True:
+                baris = await reader.readline()
+                if baris in (b'\r\n', b'\n', b''):
+                    break
+                nama, _, nilai = baris.decode('latin-1').partition(':')
+                header[nama.strip().lower()] = nilai.strip()
+            body = await reader.readexactly(int(header.get('content-length', 0) or 0))
+            status, hasil = await self._rute(metode, target, body)
+        except Exception as e:
+            status, hasil = 400, {'state': 'error', 'pesan': str(e)}
+        if isinstance(hasil, str):
+            data, jenis = hasil.encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            data, jenis = json.dumps(hasil).encode(), 'application/json'
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: {jenis}\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+        writer.close()
+
+    async def _rute(self, metode, target, body):
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'state': 'success', 'diterima': self.jumlah_diterima,
+                         'diteruskan': self.jumlah_diteruskan, 'antrian_sheet': len(self._antrian_sheet)}
+        if url.path == '/metrics':
+            return 200, METRIK.ke_prometheus()
+        if url.path == '/metrics.json':
+            return 200, METRIK.ringkasan()
+        if url.path != '/ingest':
+            return 404, {'state': 'error', 'pesan': 'tidak ditemukan'}
+        if metode == 'GET':
+            daftar = [dict(parse_qsl(url.query))]
+        elif metode == 'POST':
+            objek = json.loads(body or b'[]')
+            daftar = objek if isinstance(objek, list) else [objek]
+        else:
+            return 405, {'state': 'error', 'pesan': 'metode tidak didukung'}
+        # Tulis SQLite dan klasifikasi memblok; dijalankan di thread agar event loop tetap melayani
+        baru = await asyncio.to_thread(self.terima, daftar)
+        return 200, {'state': 'success', 'diterima': len(daftar), 'baru': baru}
+
+    async def _mulai_server(self):
+        self._server = await asyncio.start_server(self._tangani, self.host, self.port)
+
+    async def _layani(self):
+        tugas = [asyncio.create_task(self._server.serve_forever())]
+        if self.sheet is not None:
+            tugas.append(asyncio.create_task(self._teruskan_ke_sheet()))
+        await asyncio.gather(*tugas)
+
+    async def jalankan(self):
+        await self._mulai_server()
+        await self._layani()
+
+    def mulai_di_thread(self):
+        # Untuk dijalankan di dalam proses Streamlit (event loop sendiri di thread terpisah)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(self._mulai_server())
+        threading.Thread(target=loop.run_until_complete, args=(self._layani(),),
+                         name='server-ingest', daemon=True).start()
+        return self
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    parser = argparse.ArgumentParser(description="Server ingest lokal untuk sensor ESP8266")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Alamat yang didengarkan; 0.0.0.0 agar ESP8266 di LAN bisa mengirim (tanpa autentikasi)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default='data_monitoring.sqlite')
+    parser.add_argument('--teruskan-ke-sheet', metavar='SHEET_URL',
+                        help="Teruskan bacaan ke Google Sheet ini secara batch")
+    parser.add_argument('--interval-teruskan', type=float, default=30)
+    parser.add_argument('--klasifikasi', action='store_true',
+                        help="Isi TempStatus/VoltStatus yang tidak dikirim perangkat dengan model")
+    parser.add_argument('--webhook', metavar='URL',
+                        help="Kirim peringatan perubahan status ke webhook ini (lihat peringatan.py)")
+    args = parser.parse_args()
+
+    sheet = None
+    if args.teruskan_ke_sheet:
+        from pembaca_sheet import buat_client
+        sheet = buat_client().open_by_url(args.teruskan_ke_sheet).sheet1
+
+    klasifikasi = None
+    if args.klasifikasi or args.webhook:
+        from inferensi import PengelolaModel
+        pengelola = PengelolaModel().mulai()
+
+        def klasifikasi(suhu, tegangan):
+            # Selalu model aktif terbaru (lihat latih_ulang.py)
+            return pengelola.model.prediksi(suhu, tegangan)
+
+    penyimpanan = PenyimpananLokal(args.db)
+    saat_diterima = None
+    if args.webhook:
+        # Setiap bacaan yang masuk langsung dievaluasi, tanpa menunggu dashboard
+        from peringatan import MesinPeringatan, PemantauPeringatan, PengirimWebhook
+        mesin = MesinPeringatan(PengirimWebhook(args.webhook))
+        saat_diterima = PemantauPeringatan('Sensor 1', penyimpanan, mesin, klasifikasi).mulai().picu
+
+    server = ServerIngest(penyimpanan, sheet=sheet, interval_teruskan=args.interval_teruskan,
+                          saat_diterima=saat_diterima, host=args.host, port=args.port,
+                          klasifikasi=klasifikasi if args.klasifikasi else None)
+    print(f"Server ingest berjalan di http://{args.host}:{args.port}/ingest")
+    asyncio.run(server.jalankan())
+
+
+if __name__ == '__main__':
+    main()
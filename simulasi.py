@@ -0,0 +1,81 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+# Prediksi 30 hari dengan simulasi Monte Carlo. Asumsinya sama dengan cara lama
+# (satu sampel acak per hari diambil dari distribusi normal data historis), tetapi suhu dan
+# tegangan diambil bersama dari normal dua dimensi (korelasi ikut terbawa) dan ribuan
+# jalur disimulasikan sekaligus, sehingga hasilnya berupa pita persentil dan peluang status.
+
+STATUS_LOW = 1
+STATUS_HIGH = 3
+PERSENTIL = (5, 50, 95)
+
+
+@dataclass(frozen=True)
+class HasilSimulasi:
+    # langkah: jumlah titik waktu ke depan (hari atau jam)
+    langkah: int
+    jumlah_jalur: int
+    seed: int
+    # (3, langkah): baris P5, P50, P95
+    persentil_suhu: np.ndarray
+    persentil_tegangan: np.ndarray
+    # (langkah,): peluang status LOW/HIGH per titik waktu
+    peluang_temp_low: np.ndarray
+    peluang_temp_high: np.ndarray
+    peluang_volt_low: np.ndarray
+    peluang_volt_high: np.ndarray
+    durasi: float
+
+
+def statistik_data(data):
+    # Rata-rata dan kovarians (Temperature, Voltage). Hanya ini yang dipakai simulasi,
+    # jadi tuple ini sekaligus menjadi versi data untuk cache.
+    nilai = data[['Temperature', 'Voltage']].astype(float).dropna().to_numpy()
+    if len(nilai) < 2:
+        return None
+    rerata = nilai.mean(axis=0)
+    kovarians = np.cov(nilai, rowvar=False)
+    return tuple(rerata.tolist()), tuple(map(tuple, kovarians.tolist())), len(nilai)
+
+
+def _ringkas(suhu, tegangan, klasifikasi, seed, mulai):
+    # suhu/tegangan: (jalur, langkah). klasifikasi(suhu, tegangan) -> (temp_status, volt_status)
+    # dipanggil sekali untuk seluruh jalur x langkah
+    jumlah_jalur, langkah = suhu.shape
+    temp_status, volt_status = klasifikasi(suhu.ravel(), tegangan.ravel())
+    temp_status = np.asarray(temp_status).reshape(jumlah_jalur, langkah)
+    volt_status = np.asarray(volt_status).reshape(jumlah_jalur, langkah)
+    return HasilSimulasi(
+        langkah=langkah,
+        jumlah_jalur=jumlah_jalur,
+        seed=seed,
+        persentil_suhu=np.percentile(suhu, PERSENTIL, axis=0),
+        persentil_tegangan=np.percentile(tegangan, PERSENTIL, axis=0),
+        peluang_temp_low=(temp_status == STATUS_LOW).mean(axis=0),
+        peluang_temp_high=(temp_status == STATUS_HIGH).mean(axis=0),
+        peluang_volt_low=(volt_status == STATUS_LOW).mean(axis=0),
+        peluang_volt_high=(volt_status == STATUS_HIGH).mean(axis=0),
+        durasi=time.perf_counter() - mulai,
+    )
+
+
+def simulasikan(rerata, kovarians, klasifikasi, hari=30, jumlah_jalur=10000, seed=0):
+    mulai = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    sampel = rng.multivariate_normal(np.asarray(rerata), np.asarray(kovarians),
+                                     size=(jumlah_jalur, hari), method='eigh')
+    return _ringkas(sampel[..., 0], sampel[..., 1], klasifikasi, seed, mulai)
+
+
+def simulasikan_ramalan(ramalan, klasifikasi, jumlah_jalur=2000, seed=0):
+    # Sampel di sekitar ramalan deret waktu (lihat peramalan.py): normal per titik waktu
+    # dengan rata-rata dan simpangan baku ramalan masing-masing kolom
+    mulai = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    ukuran = (jumlah_jalur, len(ramalan))
+    suhu = rng.normal(ramalan['Temperature'].to_numpy(), ramalan['Temperature_std'].to_numpy(), ukuran)
+    tegangan = rng.normal(ramalan['Voltage'].to_numpy(), ramalan['Voltage_std'].to_numpy(), ukuran)
+    return _ringkas(suhu, tegangan, klasifikasi, seed, mulai)
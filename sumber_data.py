@@ -0,0 +1,50 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+
+from pengurai_sheet import FORMAT_WAKTU_SHEET
+
+# Sheet lama, dipakai jika sumber_data.json tidak ada
+SHEET_BAWAAN = 'https://docs.google.com/spreadsheets/d/1t3iwJI4UICYilpjplZ2KbGwJ4MQEsbCWL2AGaXvX_mQ/edit#gid=0'
+
+
+@dataclass(frozen=True)
+class SumberData:
+    # Satu sensor/ruangan: sheet (atau tab) sumber data dan file penyimpanan lokalnya
+    nama: str
+    sheet_url: str
+    worksheet: str = None
+    db: str = None
+    # Format kolom Timestamp di sheet (strftime) dan zona waktunya, misalnya "Asia/Jakarta"
+    format_waktu: str = FORMAT_WAKTU_SHEET
+    zona_waktu: str = None
+
+    @property
+    def path_db(self):
+        if self.db:
+            return self.db
+        slug = re.sub(r'[^a-z0-9]+', '_', self.nama.lower()).strip('_')
+        return f"data_{slug}.sqlite"
+
+    @property
+    def path_peramalan(self):
+        # State model peramalan deret waktu, disimpan di samping file penyimpanannya
+        return os.path.splitext(self.path_db)[0] + '.peramalan.json'
+
+
+def muat_sumber(path, default_url=SHEET_BAWAAN):
+    # Daftar sumber dibaca dari file JSON, contoh:
+    # [{"nama": "Ruang Server", "sheet_url": "https://...", "worksheet": "Sheet1"},
+    #  {"nama": "Gudang", "sheet_url": "https://...", "worksheet": "Gudang",
+    #   "format_waktu": "%d/%m/%Y %H:%M:%S", "zona_waktu": "Asia/Jakarta"}]
+    # Tanpa file konfigurasi dipakai satu sumber bawaan (sheet lama).
+    if not os.path.exists(path):
+        return [SumberData(nama='Sensor 1', sheet_url=default_url, db='data_monitoring.sqlite')]
+    with open(path, encoding='utf-8') as f:
+        daftar = json.load(f)
+    sumber = [SumberData(**item) for item in daftar]
+    nama = [s.nama for s in sumber]
+    if len(set(nama)) != len(nama):
+        raise ValueError(f"Nama sumber di {path} harus unik: {nama}")
+    return sumber
@@ -0,0 +1,180 @@
+import numpy as np
+
+# Mode klasifikasi dengan tabel keputusan 2D. Kedua model hanya memakai (Temperature,
+# Voltage), dan hasil RandomForest konstan di setiap persegi panjang yang dibatasi ambang
+# split berurutan. Karena itu:
+#   1. Hasil model dihitung sekali per daerah ambang (tabel daerah, eksak).
+#   2. Rentang suhu/tegangan yang teramati dibagi menjadi grid seragam. Sel yang seluruh
+#      daerahnya berstatus sama menyimpan status itu; sel yang dilewati batas keputusan
+#      ditandai 0.
+#   3. Klasifikasi = hitung indeks sel lalu baca grid (O(1)). Bacaan di sel batas, di luar
+#      rentang, atau NaN diteruskan ke model eksak.
+# Hasilnya sama dengan model; laporan_ketidaksesuaian memeriksa hal itu pada data historis.
+
+TANPA_STATUS = 0
+
+
+def _daerah(ambang, x):
+    # Indeks daerah: daerah r berisi x dengan ambang[r-1] < x <= ambang[r]
+    return np.searchsorted(ambang, x, side='left')
+
+
+def _titik_wakil(ambang):
+    # Satu titik per daerah; ujung kanan daerah ikut ke daerah itu (x <= ambang)
+    return np.append(ambang, np.nextafter(ambang[-1], np.inf)) if len(ambang) else np.zeros(1)
+
+
+def _sel_murni(tabel, awal_x, akhir_x, awal_y, akhir_y):
+    # Status per sel jika semua daerah di blok [awal, akhir] (inklusif) berstatus sama,
+    # selain itu TANPA_STATUS. Dihitung dengan tabel jumlah kumulatif per kelas.
+    hasil = np.full((len(awal_x), len(awal_y)), TANPA_STATUS, dtype=np.int8)
+    luas = np.outer(akhir_x - awal_x + 1, akhir_y - awal_y + 1)
+    for kelas in np.unique(tabel):
+        kumulatif = np.zeros((tabel.shape[0] + 1, tabel.shape[1] + 1), dtype=np.int64)
+        kumulatif[1:, 1:] = (tabel == kelas).cumsum(axis=0).cumsum(axis=1)
+        x0, x1 = awal_x[:, np.newaxis], akhir_x[:, np.newaxis] + 1
+        y0, y1 = awal_y[np.newaxis, :], akhir_y[np.newaxis, :] + 1
+        jumlah = kumulatif[x1, y1] - kumulatif[x0, y1] - kumulatif[x1, y0] + kumulatif[x0, y0]
+        hasil[jumlah == luas] = kelas
+    return hasil
+
+
+class TabelKeputusan:
+
+    def __init__(self, model, rentang_suhu, rentang_tegangan, resolusi=(400, 400)):
+        # model: ModelStatus (memiliki prediksi, versi, hutan_temp, hutan_volt)
+        self.model = model
+        self.versi = model.versi
+        self.rentang_suhu = (float(rentang_suhu[0]), float(rentang_suhu[1]))
+        self.rentang_tegangan = (float(rentang_tegangan[0]), float(rentang_tegangan[1]))
+        self.resolusi = (int(resolusi[0]), int(resolusi[1]))
+        self.jumlah_lookup = 0
+        self.jumlah_fallback = 0
+        self._bangun()
+
+    @classmethod
+    def dari_data(cls, model, suhu, tegangan, resolusi=(400, 400), margin=0.05, kuantil=0.001):
+        # Rentang grid = rentang data historis (kuantil 0.1%-99.9%, agar satu outlier tidak
+        # memperlebar grid) ditambah margin di kedua sisi
+        suhu = np.asarray(suhu, dtype=float)
+        tegangan = np.asarray(tegangan, dtype=float)
+        suhu = suhu[np.isfinite(suhu)]
+        tegangan = tegangan[np.isfinite(tegangan)]
+        if len(suhu) == 0 or len(tegangan) == 0:
+            # Tanpa data: rentang dari statistik scaler (rata-rata +- 4 simpangan baku)
+            mean, scale = model.scaler.mean_, model.scaler.scale_
+            suhu = np.array([mean[0] - 4 * scale[0], mean[0] + 4 * scale[0]])
+            tegangan = np.array([mean[1] - 4 * scale[1], mean[1] + 4 * scale[1]])
+
+        def rentang(x):
+            bawah, atas = np.quantile(x, [kuantil, 1 - kuantil])
+            lebar = max(atas - bawah, 1.0)
+            return bawah - margin * lebar, atas + margin * lebar
+
+        return cls(model, rentang(suhu), rentang(tegangan), resolusi)
+
+    def _bangun(self):
+        ambang_x, ambang_y = [], []
+        for hutan in (self.model.hutan_temp, self.model.hutan_volt):
+            split = np.isfinite(hutan.ambang)
+            ambang_x.append(hutan.ambang[split & (hutan.fitur == 0)])
+            ambang_y.append(hutan.ambang[split & (hutan.fitur == 1)])
+        ambang_x = np.unique(np.concatenate(ambang_x))
+        ambang_y = np.unique(np.concatenate(ambang_y))
+
+        # Tabel daerah eksak: hasil model di satu titik wakil per daerah
+        wakil_x, wakil_y = np.meshgrid(_titik_wakil(ambang_x), _titik_wakil(ambang_y), indexing='ij')
+        temp_status, volt_status = self.model.prediksi(wakil_x.ravel(), wakil_y.ravel())
+        bentuk = wakil_x.shape
+
+        # Tepi sel diperlebar sedikit agar pembulatan saat menghitung indeks sel
+        # tidak bisa menaruh bacaan di sel yang tidak mencakup daerahnya
+        nx, ny = self.resolusi
+        (x0, x1), (y0, y1) = self.rentang_suhu, self.rentang_tegangan
+        self._lebar = ((x1 - x0) / nx, (y1 - y0) / ny)
+        tepi_x = x0 + np.arange(nx + 1) * self._lebar[0]
+        tepi_y = y0 + np.arange(ny + 1) * self._lebar[1]
+        toleransi_x, toleransi_y = self._lebar[0] * 1e-6, self._lebar[1] * 1e-6
+        awal_x = _daerah(ambang_x, tepi_x[:-1] - toleransi_x)
+        akhir_x = _daerah(ambang_x, tepi_x[1:] + toleransi_x)
+        awal_y = _daerah(ambang_y, tepi_y[:-1] - toleransi_y)
+        akhir_y = _daerah(ambang_y, tepi_y[1:] + toleransi_y)
+
+        self.grid_temp = _sel_murni(np.asarray(temp_status).reshape(bentuk), awal_x, akhir_x, awal_y, akhir_y)
+        self.grid_volt = _sel_murni(np.asarray(volt_status).reshape(bentuk), awal_x, akhir_x, awal_y, akhir_y)
+
+    def cakupan(self):
+        # Proporsi sel grid yang bisa dijawab tanpa model
+        return {
+            'temp': float((self.grid_temp != TANPA_STATUS).mean()),
+            'volt': float((self.grid_volt != TANPA_STATUS).mean()),
+        }
+
+    def prediksi(self, suhu, tegangan):
+        suhu = np.asarray(suhu, dtype=float)
+        tegangan = np.asarray(tegangan, dtype=float)
+        with np.errstate(invalid='ignore'):
+            i = np.floor((suhu - self.rentang_suhu[0]) / self._lebar[0])
+            j = np.floor((tegangan - self.rentang_tegangan[0]) / self._lebar[1])
+        di_dalam = (i >= 0) & (i < self.resolusi[0]) & (j >= 0) & (j < self.resolusi[1])
+        i = np.where(di_dalam, i, 0).astype(np.intp)
+        j = np.where(di_dalam, j, 0).astype(np.intp)
+        temp_status = np.where(di_dalam, self.grid_temp[i, j], TANPA_STATUS).astype(int)
+        volt_status = np.where(di_dalam, self.grid_volt[i, j], TANPA_STATUS).astype(int)
+
+        fallback = (temp_status == TANPA_STATUS) | (volt_status == TANPA_STATUS)
+        if fallback.any():
+            temp_model, volt_model = self.model.prediksi(suhu[fallback], tegangan[fallback])
+            temp_status[fallback] = temp_model
+            volt_status[fallback] = volt_model
+        self.jumlah_lookup += int(len(suhu) - fallback.sum())
+        self.jumlah_fallback += int(fallback.sum())
+        return temp_status, volt_status
+
+
+def laporan_ketidaksesuaian(tabel, suhu, tegangan):
+    # Bandingkan mode tabel dengan scaler + rf_temp/rf_volt (sklearn) pada data historis
+    from inferensi import prediksi_status_batch
+
+    suhu = np.asarray(suhu, dtype=float)
+    tegangan = np.asarray(tegangan, dtype=float)
+    model = tabel.model
+    temp_rf, volt_rf = prediksi_status_batch(suhu, tegangan, model.scaler, model.rf_temp, model.rf_volt)
+    lookup_sebelum, fallback_sebelum = tabel.jumlah_lookup, tabel.jumlah_fallback
+    temp_tabel, volt_tabel = tabel.prediksi(suhu, tegangan)
+    jumlah = max(len(suhu), 1)
+    return {
+        'jumlah': len(suhu),
+        'versi_model': tabel.versi,
+        'resolusi': tabel.resolusi,
+        'rentang_suhu': tabel.rentang_suhu,
+        'rentang_tegangan': tabel.rentang_tegangan,
+        'cakupan_sel': tabel.cakupan(),
+        'lewat_tabel': (tabel.jumlah_lookup - lookup_sebelum) / jumlah,
+        'lewat_model': (tabel.jumlah_fallback - fallback_sebelum) / jumlah,
+        'beda_temp': int((temp_tabel != temp_rf).sum()),
+        'beda_volt': int((volt_tabel != volt_rf).sum()),
+        'rasio_beda_temp': float((temp_tabel != temp_rf).mean()) if len(suhu) else 0.0,
+        'rasio_beda_volt': float((volt_tabel != volt_rf).mean()) if len(suhu) else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from inferensi import muat_model, path_model_aktif
+    from penyimpanan import PenyimpananLokal
+
+    parser = argparse.ArgumentParser(description="Laporan ketidaksesuaian mode tabel keputusan")
+    parser.add_argument('--db', default='data_monitoring.sqlite')
+    parser.add_argument('--resolusi', type=int, nargs=2, default=(400, 400), metavar=('SUHU', 'TEGANGAN'))
+    args = parser.parse_args()
+
+    model = muat_model(*path_model_aktif())
+    data = PenyimpananLokal(args.db).muat()
+    mulai = time.perf_counter()
+    tabel = TabelKeputusan.dari_data(model, data['Temperature'], data['Voltage'], resolusi=args.resolusi)
+    print(f"Tabel dibangun dalam {time.perf_counter() - mulai:.2f} detik")
+    for kunci, nilai in laporan_ketidaksesuaian(tabel, data['Temperature'], data['Voltage']).items():
+        print(f"{kunci}: {nilai}")
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from forest_kompilasi import HutanKompilasi, prediksi_status_kompilasi, verifikasi
+
+joblib = pytest.importorskip('joblib')
+pytest.importorskip('sklearn')
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def model():
+    scaler = joblib.load(os.path.join(FOLDER, 'scaler_rf.joblib'))
+    rf_temp = joblib.load(os.path.join(FOLDER, 'temp_model.joblib'))
+    rf_volt = joblib.load(os.path.join(FOLDER, 'volt_model.joblib'))
+    return scaler, rf_temp, rf_volt
+
+
+def _beda(model, suhu, tegangan):
+    from inferensi import prediksi_status_batch
+
+    scaler, rf_temp, rf_volt = model
+    suhu = np.asarray(suhu, dtype=float)
+    tegangan = np.asarray(tegangan, dtype=float)
+    temp_sk, volt_sk = prediksi_status_batch(suhu, tegangan, scaler, rf_temp, rf_volt)
+    temp_k, volt_k = prediksi_status_kompilasi(
+        suhu, tegangan, HutanKompilasi.dari_model(rf_temp, scaler), HutanKompilasi.dari_model(rf_volt, scaler))
+    return int((temp_sk != temp_k).sum()), int((volt_sk != volt_k).sum())
+
+
+def test_ambang_nan_dan_titik_acak(model):
+    hasil = verifikasi(*model)
+    assert hasil['beda_temp'] == 0
+    assert hasil['beda_volt'] == 0
+
+
+def test_data_sensor(model):
+    # Bacaan berbentuk riwayat sensor: pola harian, lonjakan suhu, sel kosong (NaN)
+    from benchmark import buat_data_sensor
+    from pengurai_sheet import urai_nilai
+
+    data = urai_nilai(['Timestamp', 'Temperature', 'Voltage', 'TempStatus', 'VoltStatus'],
+                      buat_data_sensor(20000, seed=1, proporsi_kosong=0.01))
+    assert _beda(model, data['Temperature'], data['Voltage']) == (0, 0)
+
+
+def test_nilai_perangkat(model):
+    # Bentuk yang dikirim ESP8266: suhu bulat, tegangan 0 saat tidak ada tegangan,
+    # termasuk batas status di sketch (33/35 °C, 200/230 V)
+    suhu, tegangan = np.meshgrid(np.arange(-10, 81), np.concatenate([[0.0], np.arange(75, 261, 0.25)]))
+    assert _beda(model, suhu.ravel(), tegangan.ravel()) == (0, 0)
+
+
+@pytest.mark.parametrize('suhu, tegangan', [
+    ([np.nan], [220.0]),
+    ([30.0], [np.nan]),
+    ([np.nan], [np.nan]),
+    ([-0.0, 0.0], [0.0, -0.0]),
+    ([1e30, -1e30], [1e30, -1e30]),
+])
+def test_nilai_tepi(model, suhu, tegangan):
+    assert _beda(model, suhu, tegangan) == (0, 0)
+
+
+def test_input_kosong(model):
+    scaler, rf_temp, rf_volt = model
+    temp, volt = prediksi_status_kompilasi(
+        [], [], HutanKompilasi.dari_model(rf_temp, scaler), HutanKompilasi.dari_model(rf_volt, scaler))
+    assert len(temp) == 0 and len(volt) == 0